@@ -0,0 +1,24 @@
+# Compares the benchmarks against the baseline in test/benchmark_baseline.json and fails if the mean time of a
+# benchmark exceeds the one of the baseline by more than BENCHMARK_TOLERANCE (50% by default). The comparison is only
+# meaningful on the machine the baseline has been recorded on, so it is not part of the CI run.
+# "sh benchmark.sh --save-baseline" replaces the baseline by the results of a new run. Further arguments are passed
+# to pytest.
+cd "$(dirname "$0")"
+baseline=test/benchmark_baseline.json
+if [ "$1" = "--save-baseline" ]; then
+    shift
+    PYTHONPATH=python python -m pytest test/test_benchmark.py --benchmark-only --benchmark-json="$baseline" "$@" || exit
+    # only the statistics are compared, the times of the single rounds are dropped
+    python -c "
+import json, sys
+with open(sys.argv[1]) as f:
+    results = json.load(f)
+for benchmark in results['benchmarks']:
+    benchmark['stats'].pop('data', None)
+with open(sys.argv[1], 'w') as f:
+    json.dump(results, f, indent=4)
+" "$baseline"
+else
+    PYTHONPATH=python python -m pytest test/test_benchmark.py --benchmark-only --benchmark-compare="$baseline" \
+        --benchmark-compare-fail=mean:"${BENCHMARK_TOLERANCE:-50%}" "$@"
+fi
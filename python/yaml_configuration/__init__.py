@@ -9,9 +9,15 @@
 # Franz Steinmetz <franz.steinmetz@dlr.de>
 # Sebastian Brunner <sebastian.brunner@dlr.de>
 
-from importlib.metadata import version, PackageNotFoundError
 
-try:
-    __version__ = version("yaml_configuration")
-except PackageNotFoundError:
-    __version__ = "unknown"
+def __getattr__(name):
+    # importlib.metadata is slow to import, so the version is only looked up when it is used
+    if name == '__version__':
+        from importlib.metadata import version, PackageNotFoundError
+        try:
+            value = version("yaml_configuration")
+        except PackageNotFoundError:
+            value = "unknown"
+        globals()['__version__'] = value
+        return value
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
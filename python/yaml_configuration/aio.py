@@ -0,0 +1,80 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: aio
+   :platform: Unix, Windows
+   :synopsis: Coroutines loading and saving configurations without blocking the event loop.
+
+"""
+
+import asyncio
+import functools
+
+
+class AsyncSaver(object):
+    """Runs the saves of a configuration in an executor, one at a time
+
+    A save requested while another one is waiting to be started is merged into the waiting one. As the configuration
+    is only serialized when the write starts, the merged save contains all changes made before.
+
+    :param save: function writing the configuration
+    :param float window: time in seconds to wait for further saves before writing
+    """
+
+    def __init__(self, save, window=0.):
+        self._save = save
+        self.window = window
+        self._loop = None
+        self._lock = None
+        self._pending = None
+
+    async def save(self, executor=None):
+        """Saves the configuration in the executor
+
+        The save runs in its own task, so cancelling a caller does not cancel a save that other callers have been
+        merged into.
+
+        :param executor: a :class:`concurrent.futures.Executor`, None uses the default executor of the event loop
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # asyncio primitives must not be shared between event loops
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._pending = None
+        pending = self._pending
+        if pending is None:
+            pending = self._pending = loop.create_task(self._run(executor))
+            # the exception is raised by the callers, the task need not report it if all of them have been cancelled
+            pending.add_done_callback(lambda task: task.cancelled() or task.exception())
+        await asyncio.shield(pending)
+
+    async def _run(self, executor):
+        task = asyncio.current_task()
+        try:
+            async with self._lock:
+                # even without a window, saves requested by tasks of the same loop iteration are merged
+                await asyncio.sleep(self.window)
+                # saves requested from now on need another write
+                if self._pending is task:
+                    self._pending = None
+                await self._loop.run_in_executor(executor, self._save)
+        finally:
+            if self._pending is task:
+                self._pending = None
+
+
+async def aload(config, config_file, path=None, update_dictionaries=True, executor=None):
+    """Loads a configuration in an executor, see :meth:`~yaml_configuration.config.DefaultConfig.load`"""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(executor, functools.partial(config.load, config_file, path, update_dictionaries))
+
+
+async def areload(config, executor=None):
+    """Reloads a configuration in an executor, see :meth:`~yaml_configuration.config.DefaultConfig.reload`"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, config.reload)
@@ -0,0 +1,255 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: backends
+   :platform: Unix, Windows
+   :synopsis: Serialization formats of config files.
+
+"""
+
+import json
+import os
+import pickle
+
+from yaml_configuration.utils import atomic_write
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class Backend(object):
+    """Base class of the serialization formats of config files
+
+    Subclasses implement :meth:`loads` and :meth:`dumps` and list the file extensions they are used for.
+    """
+
+    #: the name used to select the backend
+    name = None
+    #: the file extensions the backend is selected for, including the leading dot
+    extensions = ()
+
+    def loads(self, data):
+        """Parses the content of a config file
+
+        :param bytes data: the content of the file
+        :return: the parsed configuration
+        """
+        raise NotImplementedError()
+
+    def dumps(self, dictionary):
+        """Serializes a configuration
+
+        :param dict dictionary: the configuration
+        :return: the content of the file
+        :rtype: bytes
+        """
+        raise NotImplementedError()
+
+    def load(self, path):
+        """Reads and parses a config file
+
+        :param str path: the path of the config file
+        :return: the parsed configuration
+        """
+        with open(path, 'rb') as f:
+            return self.loads(f.read())
+
+    def dump(self, dictionary, path):
+        """Serializes a configuration and writes it to a file
+
+        :param dict dictionary: the configuration
+        :param str path: the path of the config file
+        """
+        data = self.dumps(dictionary)
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def __repr__(self):
+        return '{0}()'.format(type(self).__name__)
+
+
+class YamlBackend(Backend):
+    """The default, human readable format, using the yaml loader and dumper of :mod:`yaml_configuration.config`
+
+    :param bool tuples_as_lists: if True, tuples are written as plain lists instead of python tuples
+    """
+
+    name = 'yaml'
+    extensions = ('.yaml', '.yml')
+
+    def __init__(self, tuples_as_lists=False):
+        self.tuples_as_lists = tuples_as_lists
+
+    def dumper(self):
+        """Returns the yaml dumper class of the active yaml engine"""
+        from yaml_configuration import config
+        config._yaml()
+        if self.tuples_as_lists:
+            from yaml_configuration.compact import tuples_as_lists_dumper
+            return tuples_as_lists_dumper(config.Dumper)
+        return config.Dumper
+
+    def _dump_options(self):
+        return {'width': 80, 'default_flow_style': False, 'Dumper': self.dumper()}
+
+    def loads(self, data):
+        from yaml_configuration import config
+        return config._yaml().load(data, Loader=config.FullLoader)
+
+    def dumps(self, dictionary):
+        from yaml_configuration.config import dump_dict_to_yaml
+        return dump_dict_to_yaml(dictionary, **self._dump_options()).encode('utf-8')
+
+    def load(self, path):
+        from yaml_configuration.config import load_dict_from_yaml
+        return load_dict_from_yaml(path)
+
+    def dump(self, dictionary, path):
+        from yaml_configuration.config import write_dict_to_yaml
+        write_dict_to_yaml(dictionary, path, **self._dump_options())
+
+
+class JsonBackend(Backend):
+    """JSON, using orjson if it is installed
+
+    Non-string keys are written as strings and tuples as lists, so they are not restored by :meth:`loads`.
+
+    :param bool indent: if True, the output is indented by two spaces
+    """
+
+    name = 'json'
+    extensions = ('.json',)
+
+    def __init__(self, indent=False):
+        self.indent = indent
+
+    def loads(self, data):
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data.decode('utf-8'))
+
+    def dumps(self, dictionary):
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if self.indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(dictionary, option=option)
+        if self.indent:
+            return json.dumps(dictionary, indent=2, ensure_ascii=False).encode('utf-8')
+        return json.dumps(dictionary, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class MsgpackBackend(Backend):
+    """MessagePack, a compact binary format, which requires the msgpack package
+
+    :raises ImportError: if msgpack is not installed
+    """
+
+    name = 'msgpack'
+    extensions = ('.msgpack', '.mpk')
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("The msgpack format requires the msgpack package")
+
+    def loads(self, data):
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+    def dumps(self, dictionary):
+        return msgpack.packb(dictionary, use_bin_type=True)
+
+
+class PickleBackend(Backend):
+    """Python pickles, the fastest format for configurations only read by python
+
+    Loading a pickle can execute arbitrary code, so only files written by trusted processes must be loaded.
+    """
+
+    name = 'pickle'
+    extensions = ('.pickle', '.pkl')
+
+    def loads(self, data):
+        return pickle.loads(data)
+
+    def dumps(self, dictionary):
+        return pickle.dumps(dictionary, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+_backends = {}
+
+
+def register_backend(backend_class):
+    """Makes a backend available by its name and file extensions
+
+    :param backend_class: a subclass of :class:`Backend`
+    """
+    _backends[backend_class.name] = backend_class
+    return backend_class
+
+
+for _backend_class in (YamlBackend, JsonBackend, MsgpackBackend, PickleBackend):
+    register_backend(_backend_class)
+
+
+def get_backend(backend=None, path=None):
+    """Returns the backend selected by name or by the extension of a file
+
+    :param backend: a :class:`Backend` instance, the name of a backend, ``'auto'`` to select it by the extension of
+        path, or None for :class:`YamlBackend`
+    :param str path: the path of the config file
+    :return: the backend, :class:`YamlBackend` for unknown extensions
+    :rtype: Backend
+    :raises ValueError: if no backend of the given name exists
+    """
+    if isinstance(backend, Backend):
+        return backend
+    if backend is None:
+        return YamlBackend()
+    if backend == 'auto':
+        extension = os.path.splitext(path or '')[1].lower()
+        for backend_class in _backends.values():
+            if extension in backend_class.extensions:
+                return backend_class()
+        return YamlBackend()
+    try:
+        return _backends[backend]()
+    except KeyError:
+        raise ValueError("Unknown config file format {0}".format(backend))
+
+
+def convert(source_path, target_path, source_backend='auto', target_backend='auto'):
+    """Converts a config file into another format and checks that it is read back unchanged
+
+    :param str source_path: the path of the existing config file
+    :param str target_path: the path of the converted config file
+    :param source_backend: the backend or the name of the format of the source file, by default selected by extension
+    :param target_backend: the backend or the name of the format of the target file, by default selected by extension
+    :return: the converted configuration
+    :raises ValueError: if the configuration cannot be represented by the target format, e.g. because of non-string
+        keys in JSON. The target file is not written in this case.
+    """
+    source_backend = get_backend(source_backend, source_path)
+    target_backend = get_backend(target_backend, target_path)
+    dictionary = source_backend.load(source_path)
+    try:
+        data = target_backend.dumps(dictionary)
+    except TypeError as e:
+        raise ValueError("{0} cannot be converted to {1}: {2}".format(source_path, target_backend.name, e))
+    if target_backend.loads(data) != dictionary:
+        raise ValueError("{0} cannot be converted to {1} without changing its content".format(
+            source_path, target_backend.name))
+    atomic_write(target_path, data)
+    return dictionary
@@ -0,0 +1,138 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: compact
+   :platform: Unix, Windows
+   :synopsis: Memory compact configuration trees and their memory usage.
+
+"""
+
+import sys
+from functools import lru_cache
+
+_MISSING = object()
+
+
+def _same(value, other):
+    """Compares two compacted values, unlike ``==`` also comparing the types, so 1 and True differ"""
+    if value is other:
+        return True
+    value_type = type(value)
+    if value_type is not type(other):
+        return False
+    if value_type is dict:
+        if len(value) != len(other):
+            return False
+        for key, child in value.items():
+            other_child = other.get(key, _MISSING)
+            if other_child is _MISSING or not _same(child, other_child):
+                return False
+        return True
+    if value_type is tuple:
+        return len(value) == len(other) and all(_same(child, other_child) for child, other_child in zip(value, other))
+    return value == other
+
+
+def compact_tree(value, default=_MISSING, lists_as_tuples=False):
+    """Returns a memory compact version of a configuration tree
+
+    Strings (keys and values) are interned and subtrees that are equal to the corresponding subtree of default are
+    replaced by it. Lists are only converted to tuples if lists_as_tuples is True, which is meant for trees shared by
+    several configurations like the compacted defaults, so the other lists keep their type. The result must never be
+    modified, dicts are only replaced as a whole like :meth:`~yaml_configuration.config.DefaultConfig.set_config_value`
+    does.
+
+    :param value: the configuration tree
+    :param default: the compacted default configuration, whose subtrees are shared
+    :param bool lists_as_tuples: if True, lists are converted to tuples
+    :return: the compacted tree
+    """
+    value_type = type(value)
+    if value_type is str:
+        return sys.intern(value)
+    if value_type is dict:
+        if type(default) is not dict:
+            default = None
+        compacted = {}
+        for key, child in value.items():
+            child_default = _MISSING if default is None else default.get(key, _MISSING)
+            if child is child_default:
+                compacted[sys.intern(key) if type(key) is str else key] = child
+                continue
+            compacted[sys.intern(key) if type(key) is str else key] = compact_tree(child, child_default,
+                                                                                    lists_as_tuples)
+        value = compacted
+    elif value_type is list or value_type is tuple:
+        items = tuple(compact_tree(child, lists_as_tuples=lists_as_tuples) for child in value)
+        if type(default) is tuple and _same(items, default):
+            return default
+        value = items if lists_as_tuples or value_type is tuple else list(items)
+    else:
+        return value
+    if default is not _MISSING and _same(value, default):
+        return default
+    return value
+
+
+@lru_cache(maxsize=None)
+def tuples_as_lists_dumper(dumper):
+    """Returns a subclass of a yaml dumper writing tuples as plain lists
+
+    :param dumper: the yaml dumper class
+    """
+    from yaml.representer import SafeRepresenter
+    list_dumper = type('TuplesAsLists' + dumper.__name__, (dumper,), {})
+    list_dumper.add_representer(tuple, SafeRepresenter.represent_list)
+    return list_dumper
+
+
+def _object_ids(value, ids):
+    ids.add(id(value))
+    if type(value) is dict:
+        for key, child in value.items():
+            ids.add(id(key))
+            _object_ids(child, ids)
+    elif type(value) in (list, tuple):
+        for child in value:
+            _object_ids(child, ids)
+    return ids
+
+
+def memory_report(tree, shared_tree=None):
+    """Estimates the memory used by a configuration tree
+
+    :param dict tree: the configuration
+    :param dict shared_tree: a tree whose objects are shared with other configurations, e.g. the compacted defaults
+    :return: a dict with the size of the tree if none of its objects were shared (``tree_bytes``), the size of the
+        objects only used by this tree (``own_bytes``), of the objects shared with shared_tree (``shared_bytes``) and
+        the difference of tree_bytes and own_bytes (``saved_bytes``)
+    :rtype: dict
+    """
+    shared_ids = set() if shared_tree is None else _object_ids(shared_tree, set())
+    seen = set()
+    sizes = {'tree_bytes': 0, 'own_bytes': 0, 'shared_bytes': 0}
+
+    def add(value):
+        size = sys.getsizeof(value)
+        sizes['tree_bytes'] += size
+        if id(value) not in seen:
+            seen.add(id(value))
+            sizes['shared_bytes' if id(value) in shared_ids else 'own_bytes'] += size
+
+    def walk(value):
+        add(value)
+        if type(value) is dict:
+            for key, child in value.items():
+                add(key)
+                walk(child)
+        elif type(value) in (list, tuple):
+            for child in value:
+                walk(child)
+
+    walk(tree)
+    sizes['saved_bytes'] = sizes['tree_bytes'] - sizes['own_bytes']
+    return sizes
@@ -0,0 +1,182 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: compiled
+   :platform: Unix, Windows
+   :synopsis: Typed accessor objects with attribute access to configuration values.
+
+"""
+
+import keyword
+
+from yaml_configuration.frozen import freeze
+from yaml_configuration.paths import split_path
+from yaml_configuration.utils import copy_tree
+
+_MISSING = object()
+
+
+class CompiledConfig(object):
+    """Base class of the classes generated by :func:`compile_config`
+
+    Each key of the template is a slot, dicts are represented by nested compiled objects and lists by read-only
+    :class:`~yaml_configuration.frozen.FrozenList` views. Keys that are no python identifiers, start with an
+    underscore or collide with a method are not represented. The objects are not changed after they have been
+    created, a changed configuration is represented by a new object, see :meth:`_updated`.
+
+    :param dict dictionary: the configuration values
+    :raises ConfigError: if a value does not have the expected type
+    """
+
+    __slots__ = ('_source',)
+
+    #: the keys represented by slots
+    _fields = ()
+    #: the accepted types by key, None if any type is accepted
+    _types = {}
+    #: the compiled classes of the dict values by key
+    _children = {}
+
+    def __init__(self, dictionary):
+        check_types(type(self), dictionary)
+        self._assign(dictionary)
+
+    def _check(self, dictionary):
+        """Checks the types of the values that differ from the current ones"""
+        check_types(type(self), dictionary, self._source)
+
+    def _updated(self, dictionary):
+        """Returns an object representing dictionary, which has been checked by :meth:`_check`
+
+        The nested objects of the values that are the same objects as before are shared with this object.
+        """
+        if dictionary is self._source:
+            return self
+        updated = object.__new__(type(self))
+        updated._assign(dictionary, self)
+        return updated
+
+    def _assign(self, dictionary, old=None):
+        """Sets the values of a new object, taking the values that are the same objects as in old from old"""
+        old_source = None if old is None else old._source
+        for key in self._fields:
+            value = dictionary.get(key, _MISSING)
+            if value is _MISSING:
+                continue
+            if old_source is not None and value is old_source.get(key, _MISSING):
+                setattr(self, key, getattr(old, key))
+                continue
+            child_class = self._children.get(key)
+            if child_class is None:
+                setattr(self, key, freeze(value))
+                continue
+            child = None if old is None else getattr(old, key, None)
+            if child is None:
+                child = object.__new__(child_class)
+                child._assign(value)
+            else:
+                child = child._updated(value)
+            setattr(self, key, child)
+        self._source = dictionary
+
+    def to_dict(self):
+        """Returns a modifiable copy of the represented configuration"""
+        return copy_tree(self._source)
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(type(self).__name__, self._source)
+
+
+def _matches(value, types):
+    if isinstance(value, bool) and bool not in types:
+        # bool is a subclass of int, but True is no valid port number
+        return False
+    return isinstance(value, types)
+
+
+def check_types(compiled_class, dictionary, old=None, path=None):
+    """Checks the types of the values represented by a compiled class
+
+    Values that are the same objects as in old have already been checked and are skipped.
+
+    :param compiled_class: a class generated by :func:`compile_config`
+    :param dict dictionary: the configuration values
+    :param dict old: the previously checked values
+    :param str path: the dotted path of dictionary, used in error messages
+    :raises ConfigError: if a value does not have the expected type
+    """
+    from yaml_configuration.config import ConfigError
+    if not isinstance(dictionary, dict):
+        raise ConfigError("{0} must be a dict, not {1}".format(path, type(dictionary).__name__))
+    if not isinstance(old, dict):
+        old = None
+    for key in compiled_class._fields:
+        value = dictionary.get(key, _MISSING)
+        if value is _MISSING or (old is not None and value is old.get(key, _MISSING)):
+            continue
+        key_path = key if path is None else path + '.' + key
+        child_class = compiled_class._children.get(key)
+        if child_class is not None:
+            check_types(child_class, value, None if old is None else old.get(key), key_path)
+            continue
+        types = compiled_class._types[key]
+        if types is not None and not _matches(value, types):
+            raise ConfigError("{0} must be of type {1}, not {2}".format(
+                key_path, ' or '.join(value_type.__name__ for value_type in types), type(value).__name__))
+
+
+def _default_types(value):
+    if value is None:
+        return None
+    if isinstance(value, float):
+        return float, int
+    if isinstance(value, list):
+        # lists are stored as tuples by compact storage
+        return list, tuple
+    return type(value),
+
+
+def _is_field(key):
+    return isinstance(key, str) and key.isidentifier() and not keyword.iskeyword(key) and \
+        not key.startswith('_') and not hasattr(CompiledConfig, key)
+
+
+def compile_config(template, name='CompiledConfig', schema=None):
+    """Generates a class with a slot for each key of a configuration
+
+    The expected type of each value is the type of its value in template, floats also accept ints. Values that are
+    None in template accept any type.
+
+    :param dict template: the configuration defining the structure, usually the default config
+    :param str name: the name of the generated class, nested classes are named after their key
+    :param dict schema: expected types (a type or tuple of types) by dotted path, overriding the types of template.
+        ``object`` accepts any type.
+    :return: a subclass of :class:`CompiledConfig`
+    """
+    schema = {split_path(path): types if isinstance(types, tuple) else (types,)
+              for path, types in (schema or {}).items()}
+    return _compile(template, name, schema, ())
+
+
+def _compile(template, name, schema, path):
+    fields = []
+    types = {}
+    children = {}
+    for key, value in template.items():
+        if not _is_field(key):
+            continue
+        fields.append(key)
+        key_path = path + (key,)
+        key_types = schema.get(key_path)
+        if key_types is None and isinstance(value, dict):
+            children[key] = _compile(value, name + '_' + key, schema, key_path)
+        elif key_types is not None:
+            types[key] = None if object in key_types else key_types
+        else:
+            types[key] = _default_types(value)
+    return type(name, (CompiledConfig,), {'__slots__': tuple(fields), '_fields': tuple(fields), '_types': types,
+                                          '_children': children})
@@ -21,13 +21,37 @@
 
 import os
 from os.path import expanduser, expandvars, isdir, isfile
-import yaml
-try:
-    from yaml import CDumper as Dumper, CFullLoader as FullLoader
-except ImportError:
-    from yaml import FullLoader, Dumper
-import argparse
-import logging
+import threading
+
+from yaml_configuration.defaults import default_config_cache
+from yaml_configuration.engine import get_yaml_engine, import_yaml
+from yaml_configuration.frozen import ConfigSnapshot
+from yaml_configuration.merge import MISSING, dict_path, diff, fill_up, three_way_merge
+from yaml_configuration.paths import PathIndex, join_path, resolve_key, split_path
+from yaml_configuration.utils import FileLock, atomic_write, copy_tree
+
+# yaml is imported on the first parse or dump, see _yaml(). FullLoader and Dumper are selected by
+# yaml_configuration.engine.set_yaml_engine().
+yaml = FullLoader = Dumper = None
+
+
+def _yaml():
+    """Returns the yaml module, importing it on the first call"""
+    if yaml is None or FullLoader is None or Dumper is None:
+        import_yaml(globals())
+    return yaml
+
+
+def dump_dict_to_yaml(dictionary, **kwargs):
+    """
+    Serializes a dictionary to a yaml string
+    :param dictionary: the dictionary to be serialized
+    :param kwargs: optional additional parameters for dumper
+    :return: the yaml string
+    """
+    yaml_module = _yaml()
+    kwargs.setdefault('Dumper', Dumper)
+    return yaml_module.dump(dictionary, indent=4, **kwargs)
 
 
 def write_dict_to_yaml(dictionary, path, **kwargs):
@@ -40,23 +64,43 @@ def write_dict_to_yaml(dictionary, path, **kwargs):
     directory = os.path.dirname(path)
     if not os.path.exists(directory):
         os.makedirs(directory)
+    if get_yaml_engine().buffered:
+        data = dump_dict_to_yaml(dictionary, **kwargs)
+        with open(path, 'w') as f:
+            f.write(data)
+        return
     with open(path, 'w') as f:
-        yaml.dump(dictionary, f, Dumper=Dumper, indent=4, **kwargs)
+        yaml_module = _yaml()
+        kwargs.setdefault('Dumper', Dumper)
+        yaml_module.dump(dictionary, f, indent=4, **kwargs)
 
 
-def load_dict_from_yaml(path):
+def load_dict_from_yaml(path, snapshot_cache=None):
     """
     Loads a dictionary from a yaml file
     :param path: the absolute path of the target yaml file
+    :param snapshot_cache: optional :class:`~yaml_configuration.snapshot.SnapshotCache` used to skip parsing files
+        that did not change since their last load
     :return:
     """
+    if snapshot_cache is not None:
+        return snapshot_cache.load(path, load_dict_from_yaml)
     f = open(path, 'r')
-    dictionary = yaml.load(f, Loader=FullLoader)
+    dictionary = _yaml().load(f, Loader=FullLoader)
     f.close()
     return dictionary
 
 
+def _write_data(path, data, atomic):
+    if atomic:
+        atomic_write(path, data)
+    else:
+        with open(path, 'wb') as f:
+            f.write(data)
+
+
 def config_path(path):
+    import argparse
     if not path or path == 'None':
         return None
     # replace ~ with /home/user
@@ -74,25 +118,76 @@ class DefaultConfig(object):
     """Class to hold and load the global configurations."""
 
     keys_not_to_fill_up = set()
+    # optional yaml_configuration.snapshot.SnapshotCache used by load() to skip parsing unchanged config files
+    snapshot_cache = None
+    # optional yaml_configuration.writer.WriteBehindWriter, see enable_write_behind()
+    write_behind_writer = None
+    # whether write_behind_writer has been created by enable_write_behind() and is closed by close()
+    _owns_write_behind_writer = False
+    # if True, load() only indexes the top level keys of the config file and constructs their values on first access
+    lazy_load = False
+    # if True, strings are interned and default values shared between instances, see compact()
+    compact_storage = False
+    # yaml_configuration.instrumentation.ConfigInstrumentation, see enable_instrumentation()
+    instrumentation = None
+    # if True, the config file may be saved by several processes, which creates a .lock file next to it, see
+    # save_configuration()
+    shared_file = False
+    # if True, save_configuration() only rewrites the changed values of a yaml config file, keeping comments
+    splice_save = False
+    # if True, spliced saves write only the changed bytes into the config file instead of replacing it atomically. A
+    # crash or an error while writing can leave a partially written config file behind.
+    splice_in_place = False
 
     def __init__(self,
                  default_config,
                  logger_object=None,
                  rel_config_path='yaml_configuration',
-                 keys_to_not_fill_up=None):
+                 keys_to_not_fill_up=None,
+                 backend=None):
         self.logger = logger_object
         self.rel_config_path = rel_config_path
         if logger_object is None:
+            import logging
             self.logger = logging.getLogger(__name__)
         assert isinstance(default_config, str)
         self.config_file_path = None
         self.default_config = default_config
         self.path = None
+        # the format of the config file: None for yaml, a yaml_configuration.backends.Backend, its name, or 'auto' to
+        # select it by the extension of the config file
+        self.backend = backend
 
-        if not default_config:
-            self._config_dict = {}
+        # The published configuration is never modified in place: writers hold the write lock, build a new dict
+        # (copying only the dicts along the modified path) and publish it together with a new snapshot.
+        self._write_lock = threading.RLock()
+        # guards publishing the path index built by readers, which must not wait for writers, e.g. a transaction
+        self._index_lock = threading.Lock()
+        # serializes writing the config file, which is done without the write lock by save_configuration(), see
+        # _save_file()
+        self._save_lock = threading.Lock()
+        if self.compact_storage:
+            self._config_dict = default_config_cache.compact(self.default_config)
         else:
-            self._config_dict = yaml.load(self.default_config, Loader=FullLoader)
+            self._config_dict = default_config_cache.copy(self.default_config)
+        self._snapshot = ConfigSnapshot(0, self._config_dict)
+        self._path_index = None
+        # optional source of top level values that are not yet part of _config_dict, e.g. a shared memory reader
+        self._lazy_source = None
+        self._shared_publisher = None
+        self._change_callbacks = []
+        self._watcher = None
+        self._async_saver = None
+        self._compiled = None
+        # the yaml_configuration.transaction.ConfigTransaction in progress, see transaction()
+        self._transaction = None
+        # the paths (tuples of keys) set since the config file has been loaded or saved
+        self._changed_paths = set()
+        # the configuration and the stat of the config file when it was loaded or saved, used by shared_file
+        self._file_config_dict = None
+        self._file_version = None
+        # the yaml_configuration.splice.YamlLayout of the config file, used by splice_save, see _set_layout()
+        self._layout = None
 
         if keys_to_not_fill_up:
             if isinstance(keys_to_not_fill_up, str):
@@ -105,19 +200,48 @@ class DefaultConfig(object):
                         "Given keys_not_to_fill_up is not iterable. Ignoring given parameter"
                         f": {e}")
 
+    def __getstate__(self):
+        # locks, threads, shared memory and callbacks cannot be pickled and are not transferred
+        state = self.__dict__.copy()
+        state['_config_dict'] = self._materialize()
+        state['_snapshot'] = self._snapshot.version
+        for name in ('_write_lock', '_index_lock', '_save_lock', '_path_index', '_lazy_source', '_shared_publisher',
+                     '_watcher', '_async_saver', '_compiled', '_transaction', '_layout', 'write_behind_writer',
+                     'instrumentation', 'get_config_value', 'set_config_value'):
+            state.pop(name, None)
+        state['_change_callbacks'] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._write_lock = threading.RLock()
+        self._index_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._snapshot = ConfigSnapshot(state['_snapshot'], self._config_dict)
+        self._path_index = None
+        self._lazy_source = None
+        self._shared_publisher = None
+        self._watcher = None
+        self._async_saver = None
+        self._compiled = None
+        self._transaction = None
+        self._layout = None
+
     def get_all_keys(self):
         """ Hand list of keys
 
         :return: All keys of the config dictionary
         :rtype: list
         """
-        return list(self._config_dict.keys())
+        config_dict = self._config_dict
+        lazy_source = self._lazy_source
+        if lazy_source is None:
+            return list(config_dict.keys())
+        return list(config_dict.keys()) + [key for key in lazy_source.keys() if key not in config_dict]
 
     def load(self, config_file, path=None, update_dictionaries=True):
+        path = self.resolve_path(path)
         try:
-            if path is None:
-                path = os.path.join(os.path.expanduser('~'), '.config', self.rel_config_path)
-
             if not os.path.exists(path):
                 self.logger.warn(
                     'No configuration found at {0}, using temporary default config and create path on file'
@@ -125,100 +249,1028 @@ class DefaultConfig(object):
                 os.makedirs(path)
 
             config_file_path = os.path.join(path, config_file)
-
-            # If no config file is found, create one in the desired directory
-            if not os.path.isfile(config_file_path):
-                try:
-                    default_config_dict = yaml.load(self.default_config, Loader=FullLoader) if self.default_config \
-                        else {}
-                    write_dict_to_yaml(default_config_dict,
-                                       config_file_path,
-                                       width=80,
-                                       default_flow_style=False)
-                    self.config_file_path = config_file_path
-                    self.logger.debug("Created config file {0}".format(config_file_path))
-                except Exception as e:
-                    self.logger.error(
-                        'Could not write to config {0}, using temporary default configuration. '
-                        'Error: {1}'.format(config_file_path, e))
-            # Otherwise read the config file from the specified directory
-            else:
-                try:
-                    self._config_dict = load_dict_from_yaml(config_file_path)
-                    self.config_file_path = config_file_path
-                    self.logger.debug("Configuration loaded from {0}".format(
-                        os.path.abspath(config_file_path)))
-                except Exception as e:
-                    self.logger.error(
-                        'Could not read from config {0}, using temporary default configuration. '
-                        'Error: {1}'.format(config_file_path, e))
-
-                # Check if all attributes of the default config exists and introduce them if missing
-                default_config_dict = yaml.load(self.default_config,
-                                                Loader=FullLoader) if self.default_config else {}
-                value_changed = False
-                for config_key, default_value in default_config_dict.items():
-                    if config_key in self._config_dict:
-                        if config_key not in self.keys_not_to_fill_up:
-                            # fill dict and list values
-                            if isinstance(default_value, dict):
-                                self._config_dict[config_key].update(
-                                    (k, v) for k, v in default_value.items()
-                                    if k not in self._config_dict[config_key])
-                                value_changed = True
-                            if isinstance(default_value, list):
-                                for element in default_value:
-                                    if element not in self._config_dict[config_key]:
-                                        self._config_dict[config_key].append(element)
-                                        value_changed = True
-                    else:
-                        self.logger.info(
-                            "{0} use default-config-file parameter '{1}': {2}.".format(
-                                type(self).__name__, config_key, default_value))
-                        self._config_dict[config_key] = default_value
-                        value_changed = True
-                if value_changed:
-                    self.logger.info("The config has been updated by the default config "
-                                     "and is saved to disk (path: {}).".format(
-                                         str(self.config_file_path)))
-                    self.save_configuration()
-
+            self._load_file(config_file_path, os.path.isfile(config_file_path))
         finally:
             if not isinstance(self._config_dict, dict):  # Ensure config_dict is always a dict
-                self._config_dict = {}
+                with self._write_lock:
+                    self._publish({})
 
         self.path = path
 
+    def resolve_path(self, path=None):
+        """Returns the directory of the config file used by :meth:`load`
+
+        :param str path: the directory passed to load, None for the default directory below ``~/.config``
+        :rtype: str
+        """
+        if path is None:
+            path = os.path.join(os.path.expanduser('~'), '.config', self.rel_config_path)
+        return path
+
+    def _load_file(self, config_file_path, file_exists):
+        """Loads the config file from an existing directory or creates it from the default config
+
+        :param str config_file_path: the path of the config file
+        :param bool file_exists: whether the config file exists
+        """
+        # If no config file is found, create one in the desired directory
+        if not file_exists:
+            try:
+                self._write_config_file(default_config_cache.get(self.default_config), config_file_path,
+                                        atomic=self.shared_file)
+                self.config_file_path = config_file_path
+                self.logger.debug("Created config file {0}".format(config_file_path))
+                with self._write_lock:
+                    self._loaded(self._materialize(), self._stat_config_file(config_file_path))
+            except Exception as e:
+                self.logger.error(
+                    'Could not write to config {0}, using temporary default configuration. '
+                    'Error: {1}'.format(config_file_path, e))
+        # Otherwise read the config file from the specified directory
+        else:
+            previous_config_file_path = self.config_file_path
+            lazy_source = None
+            layout = None
+            file_version = self._stat_config_file(config_file_path) if self.shared_file or self.splice_save else None
+            try:
+                if self.lazy_load and not self.shared_file and self._get_backend(config_file_path).name == 'yaml':
+                    lazy_source = self._read_config_file(config_file_path, lazy=True)
+                    config_dict = {}
+                elif self._splices(config_file_path):
+                    layout, config_dict = self._read_config_layout(config_file_path)
+                    layout.version = file_version
+                else:
+                    config_dict = self._read_config_file(config_file_path)
+                self.config_file_path = config_file_path
+                self.logger.debug("Configuration loaded from {0}".format(
+                    os.path.abspath(config_file_path)))
+            except Exception as e:
+                if self.backend is not None:
+                    # a file of an explicitly selected format that cannot be parsed is most likely of another format
+                    raise ConfigError("Could not read config {0} as {1}: {2}".format(
+                        config_file_path, self._get_backend(config_file_path).name, e))
+                self.logger.error(
+                    'Could not read from config {0}, using temporary default configuration. '
+                    'Error: {1}'.format(config_file_path, e))
+                config_dict = copy_tree(self._materialize())
+
+            # Check if all attributes of the default config exists and introduce them if missing
+            default_config_dict = self._default_config_dict()
+            if not isinstance(config_dict, dict):
+                config_dict = {}
+            if lazy_source is not None:
+                default_config_dict = self._lazy_fill_up_defaults(lazy_source, config_dict, default_config_dict)
+            added_paths = self._fill_up(config_dict, default_config_dict)
+            if self.compact_storage:
+                config_dict = self._compact_tree(config_dict)
+            with self._write_lock:
+                try:
+                    self._publish(config_dict, lazy_source=lazy_source)
+                except ConfigError as e:
+                    # the file does not match the compiled configuration, it is ignored like an unreadable file
+                    self.config_file_path = previous_config_file_path
+                    self.logger.error('Invalid config {0}, keeping the current configuration. '
+                                      'Error: {1}'.format(config_file_path, e))
+                    return
+                self._loaded(config_dict, file_version)
+                self._set_layout(layout)
+                # the filled up values have to be written by the following save
+                self._changed_paths.update(dict_path(config_dict, added_path) for added_path in added_paths)
+            for added_path in added_paths:
+                self.logger.info(
+                    "{0} use default-config-file parameter '{1}'.".format(
+                        type(self).__name__, ".".join(str(key) for key in added_path)))
+            value_changed = bool(added_paths)
+            if value_changed:
+                self.logger.info("The config has been updated by the default config "
+                                 "and is saved to disk (path: {}).".format(
+                                     str(self.config_file_path)))
+                self.save_configuration()
+
+    def _lazy_fill_up_defaults(self, lazy_source, config_dict, default_config_dict):
+        """Constructs the lazily loaded values that need to be filled up by their defaults
+
+        :param lazy_source: the lazily loaded config file
+        :param dict config_dict: the dict receiving the constructed values
+        :param dict default_config_dict: the default configuration
+        :return: the defaults that have to be passed to the fill up
+        :rtype: dict
+        """
+        for key, default_value in default_config_dict.items():
+            if key in lazy_source and key not in self.keys_not_to_fill_up and \
+                    isinstance(default_value, (dict, list, tuple)):
+                config_dict[key] = lazy_source.get(key)
+        return {key: default_value for key, default_value in default_config_dict.items()
+                if key in config_dict or key not in lazy_source}
+
+    def _get_backend(self, config_file_path):
+        """Returns the serialization format of a config file
+
+        :param str config_file_path: the path of the config file
+        :rtype: yaml_configuration.backends.Backend
+        """
+        from yaml_configuration.backends import YamlBackend, get_backend
+        backend = get_backend(self.backend, config_file_path)
+        if self.compact_storage and backend.name == 'yaml':
+            # compact storage shares the lists of the defaults as tuples, which have to be written as lists
+            backend = YamlBackend(tuples_as_lists=True)
+        return backend
+
+    def _read_config_file(self, config_file_path, lazy=False):
+        """Reads and parses a config file, measuring both phases if instrumentation is enabled
+
+        :param str config_file_path: the path of the config file
+        :param bool lazy: if True, a :class:`~yaml_configuration.lazy.LazyYamlDocument` is returned, which requires
+            a yaml config file
+        :return: the content of the config file
+        """
+        if lazy:
+            from yaml_configuration.lazy import LazyYamlDocument
+        backend = self._get_backend(config_file_path)
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            if lazy:
+                return LazyYamlDocument.from_file(config_file_path)
+            if self.snapshot_cache is not None:
+                return self.snapshot_cache.load(config_file_path, backend.load)
+            return backend.load(config_file_path)
+        if self.snapshot_cache is not None and not lazy:
+            # reading and unpickling a snapshot cannot be told apart
+            with instrumentation.timer('parse', config_file_path):
+                return self.snapshot_cache.load(config_file_path, backend.load)
+        with instrumentation.timer('read', config_file_path) as timer:
+            with open(config_file_path, 'rb') as f:
+                data = f.read()
+            timer.bytes = len(data)
+        with instrumentation.timer('parse', config_file_path):
+            if lazy:
+                return LazyYamlDocument(data.decode('utf-8'))
+            return backend.loads(data)
+
+    def _read_config_layout(self, config_file_path):
+        """Reads a yaml config file and records the positions of its values, which are used by :attr:`splice_save`
+
+        :param str config_file_path: the path of the config file
+        :return: the :class:`~yaml_configuration.splice.YamlLayout` and the content of the config file
+        :rtype: tuple
+        """
+        from yaml_configuration.splice import YamlLayout
+        _yaml()
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            with open(config_file_path, 'rb') as f:
+                return YamlLayout.load(f.read().decode('utf-8'), FullLoader)
+        with instrumentation.timer('read', config_file_path) as timer:
+            with open(config_file_path, 'rb') as f:
+                data = f.read()
+            timer.bytes = len(data)
+        with instrumentation.timer('parse', config_file_path):
+            return YamlLayout.load(data.decode('utf-8'), FullLoader)
+
+    def _write_config_file(self, dictionary, config_file_path, atomic=False, keep_data=False):
+        """Serializes and writes a configuration, measuring both phases if instrumentation is enabled
+
+        :param dict dictionary: the configuration to be written
+        :param str config_file_path: the path of the config file
+        :param bool atomic: if True, the file is replaced by renaming a temporary file
+        :param bool keep_data: if True, the configuration is serialized into memory and returned
+        :return: the written data, None if it has been streamed to the file
+        :rtype: bytes
+        """
+        backend = self._get_backend(config_file_path)
+        instrumentation = self.instrumentation
+        if instrumentation is None and not atomic and not keep_data:
+            backend.dump(dictionary, config_file_path)
+            return None
+        if instrumentation is None:
+            data = backend.dumps(dictionary)
+        else:
+            with instrumentation.timer('serialize', config_file_path):
+                data = backend.dumps(dictionary)
+        directory = os.path.dirname(config_file_path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        if instrumentation is None:
+            _write_data(config_file_path, data, atomic)
+        else:
+            with instrumentation.timer('write', config_file_path, len(data)):
+                _write_data(config_file_path, data, atomic)
+        return data
+
+    def _fill_up(self, config_dict, default_config_dict):
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return fill_up(config_dict, default_config_dict, self.keys_not_to_fill_up, share=self.compact_storage)
+        with instrumentation.timer('merge', self.config_file_path):
+            return fill_up(config_dict, default_config_dict, self.keys_not_to_fill_up, share=self.compact_storage)
+
+    def _default_config_dict(self):
+        """Returns the shared default configuration used to fill up the config file"""
+        if self.compact_storage:
+            return default_config_cache.compact(self.default_config)
+        return default_config_cache.get(self.default_config)
+
+    def _compact_tree(self, config_dict):
+        from yaml_configuration.compact import compact_tree
+        return compact_tree(config_dict, default_config_cache.compact(self.default_config))
+
     def get_config_value(self, key, default=None):
         """Get a specific configuration value
 
-        :param key: the key to the configuration value
+        Nested values can be addressed by a dotted path like ``"DB.pool.size"``, see :mod:`yaml_configuration.paths`
+        for escaping dots within keys. A top level key containing dots takes precedence over a path.
+
+        :param key: the key or dotted path to the configuration value
         :param default: what to return if the key is not found
         :return: The value for the given key, if the key was found. Otherwise the default value
         """
-        if key in self._config_dict:
-            return self._config_dict[key]
+        config_dict = self._config_dict
+        if key in config_dict:
+            return config_dict[key]
+        lazy_source = self._lazy_source
+        if lazy_source is not None and key in lazy_source:
+            return lazy_source.get(key)
+        if isinstance(key, str) and '.' in key:
+            path_index = self._path_index
+            if path_index is None:
+                path_index = self._build_path_index(config_dict)
+            value = path_index.get(key, MISSING)
+            if value is not MISSING:
+                return value
+            if lazy_source is not None:
+                return self._get_lazy_path(lazy_source, key, default)
         return default
 
     def set_config_value(self, key, value):
-        """Get a specific configuration value
+        """Set a specific configuration value
 
-        :param key: the key to the configuration value
+        Nested values can be addressed by a dotted path like ``"DB.pool.size"``, missing intermediate dicts are
+        created. The configuration is not modified in place, but published as a new version. Values returned by
+        :meth:`get_config_value` must therefore not be modified directly, use this method instead.
+
+        :param key: the key or dotted path to the configuration value
         :param value: The new value to be set for the given key
         """
-        self._config_dict[key] = value
+        transaction = self._transaction
+        if transaction is not None and transaction.active:
+            transaction.set_config_value(key, value)
+            return
+        with self._write_lock:
+            config_dict = dict(self._config_dict)
+            if key in config_dict or not isinstance(key, str) or '.' not in key:
+                path = (key,)
+            else:
+                path = split_path(key)
+            lazy_source = self._lazy_source
+            if lazy_source is not None and len(path) > 1 and path[0] not in config_dict and path[0] in lazy_source:
+                config_dict[path[0]] = lazy_source.get(path[0])
+            parent = config_dict
+            # existing non-string keys are addressed by their str form, so the path is resolved while walking it
+            resolved_path = []
+            for depth, path_key in enumerate(path[:-1]):
+                path_key = resolve_key(parent, path_key)
+                resolved_path.append(path_key)
+                child = parent.get(path_key)
+                if child is None and path_key not in parent:
+                    child = {}
+                elif not isinstance(child, dict):
+                    raise ConfigError("Cannot set {0}, {1} is not a dictionary".format(
+                        key, join_path(path[:depth + 1])))
+                else:
+                    child = dict(child)
+                parent[path_key] = child
+                parent = child
+            resolved_path.append(resolve_key(parent, path[-1]))
+            path = tuple(resolved_path)
+            old_value = parent.get(path[-1])
+            parent[path[-1]] = value
+            if self._compiled is not None:
+                # reject invalid values before the path index is updated
+                self._compiled._check(config_dict)
+            path_index = self._path_index
+            if path_index is not None:
+                # the published index is not modified, the updated copy shares the entries of the other keys
+                path_index = path_index.update(path, config_dict[path[0]], old_value)
+            self._publish(config_dict, path_index, lazy_source)
+            self._changed_paths.add(path)
+
+    @property
+    def config_version(self):
+        """The version number of the configuration, which is increased with every change"""
+        return self._snapshot.version
+
+    def snapshot(self):
+        """Returns the current configuration as immutable snapshot
+
+        The snapshot is a read-only mapping that stays unchanged when the configuration is modified afterwards.
+        Taking a snapshot neither copies the configuration nor acquires a lock.
+
+        :rtype: yaml_configuration.frozen.ConfigSnapshot
+        """
+        if self._lazy_source is not None:
+            self._materialize()
+        return self._snapshot
+
+    def compile(self, schema=None):
+        """Returns an object providing the configuration values as attributes
+
+        The class of the object is generated from the structure of the default config, see
+        :func:`~yaml_configuration.compiled.compile_config`. The types of the values are checked against the types of
+        the default values (or the given schema) now and whenever the configuration changes afterwards, e.g. by
+        :meth:`set_config_value` or :meth:`reload`. Changes with invalid types are rejected with a
+        :class:`ConfigError`. The returned object is never modified, each change publishes a new one as
+        :attr:`compiled`, which shares the nested objects of the unchanged values. So a kept object is a consistent
+        view of one version of the configuration, hot code that has to follow the changes reads :attr:`compiled`.
+
+        :param dict schema: expected types by dotted path, overriding the types of the default values
+        :rtype: yaml_configuration.compiled.CompiledConfig
+        :raises ConfigError: if the current configuration does not match the types
+        """
+        from yaml_configuration.compiled import compile_config
+        compiled_class = compile_config(default_config_cache.get(self.default_config),
+                                        type(self).__name__ + 'Values', schema)
+        with self._write_lock:
+            compiled = compiled_class(self._materialize())
+            self._compiled = compiled
+        return compiled
+
+    @property
+    def compiled(self):
+        """The object representing the current configuration, see :meth:`compile`, None if it has not been compiled
+
+        :rtype: yaml_configuration.compiled.CompiledConfig
+        """
+        return self._compiled
+
+    def compact(self):
+        """Switches to compact storage and compacts the current configuration
+
+        Keys and string values are interned and values that equal their default are shared with all other
+        configurations using the same defaults. Values must never be modified in place. The shared lists of the
+        defaults are stored as tuples, which enforces this, all other lists are kept as they are.
+        """
+        with self._write_lock:
+            self.compact_storage = True
+            self._publish(self._compact_tree(self._materialize()))
+
+    def memory_report(self):
+        """Estimates the memory used by the configuration values of this instance
+
+        :return: see :func:`~yaml_configuration.compact.memory_report`, ``saved_bytes`` are the bytes saved by
+            sharing values with the defaults and by interning strings
+        :rtype: dict
+        """
+        from yaml_configuration.compact import memory_report
+        shared_tree = default_config_cache.compact(self.default_config) if self.compact_storage else None
+        return memory_report(self._materialize(), shared_tree)
+
+    def transaction(self, save=True):
+        """Returns a context manager applying all changes made within its block at once
+
+        ``with config.transaction():`` stages all :meth:`set_config_value` calls of the current thread. When the block
+        exits, the changes are published as one new version and saved by a single serialization and atomic write.
+        Readers see either all changes or none. If the block raises an exception, the changes are discarded. Staged
+        values are returned by the ``get_config_value()`` of the transaction.
+
+        :param bool save: if True, the configuration is saved when the transaction is committed
+        :rtype: yaml_configuration.transaction.ConfigTransaction
+        """
+        from yaml_configuration.transaction import ConfigTransaction
+        transaction = self._transaction
+        if transaction is not None and transaction.active:
+            # nested transactions are part of the outer one
+            return transaction
+        return ConfigTransaction(self, save)
+
+    def _commit_transaction(self, config_dict, changed_paths, save):
+        """Publishes and saves the result of a transaction, the caller must hold the write lock
+
+        :param dict config_dict: the new configuration
+        :param changed_paths: the paths (tuples of keys) of the modified values
+        :param bool save: if True, the configuration is saved
+        :raises ConfigError: if the configuration does not match the types of :meth:`compile`
+        :raises ConfigConflictError: if the config file is shared and another process changed the same values
+        """
+        if self._compiled is not None:
+            self._compiled._check(config_dict)
+        path_index = self._path_index
+        if path_index is not None:
+            # the published index is not modified, readers could see some of the changes before the others
+            for key in {path[0] for path in changed_paths}:
+                path_index = path_index.replace(key, config_dict.get(key))
+        save = save and self.config_file_path
+        if save and self.shared_file:
+            self._save_shared(config_dict, path_index, self._changed_paths.union(changed_paths))
+            return
+        if save and self.write_behind_writer is None:
+            # the file is written before publishing, so a failed write leaves both unchanged
+            with self._save_lock:
+                self._save_file(config_dict, self._changed_paths.union(changed_paths), atomic=True)
+            self.logger.debug("Saved configuration to {0}".format(self.config_file_path))
+        self._publish(config_dict, path_index)
+        if not save:
+            self._changed_paths.update(changed_paths)
+        elif self.write_behind_writer is None:
+            self._changed_paths = set()
+        else:
+            self.save_configuration()
+
+    def invalidate_path_index(self):
+        """Discards the index of dotted paths, which is rebuilt on the next lookup of a path
+
+        Needs to be called after nested dicts have been modified directly instead of by :meth:`set_config_value`.
+        """
+        self._path_index = None
+
+    def _build_path_index(self, config_dict):
+        path_index = PathIndex.build(config_dict)
+        with self._index_lock:
+            if self._config_dict is config_dict and self._path_index is None:
+                self._path_index = path_index
+        return path_index
+
+    def _publish(self, config_dict, path_index=None, lazy_source=None):
+        """Makes config_dict the current configuration, the caller must hold the write lock
+
+        :param dict config_dict: the new configuration, which must not be modified anymore
+        :param yaml_configuration.paths.PathIndex path_index: the path index of config_dict, None if it has to be
+            rebuilt
+        :param lazy_source: source of the top level values missing in config_dict
+        """
+        compiled = self._compiled
+        if compiled is not None:
+            if lazy_source is not None:
+                # the compiled values need the complete configuration
+                complete_dict = dict(lazy_source.items())
+                complete_dict.update(config_dict)
+                config_dict, path_index, lazy_source = complete_dict, None, None
+            # the values are checked before anything is published, so invalid values are rejected
+            compiled._check(config_dict)
+            compiled = compiled._updated(config_dict)
+        snapshot = ConfigSnapshot(self._snapshot.version + 1, config_dict)
+        with self._index_lock:
+            self._path_index = path_index
+            self._lazy_source = lazy_source
+            self._config_dict = config_dict
+        self._snapshot = snapshot
+        # replaced as a whole, so readers never see some of the changes without the others
+        self._compiled = compiled
+
+    def _materialize(self):
+        """Fetches all values of the lazy source into the published configuration
+
+        :return: the complete configuration
+        :rtype: dict
+        """
+        with self._write_lock:
+            lazy_source = self._lazy_source
+            if lazy_source is not None:
+                config_dict = dict(lazy_source.items())
+                config_dict.update(self._config_dict)
+                self._publish(config_dict)
+            return self._config_dict
+
+    @staticmethod
+    def _get_lazy_path(lazy_source, key, default):
+        path = split_path(key)
+        if path[0] not in lazy_source:
+            return default
+        value = lazy_source.get(path[0])
+        for path_key in path[1:]:
+            if not isinstance(value, dict) or path_key not in value:
+                return default
+            value = value[path_key]
+        return value
 
     def save_configuration(self):
-        if self.config_file_path:
-            write_dict_to_yaml(self._config_dict,
-                               self.config_file_path,
-                               width=80,
-                               default_flow_style=False)
+        """Writes the configuration to the config file
+
+        If :attr:`shared_file` is set, the config file may be saved by several processes. The file is locked while it
+        is written, using a ``<config file>.lock`` file next to it that is kept, and only the values set since it was
+        loaded or saved are written. If another process saved the file meanwhile, its content is re-read and merged
+        with these values, which are published as a new version. The write-behind mode is not used in this case.
+
+        :raises ConfigConflictError: if the config file is shared and another process changed one of the values set
+            by this one. Nothing is written in this case, :meth:`reload` discards the local changes.
+        """
+        if self._lazy_source is not None:
+            self._materialize()
+        if self.config_file_path and self.shared_file:
+            with self._write_lock:
+                config_dict = self._config_dict
+                path_index = self._path_index
+                changed_paths, self._changed_paths = self._changed_paths, set()
+                file_config_dict, file_version = self._file_config_dict, self._file_version
+                self._save_lock.acquire()
+            # the file lock may be held by another process for a while, so it is waited for without blocking the
+            # writers of this process
+            try:
+                merged, file_version = self._write_shared(config_dict, changed_paths, file_config_dict, file_version)
+            except Exception:
+                self._save_lock.release()
+                with self._write_lock:
+                    self._changed_paths.update(changed_paths)
+                raise
+            self._save_lock.release()
+            with self._write_lock:
+                published = merged
+                if merged is not config_dict:
+                    path_index = None
+                    if self._config_dict is not config_dict:
+                        # the values set while the file was written are kept on top of it, the next save writes them
+                        published, _ = three_way_merge(merged, self._config_dict, merged, self._changed_paths)
+                elif self._config_dict is not config_dict:
+                    published = self._config_dict
+                    path_index = self._path_index
+                self._publish_saved(published, path_index, merged, file_version)
+        elif self.config_file_path and self.write_behind_writer is not None:
+            # published configurations are never modified in place, so they can be written without copying them
+            backend = self._get_backend(self.config_file_path)
+            self.write_behind_writer.submit(self.config_file_path, self._config_dict,
+                                            None if backend.name == 'yaml' and not self.compact_storage
+                                            else backend.dumps)
+            self.logger.debug("Scheduled saving configuration to {0}".format(self.config_file_path))
+            self._changed_paths = set()
+            self._set_layout(None)
+        elif self.config_file_path:
+            with self._write_lock:
+                config_dict = self._config_dict
+                changed_paths, self._changed_paths = self._changed_paths, set()
+                # acquired before the write lock is released, so the saves are written in the order of their
+                # configurations
+                self._save_lock.acquire()
+            # the published configuration is never modified, so it is written without blocking the writers
+            try:
+                self._save_file(config_dict, changed_paths)
+            except Exception:
+                self._save_lock.release()
+                with self._write_lock:
+                    # the values have to be written by the next save
+                    self._changed_paths.update(changed_paths)
+                raise
+            self._save_lock.release()
             self.logger.debug("Saved configuration to {0}".format(self.config_file_path))
         else:
             self.logger.warning("The config_file_path needs to be set for {0}".format(
                 self.__class__.__name__))
 
+    def _save_shared(self, config_dict, path_index, changed_paths):
+        """Merges the changed values into the config file and publishes the result, the caller must hold the write lock
+
+        :param dict config_dict: the configuration to be saved
+        :param yaml_configuration.paths.PathIndex path_index: the path index of config_dict
+        :param set changed_paths: the paths of the values set since the file has been loaded or saved
+        :raises ConfigConflictError: if another process changed one of the changed values
+        """
+        with self._save_lock:
+            merged, file_version = self._write_shared(config_dict, changed_paths, self._file_config_dict,
+                                                      self._file_version)
+        self._changed_paths = set()
+        self._publish_saved(merged, path_index if merged is config_dict else None, merged, file_version)
+
+    def _write_shared(self, config_dict, changed_paths, file_config_dict, file_version):
+        """Merges the changed values into the config file, which may be saved by other processes
+
+        The caller must hold the save lock, but not necessarily the write lock. The file lock is only held while the
+        file is compared, re-read and written.
+
+        :param dict config_dict: the configuration to be saved
+        :param set changed_paths: the paths of the values set since the file has been loaded or saved
+        :param dict file_config_dict: the content of the config file when it was loaded or saved
+        :param file_version: the stat of the config file when it was loaded or saved
+        :return: the written configuration, which is config_dict unless the changes of another process have been
+            merged, and the stat of the written file
+        :rtype: tuple
+        :raises ConfigConflictError: if another process changed one of the changed values
+        """
+        config_file_path = self.config_file_path
+        with FileLock(config_file_path):
+            current_version = self._stat_config_file(config_file_path)
+            merged = config_dict
+            if current_version != file_version and current_version is not None:
+                their_config_dict = self._read_config_file(config_file_path)
+                if not isinstance(their_config_dict, dict):
+                    their_config_dict = {}
+                self._fill_up(their_config_dict, self._default_config_dict())
+                if self.compact_storage:
+                    their_config_dict = self._compact_tree(their_config_dict)
+                base = file_config_dict if file_config_dict is not None else {}
+                merged, conflicts = three_way_merge(base, config_dict, their_config_dict, changed_paths)
+                if conflicts:
+                    raise ConfigConflictError(config_file_path, conflicts)
+                self.logger.debug("Merged {0} changed value(s) into {1}, which has been saved by another "
+                                  "process".format(len(changed_paths), config_file_path))
+                if self._compiled is not None:
+                    self._compiled._check(merged)
+            self._save_file(merged, changed_paths, atomic=True)
+            file_version = self._stat_config_file(config_file_path)
+        self.logger.debug("Saved configuration to {0}".format(config_file_path))
+        return merged, file_version
+
+    def _publish_saved(self, config_dict, path_index, file_config_dict, file_version):
+        """Publishes a configuration after the shared config file has been saved, the caller must hold the write lock
+
+        :param dict config_dict: the configuration to be published
+        :param yaml_configuration.paths.PathIndex path_index: the path index of config_dict, None to rebuild it
+        :param dict file_config_dict: the content of the saved config file
+        :param file_version: the stat of the saved config file, see :meth:`_stat_config_file`
+        """
+        # unlike _loaded, the changed paths are kept, they may have been set while the file was written
+        self._file_config_dict = file_config_dict
+        self._file_version = file_version
+        old_config_dict = self._config_dict
+        if config_dict is not old_config_dict:
+            changes = diff(old_config_dict, config_dict)
+            self._publish(config_dict, path_index)
+            if changes:
+                self._notify_change_callbacks(changes)
+
+    def _splices(self, config_file_path):
+        """Whether only the changed values of the config file are rewritten, see :attr:`splice_save`"""
+        return self.splice_save and self._get_backend(config_file_path).name == 'yaml'
+
+    def _save_file(self, config_dict, changed_paths, atomic=False):
+        """Writes the configuration to the config file, the caller must hold the save lock
+
+        If :attr:`splice_save` is set, only the changed values are replaced in the text of the config file, see
+        :class:`~yaml_configuration.splice.YamlLayout`. The whole configuration is dumped instead if values have been
+        added or removed, or if the file has been modified by someone else. Spliced files are replaced atomically
+        unless :attr:`splice_in_place` is set.
+
+        :param dict config_dict: the configuration to be saved
+        :param changed_paths: the paths (tuples of keys) of the values set since the file has been loaded or saved
+        :param bool atomic: if True, the file is replaced by renaming a temporary file
+        """
+        config_file_path = self.config_file_path
+        if not self._splices(config_file_path):
+            self._write_config_file(config_dict, config_file_path, atomic)
+            return
+        from yaml_configuration.splice import YamlLayout
+        layout, self._layout = self._layout, None
+        instrumentation = self.instrumentation
+        splice = None
+        if layout is not None and layout.version == self._stat_config_file(config_file_path):
+            dumper = self._get_backend(config_file_path).dumper()
+            if instrumentation is None:
+                splice = layout.splice(config_dict, changed_paths, dumper)
+            else:
+                with instrumentation.timer('serialize', config_file_path):
+                    splice = layout.splice(config_dict, changed_paths, dumper)
+        if splice is None:
+            data = self._write_config_file(config_dict, config_file_path, atomic, keep_data=True)
+            layout = YamlLayout(data.decode('utf-8'), FullLoader)
+        else:
+            atomic = atomic or not self.splice_in_place
+            if instrumentation is None:
+                splice.write(config_file_path, atomic)
+            else:
+                with instrumentation.timer('write', config_file_path) as timer:
+                    timer.bytes = splice.write(config_file_path, atomic)
+        layout.version = self._stat_config_file(config_file_path)
+        self._layout = layout
+
+    def _set_layout(self, layout):
+        """Replaces the layout of the config file
+
+        The layout is only accessed under the save lock, so a layout set while a save is written is not overwritten by
+        the layout of that save.
+        """
+        with self._save_lock:
+            self._layout = layout
+
+    def _loaded(self, config_dict, file_version):
+        """Makes config_dict the base of the next save, the caller must hold the write lock
+
+        :param dict config_dict: the configuration that has been loaded or saved
+        :param file_version: the stat of the config file, see :meth:`_stat_config_file`
+        """
+        self._changed_paths = set()
+        if self.shared_file:
+            self._file_config_dict = config_dict
+            self._file_version = file_version
+
+    @staticmethod
+    def _stat_config_file(config_file_path):
+        """Returns the inode, size and modification time of a config file, None if it does not exist
+
+        Config files are saved by renaming a new file, so every save changes the inode.
+        """
+        try:
+            stat = os.stat(config_file_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def aload(self, config_file, path=None, update_dictionaries=True, executor=None):
+        """Coroutine loading the configuration without blocking the event loop
+
+        Reading, parsing and saving are done by :meth:`load` in the executor, so change callbacks and logging are
+        called from an executor thread.
+
+        :param executor: a :class:`concurrent.futures.Executor`, None uses the default executor of the event loop
+        """
+        from yaml_configuration.aio import aload
+        return aload(self, config_file, path, update_dictionaries, executor)
+
+    def asave(self, executor=None, window=0.):
+        """Coroutine saving the configuration without blocking the event loop
+
+        Saves are serialized. Calls made while a save is waiting to be started are merged into it and all return when
+        the merged save has been written.
+
+        :param executor: a :class:`concurrent.futures.Executor`, None uses the default executor of the event loop
+        :param float window: time in seconds to wait for further saves before writing
+        """
+        with self._write_lock:
+            if self._async_saver is None:
+                from yaml_configuration.aio import AsyncSaver
+                self._async_saver = AsyncSaver(self.save_configuration)
+        self._async_saver.window = window
+        return self._async_saver.save(executor)
+
+    def areload(self, executor=None):
+        """Coroutine reloading the configuration without blocking the event loop, see :meth:`reload`
+
+        :param executor: a :class:`concurrent.futures.Executor`, None uses the default executor of the event loop
+        """
+        from yaml_configuration.aio import areload
+        return areload(self, executor)
+
+    def enable_write_behind(self, window=0.05, fsync=False, writer=None):
+        """Let save_configuration() write the configuration in a background thread
+
+        Saves issued within window seconds are merged into a single atomic write. Use :meth:`flush` to wait until the
+        configuration is on disk.
+
+        :param float window: time in seconds to wait for further saves before writing
+        :param bool fsync: if True, the data is flushed to disk before the file is renamed
+        :param writer: an existing :class:`~yaml_configuration.writer.WriteBehindWriter` to be shared by several
+            configurations, window and fsync are ignored in this case. A shared writer is only flushed by
+            :meth:`close`, closing it is up to the caller.
+        """
+        from yaml_configuration.writer import WriteBehindWriter
+        self._owns_write_behind_writer = writer is None
+        if writer is None:
+            writer = WriteBehindWriter(lambda dictionary: dump_dict_to_yaml(dictionary, width=80,
+                                                                            default_flow_style=False),
+                                       window=window, fsync=fsync)
+        self.write_behind_writer = writer
+
+    def flush(self, timeout=None):
+        """Waits until all scheduled saves are written to disk
+
+        :param float timeout: maximum time to wait in seconds, None waits forever
+        :return: True if all data has been written, False on timeout
+        """
+        if self.write_behind_writer is None:
+            return True
+        return self.write_behind_writer.flush(timeout)
+
+    def close(self):
+        """Stops watching and sharing the configuration and writes all scheduled saves of the write-behind mode
+
+        The write-behind writer is closed if it has been created by :meth:`enable_write_behind`, a writer passed to it
+        is only flushed, as it may still be used by other configurations.
+        """
+        self.stop_watching()
+        publisher, self._shared_publisher = self._shared_publisher, None
+        if publisher is not None:
+            publisher.close()
+        writer, self.write_behind_writer = self.write_behind_writer, None
+        if writer is None:
+            return
+        if self._owns_write_behind_writer:
+            writer.close()
+        else:
+            writer.flush()
+
+    def reload(self):
+        """Re-reads the config file and applies its changes
+
+        The new content is filled up with the default config in memory, but not saved. If the file cannot be read,
+        the current configuration is kept. The registered change callbacks are called with the changed values.
+
+        :return: the changed values, None if the file could not be read
+        :rtype: list(yaml_configuration.merge.ConfigChange)
+        """
+        if not self.config_file_path:
+            self.logger.warning("The config_file_path needs to be set for {0}".format(self.__class__.__name__))
+            return None
+        layout = None
+        file_version = self._stat_config_file(self.config_file_path) \
+            if self.shared_file or self.splice_save else None
+        try:
+            if self._splices(self.config_file_path):
+                layout, config_dict = self._read_config_layout(self.config_file_path)
+                layout.version = file_version
+            else:
+                config_dict = self._read_config_file(self.config_file_path)
+            if not isinstance(config_dict, dict):
+                raise ConfigError("The config file does not contain a dictionary")
+        except Exception as e:
+            self.logger.error('Could not reload config {0}, keeping the current configuration. '
+                              'Error: {1}'.format(self.config_file_path, e))
+            return None
+        self._fill_up(config_dict, self._default_config_dict())
+        if self.compact_storage:
+            config_dict = self._compact_tree(config_dict)
+        with self._write_lock:
+            changes = diff(self._materialize(), config_dict)
+            if changes:
+                try:
+                    self._publish(config_dict)
+                except ConfigError as e:
+                    self.logger.error('Invalid config {0}, keeping the current configuration. '
+                                      'Error: {1}'.format(self.config_file_path, e))
+                    return None
+            self._loaded(self._config_dict, file_version)
+            self._set_layout(layout)
+        if changes:
+            self.logger.debug("Reloaded configuration from {0}, {1} value(s) changed".format(
+                self.config_file_path, len(changes)))
+            self._notify_change_callbacks(changes)
+        return changes
+
+    def add_change_callback(self, callback, key=None):
+        """Registers a function called with the changed values after each reload
+
+        :param callback: function called with a list of :class:`~yaml_configuration.merge.ConfigChange`
+        :param key: only changes of the value at this dotted path (or tuple of keys) and of all values below it are
+            reported. If None, all changes are reported.
+        """
+        if key is None or isinstance(key, tuple):
+            prefix = key
+        elif isinstance(key, str):
+            prefix = split_path(key)
+        else:
+            prefix = (key,)
+        self._change_callbacks.append((prefix, callback))
+
+    def remove_change_callback(self, callback):
+        """Removes all registrations of a change callback
+
+        :param callback: the function passed to :meth:`add_change_callback`
+        """
+        self._change_callbacks = [(prefix, registered) for prefix, registered in self._change_callbacks
+                                  if registered is not callback]
+
+    def _notify_change_callbacks(self, changes):
+        for prefix, callback in list(self._change_callbacks):
+            if prefix is None:
+                matching_changes = changes
+            else:
+                matching_changes = [change for change in changes if change.path[:len(prefix)] == prefix]
+            if not matching_changes:
+                continue
+            try:
+                callback(matching_changes)
+            except Exception as e:
+                self.logger.exception("Error in change callback {0}: {1}".format(callback, e))
+
+    def watch(self, debounce=0.2, poll_interval=1.0, use_inotify=True):
+        """Reloads the configuration whenever the config file is modified
+
+        The file is watched with inotify on Linux and polled otherwise, see
+        :class:`~yaml_configuration.watcher.FileWatcher`.
+
+        :param float debounce: time in seconds without further modifications before the file is reloaded
+        :param float poll_interval: time in seconds between two checks if the file is polled
+        :param bool use_inotify: if False, the file is always polled
+        """
+        from yaml_configuration.watcher import FileWatcher
+        if not self.config_file_path:
+            raise ConfigError("The config_file_path needs to be set for {0}".format(self.__class__.__name__))
+        self.stop_watching()
+        self._watcher = FileWatcher(self.config_file_path, self.reload, debounce=debounce,
+                                    poll_interval=poll_interval, use_inotify=use_inotify)
+        self._watcher.start()
+
+    def enable_instrumentation(self, hook=None, track_keys=False):
+        """Measures the phases of loading and saving the configuration
+
+        The durations of reading, parsing, merging, serializing and writing as well as the number of bytes read and
+        written are collected by the returned :class:`~yaml_configuration.instrumentation.ConfigInstrumentation`.
+        Saves done by the write-behind writer are not measured. Without instrumentation, no overhead is added.
+
+        :param hook: optional function called as ``hook(phase, duration, nbytes, path)`` after each phase
+        :param bool track_keys: if True, reads and writes of each key are counted
+        :rtype: yaml_configuration.instrumentation.ConfigInstrumentation
+        """
+        from yaml_configuration.instrumentation import ConfigInstrumentation
+        self.disable_instrumentation()
+        instrumentation = ConfigInstrumentation(track_keys)
+        if hook is not None:
+            instrumentation.add_hook(hook)
+        if track_keys:
+            # the counting is done by instance attributes shadowing the methods, so the methods themselves stay
+            # unchanged when instrumentation is disabled
+            get_config_value = self.get_config_value
+            set_config_value = self.set_config_value
+            reads = instrumentation.reads
+            writes = instrumentation.writes
+
+            def counting_get_config_value(key, default=None):
+                reads[key] += 1
+                return get_config_value(key, default)
+
+            def counting_set_config_value(key, value):
+                writes[key] += 1
+                return set_config_value(key, value)
+
+            self.get_config_value = counting_get_config_value
+            self.set_config_value = counting_set_config_value
+        self.instrumentation = instrumentation
+        return instrumentation
+
+    def disable_instrumentation(self):
+        """Stops measuring and counting"""
+        self.instrumentation = None
+        self.__dict__.pop('get_config_value', None)
+        self.__dict__.pop('set_config_value', None)
+
+    def instrumentation_report(self):
+        """Returns the statistics collected since instrumentation has been enabled
+
+        :return: the statistics, see :meth:`~yaml_configuration.instrumentation.ConfigInstrumentation.report`,
+            None if instrumentation is disabled
+        :rtype: dict
+        """
+        if self.instrumentation is None:
+            return None
+        return self.instrumentation.report(self.get_all_keys())
+
+    def layered(self, *layers):
+        """Returns a layered view with the defaults, this configuration and further override layers
+
+        The layers are not copied, the view always uses the current version of this configuration. See
+        :class:`~yaml_configuration.layers.LayeredConfig`.
+
+        :param layers: further (name, dict) tuples with increasing precedence, e.g. built by
+            :func:`~yaml_configuration.layers.layer_from_environment` or
+            :func:`~yaml_configuration.layers.layer_from_arguments`
+        :rtype: yaml_configuration.layers.LayeredConfig
+        """
+        from yaml_configuration.layers import LayeredConfig
+        return LayeredConfig([('defaults', default_config_cache.get(self.default_config)), ('file', self)] +
+                             list(layers))
+
+    def publish_shared(self, name):
+        """Publishes the configuration to shared memory, so other processes can attach to it
+
+        The first call creates the shared memory blocks, further calls publish a new generation. See
+        :mod:`yaml_configuration.shared`.
+
+        :param str name: the name of the shared configuration
+        :return: the generation of the published configuration
+        :rtype: int
+        """
+        from yaml_configuration.shared import SharedConfigPublisher
+        if self._shared_publisher is None:
+            self._shared_publisher = SharedConfigPublisher(name)
+        elif self._shared_publisher.name != name:
+            raise ConfigError("The configuration is already published as {0}".format(self._shared_publisher.name))
+        return self._shared_publisher.publish(self._materialize())
+
+    def attach_shared(self, name):
+        """Uses a configuration published by another process
+
+        The published values replace the current configuration. They are only deserialized on their first access.
+        A previously attached shared configuration is detached as soon as it is not used anymore.
+
+        :param str name: the name of the shared configuration
+        :return: the generation of the attached configuration
+        :rtype: int
+        """
+        from yaml_configuration.shared import SharedConfigReader
+        reader = SharedConfigReader(name)
+        with self._write_lock:
+            # a previously attached reader is not closed, as lock-free readers may still use it. It detaches when it
+            # is garbage collected.
+            self._publish({}, lazy_source=reader)
+            # the config file does not contain the attached values, so it has to be dumped completely
+            self._set_layout(None)
+        self.logger.debug("Attached to shared configuration {0} (generation {1})".format(name, reader.generation))
+        return reader.generation
+
+    def refresh_shared(self):
+        """Attaches to the latest generation of the shared configuration, if a newer one has been published
+
+        :return: True if a newer generation has been attached
+        :rtype: bool
+        """
+        from yaml_configuration.shared import SharedConfigReader
+        reader = self._lazy_source
+        if not isinstance(reader, SharedConfigReader) or not reader.is_stale():
+            return False
+        self.attach_shared(reader.name)
+        return True
+
+    def stop_watching(self):
+        """Stops reloading the configuration on modifications of the config file"""
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.stop()
+
 
 class ConfigError(Exception):
     """Exception raised for errors loading the config files"""
@@ -227,3 +1279,16 @@ class ConfigError(Exception):
 
     def __str__(self):
         return repr(self.msg)
+
+
+class ConfigConflictError(ConfigError):
+    """Exception raised if a shared config file has been changed by another process at the values to be saved
+
+    :ivar str path: the path of the config file
+    :ivar list conflicts: the conflicting values as :class:`~yaml_configuration.merge.ConfigConflict`
+    """
+    def __init__(self, path, conflicts):
+        ConfigError.__init__(self, "{0} has been changed by another process at {1}".format(
+            path, ', '.join(join_path(conflict.path) for conflict in conflicts)))
+        self.path = path
+        self.conflicts = conflicts
@@ -0,0 +1,133 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: defaults
+   :platform: Unix, Windows
+   :synopsis: A process wide cache for parsed default configurations.
+
+"""
+
+import hashlib
+import threading
+
+from yaml_configuration.engine import import_yaml
+from yaml_configuration.utils import copy_tree
+
+# imported on the first parse, see yaml_configuration.engine.import_yaml()
+yaml = FullLoader = Dumper = None
+
+
+class DefaultConfigCache(object):
+    """Cache holding the parsed trees of default configuration strings
+
+    The cache is keyed by a content hash of the default string, so all :class:`DefaultConfig` instances (and all
+    their ``load()`` calls) sharing the same defaults parse them only once. The cached tree is shared and must never
+    be modified; use :meth:`copy` to get a private tree for an instance.
+    """
+
+    def __init__(self):
+        self._trees = {}
+        self._compact_trees = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(default_config):
+        """Returns the cache key of a default configuration string
+
+        :param str default_config: the default configuration as yaml string
+        :return: the hex digest of the string content
+        """
+        return hashlib.sha1(default_config.encode('utf-8')).hexdigest()
+
+    def get(self, default_config):
+        """Returns the shared, parsed tree of a default configuration
+
+        The returned tree is shared with all other users of the cache and must be treated as read-only.
+
+        :param str default_config: the default configuration as yaml string
+        :return: the parsed default configuration, an empty dict for empty defaults
+        """
+        if not default_config:
+            return {}
+        key = self.key(default_config)
+        with self._lock:
+            tree = self._trees.get(key)
+            if tree is not None:
+                self.hits += 1
+                return tree
+            self.misses += 1
+        if yaml is None or FullLoader is None:
+            import_yaml(globals())
+        tree = yaml.load(default_config, Loader=FullLoader)
+        if tree is None:
+            tree = {}
+        with self._lock:
+            return self._trees.setdefault(key, tree)
+
+    def copy(self, default_config):
+        """Returns a private copy of the parsed default configuration
+
+        Only the containers of the tree are copied, so this is much cheaper than parsing the string again.
+
+        :param str default_config: the default configuration as yaml string
+        :return: the parsed default configuration, which may be modified by the caller
+        """
+        return copy_tree(self.get(default_config))
+
+    def compact(self, default_config):
+        """Returns the shared, compacted tree of a default configuration
+
+        See :func:`~yaml_configuration.compact.compact_tree`, the tree is shared by all configurations using compact
+        storage and must never be modified.
+
+        :param str default_config: the default configuration as yaml string
+        :return: the compacted default configuration
+        """
+        if not default_config:
+            return {}
+        key = self.key(default_config)
+        with self._lock:
+            tree = self._compact_trees.get(key)
+        if tree is None:
+            from yaml_configuration.compact import compact_tree
+            tree = compact_tree(self.get(default_config), lists_as_tuples=True)
+            with self._lock:
+                tree = self._compact_trees.setdefault(key, tree)
+        return tree
+
+    def invalidate(self, default_config=None):
+        """Removes one or all entries from the cache
+
+        :param str default_config: the default configuration to be removed, if None the whole cache is cleared
+        """
+        with self._lock:
+            if default_config is None:
+                self._trees.clear()
+                self._compact_trees.clear()
+            else:
+                self._trees.pop(self.key(default_config), None)
+                self._compact_trees.pop(self.key(default_config), None)
+
+    def reset_statistics(self):
+        """Resets the hit and miss counters"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def statistics(self):
+        """Returns the cache statistics
+
+        :return: a dict with the number of hits, misses and cached entries
+        :rtype: dict
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._trees)}
+
+
+default_config_cache = DefaultConfigCache()
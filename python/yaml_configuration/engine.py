@@ -0,0 +1,145 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: engine
+   :platform: Unix, Windows
+   :synopsis: Selection of the yaml loader and dumper used for config files.
+
+The libyaml based loader and dumper are 5 to 10 times faster than the pure python ones. By default, the fastest
+available engine is used and a warning is logged if libyaml is missing. :func:`set_yaml_engine` selects another
+engine, e.g. ``set_yaml_engine('c')`` fails if libyaml is missing and ``set_yaml_engine(safe=True)`` only constructs
+standard yaml types.
+
+"""
+
+import threading
+from collections import namedtuple
+
+#: the possible values of the engine setting
+ENGINES = ('auto', 'c', 'python')
+
+_lock = threading.Lock()
+_engine = None
+# the globals of the modules using the engine, which are updated when the engine is changed
+_namespaces = []
+
+
+class YamlEngine(namedtuple('YamlEngine', ['setting', 'implementation', 'safe', 'buffered', 'loader', 'dumper'])):
+    """The selected yaml engine
+
+    :ivar str setting: the requested engine, one of :data:`ENGINES`
+    :ivar str implementation: ``'c'`` if libyaml is used, ``'python'`` otherwise
+    :ivar bool safe: whether only standard yaml types are loaded and dumped
+    :ivar bool buffered: whether config files are serialized into a buffer and written at once
+    :ivar loader: the yaml loader class
+    :ivar dumper: the yaml dumper class
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        return '{0} ({1}/{2}{3})'.format('libyaml' if self.implementation == 'c' else 'pure python',
+                                         self.loader.__name__, self.dumper.__name__,
+                                         ', buffered dump' if self.buffered else '')
+
+
+def _select(setting, safe, buffered):
+    from yaml_configuration.config import ConfigError
+    import yaml
+    if setting not in ENGINES:
+        raise ValueError("Unknown yaml engine {0}, use one of {1}".format(setting, ', '.join(ENGINES)))
+    with_libyaml = getattr(yaml, '__with_libyaml__', False)
+    if setting == 'c' and not with_libyaml:
+        raise ConfigError("The libyaml based yaml engine is not available, install PyYAML with libyaml support")
+    if setting == 'auto' and not with_libyaml:
+        import logging
+        logging.getLogger(__name__).warning("libyaml is not available, loading and saving configurations with the "
+                                            "pure python yaml engine is 5 to 10 times slower")
+    use_c = with_libyaml and setting != 'python'
+    if safe:
+        loader, dumper = (yaml.CSafeLoader, yaml.CSafeDumper) if use_c else (yaml.SafeLoader, yaml.SafeDumper)
+    else:
+        loader, dumper = (yaml.CFullLoader, yaml.CDumper) if use_c else (yaml.FullLoader, yaml.Dumper)
+    return YamlEngine(setting, 'c' if use_c else 'python', safe, buffered, loader, dumper)
+
+
+def get_yaml_engine():
+    """Returns the active yaml engine, selecting the fastest available one on the first call
+
+    :rtype: YamlEngine
+    """
+    global _engine
+    engine = _engine
+    if engine is None:
+        with _lock:
+            selected = _engine is None
+            if selected:
+                _engine = _select('auto', False, False)
+            engine = _engine
+        if selected:
+            import logging
+            logging.getLogger(__name__).debug("Using the {0} yaml engine".format(engine))
+    return engine
+
+
+def set_yaml_engine(engine='auto', safe=False, buffered=False):
+    """Selects the yaml engine of all configurations
+
+    Default configurations that have already been parsed are not parsed again.
+
+    :param engine: ``'auto'`` for the fastest available engine, ``'c'`` to require libyaml, ``'python'`` for the pure
+        python engine, or a :class:`YamlEngine` returned by :func:`get_yaml_engine` to restore it
+    :param bool safe: if True, the safe loader and dumper are used, which only support standard yaml types
+    :param bool buffered: if True, config files are serialized into a buffer and written with a single call instead
+        of being streamed to the file
+    :return: the selected engine
+    :rtype: YamlEngine
+    :raises ConfigError: if engine is ``'c'`` and libyaml is not available
+    """
+    global _engine
+    import logging
+    selected = engine if isinstance(engine, YamlEngine) else _select(engine, safe, buffered)
+    with _lock:
+        _engine = selected
+        for namespace in _namespaces:
+            namespace['FullLoader'] = selected.loader
+            namespace['Dumper'] = selected.dumper
+    logging.getLogger(__name__).info("Using the {0} yaml engine".format(selected))
+    return selected
+
+
+def get_safe_loader():
+    """Returns the safe yaml loader of the implementation of the active engine
+
+    Values from the command line or the environment are loaded with it, so they never construct python objects, even
+    if the active engine does.
+    """
+    import yaml
+    engine = get_yaml_engine()
+    if engine.safe:
+        return engine.loader
+    return yaml.CSafeLoader if engine.implementation == 'c' else yaml.SafeLoader
+
+
+def import_yaml(namespace):
+    """Imports yaml into the namespace of a module on the first parse or dump
+
+    Sets ``yaml`` as well as ``FullLoader`` and ``Dumper`` to the loader and dumper of the active engine, unless they
+    have already been set. The namespace is updated whenever the engine is changed by :func:`set_yaml_engine`.
+
+    :param dict namespace: the globals of the module
+    :return: the yaml module
+    """
+    import yaml
+    engine = get_yaml_engine()
+    with _lock:
+        if not any(registered is namespace for registered in _namespaces):
+            _namespaces.append(namespace)
+    for name, value in (('yaml', yaml), ('FullLoader', engine.loader), ('Dumper', engine.dumper)):
+        if namespace.get(name) is None:
+            namespace[name] = value
+    return yaml
@@ -0,0 +1,152 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: frozen
+   :platform: Unix, Windows
+   :synopsis: Read-only views and immutable snapshots of configurations.
+
+"""
+
+from collections.abc import Mapping, Sequence
+
+from yaml_configuration.paths import split_path
+from yaml_configuration.utils import copy_tree
+
+
+def freeze(value):
+    """Returns a read-only view of a configuration value
+
+    Dicts and lists are wrapped without copying them, all other values are returned as they are.
+
+    :param value: the value to be wrapped
+    :return: a :class:`FrozenDict`, :class:`FrozenList` or value itself
+    """
+    value_type = type(value)
+    if value_type is dict:
+        return FrozenDict(value)
+    if value_type is list:
+        return FrozenList(value)
+    return value
+
+
+def unfreeze(value):
+    """Returns the value wrapped by a read-only view
+
+    The returned dict or list is shared with the view and must still be treated as read-only.
+
+    :param value: a :class:`FrozenDict`, :class:`FrozenList` or any other value
+    :return: the wrapped dict or list, or value itself
+    """
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value._data
+    return value
+
+
+class FrozenDict(Mapping):
+    """Read-only view of a dict, nested dicts and lists are wrapped on access"""
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, key):
+        return freeze(self._data[key])
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenDict):
+            other = other._data
+        return self._data == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'FrozenDict({0!r})'.format(self._data)
+
+    def to_dict(self):
+        """Returns a modifiable copy of the wrapped dict"""
+        return copy_tree(self._data)
+
+
+class FrozenList(Sequence):
+    """Read-only view of a list, nested dicts and lists are wrapped on access"""
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return FrozenList(self._data[index])
+        return freeze(self._data[index])
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, value):
+        return value in self._data
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenList):
+            other = other._data
+        return self._data == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'FrozenList({0!r})'.format(self._data)
+
+    def to_list(self):
+        """Returns a modifiable copy of the wrapped list"""
+        return copy_tree(self._data)
+
+
+class ConfigSnapshot(FrozenDict):
+    """An immutable version of a configuration
+
+    Snapshots are published by :class:`~yaml_configuration.config.DefaultConfig` whenever its configuration changes.
+    As the published dicts are never modified afterwards, a snapshot can be read without any locking.
+
+    :param int version: the version number of the configuration
+    :param dict data: the configuration, which must not be modified anymore
+    """
+
+    __slots__ = ('version',)
+
+    def __init__(self, version, data):
+        super(ConfigSnapshot, self).__init__(data)
+        self.version = version
+
+    def get(self, key, default=None):
+        """Returns the (read-only) value of a key or dotted path
+
+        :param key: the key or dotted path to the configuration value
+        :param default: what to return if the key is not found
+        """
+        if key in self._data:
+            return freeze(self._data[key])
+        if not isinstance(key, str) or '.' not in key:
+            return default
+        value = self._data
+        for path_key in split_path(key):
+            if not isinstance(value, dict) or path_key not in value:
+                return default
+            value = value[path_key]
+        return freeze(value)
+
+    def __repr__(self):
+        return 'ConfigSnapshot(version={0}, {1!r})'.format(self.version, self._data)
@@ -0,0 +1,166 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: instrumentation
+   :platform: Unix, Windows
+   :synopsis: Timing hooks and key access statistics for configurations.
+
+"""
+
+import logging
+import time
+from collections import Counter
+
+from yaml_configuration.paths import split_path
+
+logger = logging.getLogger(__name__)
+
+#: the phases reported by :class:`~yaml_configuration.config.DefaultConfig`
+PHASES = ('read', 'parse', 'merge', 'serialize', 'write')
+
+
+class PhaseStatistics(object):
+    """Accumulated durations and sizes of one phase"""
+
+    __slots__ = ('count', 'total_time', 'max_time', 'bytes')
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.
+        self.max_time = 0.
+        self.bytes = 0
+
+    def as_dict(self):
+        return {'count': self.count, 'total_time': self.total_time, 'max_time': self.max_time, 'bytes': self.bytes}
+
+
+class _Timer(object):
+
+    __slots__ = ('_instrumentation', '_phase', '_path', '_start', 'bytes')
+
+    def __init__(self, instrumentation, phase, path, nbytes):
+        self._instrumentation = instrumentation
+        self._phase = phase
+        self._path = path
+        self.bytes = nbytes
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self._instrumentation.record(self._phase, time.perf_counter() - self._start, self.bytes, self._path)
+
+
+class ConfigInstrumentation(object):
+    """Collects the durations of loading and saving a configuration and optionally counts key accesses
+
+    Each measured phase (see :data:`PHASES`) is accumulated in :attr:`phases` and passed to all hooks, which are
+    called as ``hook(phase, duration, nbytes, path)``. ``nbytes`` is the number of bytes read or written, or None for
+    phases without file access. Exceptions raised by hooks are logged and otherwise ignored.
+
+    :param bool track_keys: if True, reads and writes of keys are counted
+    """
+
+    def __init__(self, track_keys=False):
+        self.track_keys = track_keys
+        self.hooks = []
+        self.phases = {}
+        self.reads = Counter()
+        self.writes = Counter()
+
+    def add_hook(self, hook):
+        """Registers a function called after each measured phase
+
+        :param hook: function called as ``hook(phase, duration, nbytes, path)``
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def timer(self, phase, path=None, nbytes=None):
+        """Returns a context manager measuring the duration of a phase
+
+        The number of bytes can also be assigned to the ``bytes`` attribute of the returned object.
+
+        :param str phase: the name of the phase
+        :param str path: the affected file
+        :param int nbytes: the number of bytes read or written
+        """
+        return _Timer(self, phase, path, nbytes)
+
+    def record(self, phase, duration, nbytes=None, path=None):
+        """Records the duration of a phase and passes it to the hooks
+
+        :param str phase: the name of the phase
+        :param float duration: the duration in seconds
+        :param int nbytes: the number of bytes read or written
+        :param str path: the affected file
+        """
+        statistics = self.phases.get(phase)
+        if statistics is None:
+            statistics = self.phases[phase] = PhaseStatistics()
+        statistics.count += 1
+        statistics.total_time += duration
+        statistics.max_time = max(statistics.max_time, duration)
+        if nbytes:
+            statistics.bytes += nbytes
+        for hook in self.hooks:
+            # a failing hook must not change the outcome of the measured load or save
+            try:
+                hook(phase, duration, nbytes, path)
+            except Exception as e:
+                logger.error("Instrumentation hook {0} failed: {1}".format(hook, e))
+
+    @property
+    def bytes_read(self):
+        statistics = self.phases.get('read')
+        return statistics.bytes if statistics else 0
+
+    @property
+    def bytes_written(self):
+        statistics = self.phases.get('write')
+        return statistics.bytes if statistics else 0
+
+    def unread_keys(self, keys):
+        """Returns the keys that have never been read
+
+        A top level key counts as read if it or any dotted path below it has been read.
+
+        :param keys: the top level keys of the configuration
+        :rtype: list
+        """
+        read_keys = set()
+        for key in self.reads:
+            read_keys.add(key)
+            if isinstance(key, str) and '.' in key:
+                read_keys.add(split_path(key)[0])
+        return [key for key in keys if key not in read_keys]
+
+    def reset(self):
+        """Discards all collected statistics"""
+        self.phases = {}
+        self.reads = Counter()
+        self.writes = Counter()
+
+    def report(self, keys=None):
+        """Returns all collected statistics
+
+        :param keys: the top level keys of the configuration, used to report the keys that have never been read
+        :rtype: dict
+        """
+        report = {'phases': {phase: statistics.as_dict() for phase, statistics in self.phases.items()},
+                  'bytes_read': self.bytes_read,
+                  'bytes_written': self.bytes_written}
+        if self.track_keys:
+            report['reads'] = dict(self.reads)
+            report['writes'] = dict(self.writes)
+            if keys is not None:
+                report['unread_keys'] = self.unread_keys(keys)
+        return report
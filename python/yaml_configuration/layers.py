@@ -0,0 +1,291 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: layers
+   :platform: Unix, Windows
+   :synopsis: Layered configurations, e.g. defaults, config file, environment and command line.
+
+"""
+
+import os
+from collections.abc import Mapping
+
+from yaml_configuration.frozen import unfreeze
+from yaml_configuration.paths import escape_key, join_path, split_path
+from yaml_configuration.utils import copy_tree
+
+_MISSING = object()
+
+
+def _parse_value(text):
+    import yaml
+    from yaml_configuration.engine import get_safe_loader
+    try:
+        return yaml.load(text, Loader=get_safe_loader())
+    except yaml.YAMLError:
+        return text
+
+
+def _set_path(tree, path, value):
+    for key in path[:-1]:
+        tree = tree.setdefault(key, {})
+    tree[path[-1]] = value
+
+
+def parse_override(text):
+    """Parses an override of the form ``DB.pool.size=10``
+
+    The value is parsed as yaml scalar or flow collection, so ``10`` becomes an int and ``[a, b]`` a list. The
+    function can be used as ``type`` of an argparse argument.
+
+    :param str text: the dotted path and the value separated by ``=``
+    :return: the path as tuple of keys and the parsed value
+    :rtype: tuple
+    :raises ValueError: if text does not contain a ``=``
+    """
+    path, separator, value = text.partition('=')
+    if not separator or not path:
+        raise ValueError("{0} is not of the form key=value".format(text))
+    return split_path(path.strip()), _parse_value(value)
+
+
+def layer_from_arguments(overrides):
+    """Builds a layer from command line overrides
+
+    :param overrides: iterable of strings of the form ``DB.pool.size=10`` or of tuples returned by
+        :func:`parse_override`
+    :return: the nested configuration values
+    :rtype: dict
+    """
+    layer = {}
+    for override in overrides:
+        path, value = parse_override(override) if isinstance(override, str) else override
+        _set_path(layer, path, value)
+    return layer
+
+
+def layer_from_environment(prefix, separator='__', environ=None):
+    """Builds a layer from environment variables
+
+    ``<prefix>DB__pool__size=10`` sets the value at ``DB.pool.size``. Values are parsed like in
+    :func:`parse_override`.
+
+    :param str prefix: prefix of the considered variables, e.g. ``"MYAPP_"``
+    :param str separator: separator of the nested keys within a variable name
+    :param environ: the environment mapping, defaults to :data:`os.environ`
+    :return: the nested configuration values
+    :rtype: dict
+    """
+    if environ is None:
+        environ = os.environ
+    layer = {}
+    for name, value in environ.items():
+        if name.startswith(prefix) and len(name) > len(prefix):
+            _set_path(layer, tuple(name[len(prefix):].split(separator)), _parse_value(value))
+    return layer
+
+
+class MergedDict(Mapping):
+    """Read-only view of a dict value that is defined by several layers
+
+    The values are looked up in the merged index of the owning :class:`LayeredConfig`, nothing is copied.
+    """
+
+    __slots__ = ('_index', '_prefix', '_keys')
+
+    def __init__(self, index, prefix, keys):
+        self._index = index
+        self._prefix = prefix
+        self._keys = keys
+
+    def __getitem__(self, key):
+        return self._index[self._prefix + '.' + escape_key(key)][0]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __repr__(self):
+        return 'MergedDict({0!r})'.format(dict(self))
+
+
+class LayeredConfig(object):
+    """A configuration merged from several layers
+
+    Each layer is kept as it is, later layers take precedence over earlier ones. Dicts defined by several layers are
+    merged key by key, all other values (including lists) are replaced. A layer is either a dict or an object
+    providing ``snapshot()`` and ``config_version`` like :class:`~yaml_configuration.config.DefaultConfig`, whose
+    current version is used.
+
+    All lookups go through a flat index of the merged values, which is only rebuilt after a layer has changed.
+
+    :param layers: list of (name, layer) tuples, ordered from lowest to highest precedence
+    """
+
+    def __init__(self, layers=()):
+        self._layers = []
+        self._index = None
+        self._keys = None
+        self._versions = None
+        for name, layer in layers:
+            self.set_layer(name, layer)
+
+    @property
+    def layer_names(self):
+        """The names of all layers, ordered from lowest to highest precedence"""
+        return [name for name, _ in self._layers]
+
+    def set_layer(self, name, layer, position=None):
+        """Adds or replaces a layer
+
+        :param str name: the name of the layer
+        :param layer: the configuration values of the layer, which must not be modified afterwards
+        :param int position: the position of a new layer, by default it is added with the highest precedence
+        """
+        for i, (layer_name, _) in enumerate(self._layers):
+            if layer_name == name:
+                self._layers[i] = (name, layer)
+                break
+        else:
+            if position is None:
+                self._layers.append((name, layer))
+            else:
+                self._layers.insert(position, (name, layer))
+        self._index = None
+
+    def remove_layer(self, name):
+        """Removes a layer
+
+        :param str name: the name of the layer
+        """
+        self._layers = [(layer_name, layer) for layer_name, layer in self._layers if layer_name != name]
+        self._index = None
+
+    def get(self, key, default=None):
+        """Returns the merged value of a key or dotted path
+
+        :param key: the key or dotted path to the configuration value
+        :param default: what to return if the key is not found
+        """
+        entry = self._lookup(key)
+        return default if entry is None else entry[0]
+
+    def source(self, key):
+        """Returns the name of the layer a value comes from
+
+        For dicts merged from several layers, the layer with the highest precedence is returned.
+
+        :param key: the key or dotted path to the configuration value
+        :return: the name of the layer, None if the key is not found
+        """
+        entry = self._lookup(key)
+        return None if entry is None else entry[1]
+
+    def __getitem__(self, key):
+        entry = self._lookup(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry[0]
+
+    def __contains__(self, key):
+        return self._lookup(key) is not None
+
+    def keys(self):
+        """Returns the merged top level keys"""
+        self._current_index()
+        return list(self._keys)
+
+    def to_dict(self):
+        """Returns a merged copy of all layers
+
+        :rtype: dict
+        """
+        return {key: self._to_plain(self.get(key)) for key in self.keys()}
+
+    def _to_plain(self, value):
+        if isinstance(value, MergedDict):
+            return {key: self._to_plain(child) for key, child in value.items()}
+        return copy_tree(value)
+
+    def _lookup(self, key):
+        index = self._current_index()
+        if not isinstance(key, str):
+            key = escape_key(key)
+        entry = index.get(key)
+        if entry is None and '\\' in key:
+            entry = index.get(join_path(split_path(key)))
+        if entry is None and '.' in key:
+            # a top level key containing dots
+            entry = index.get(escape_key(key))
+        return entry
+
+    def _current_index(self):
+        index = self._index
+        if index is not None and self._versions is not None:
+            for (_, layer), version in zip(self._layers, self._versions):
+                if version is not None and layer.config_version != version:
+                    index = None
+                    break
+        if index is None:
+            index = self._build_index()
+        return index
+
+    def _build_index(self):
+        versions = []
+        entries = []
+        for name, layer in self._layers:
+            if hasattr(layer, 'snapshot'):
+                snapshot = layer.snapshot()
+                versions.append(snapshot.version)
+                layer = unfreeze(snapshot)
+            else:
+                versions.append(None)
+            entries.append((name, layer))
+        index = {}
+        self._keys = self._index_entries(index, None, entries)
+        self._versions = versions if any(version is not None for version in versions) else None
+        self._index = index
+        return index
+
+    def _index_entries(self, index, prefix, entries):
+        """Adds the merged values of dicts defined by several layers to the index
+
+        :param dict index: the index to be filled
+        :param str prefix: the dotted path of the dicts, None for the top level
+        :param list entries: (layer name, dict) tuples, ordered from lowest to highest precedence
+        :return: the merged keys
+        """
+        keys = {}
+        for _, layer in entries:
+            keys.update(dict.fromkeys(layer))
+        for key in keys:
+            path = escape_key(key) if prefix is None else prefix + '.' + escape_key(key)
+            child_entries = []
+            for name, layer in entries:
+                value = layer.get(key, _MISSING)
+                if value is _MISSING:
+                    continue
+                if not isinstance(value, dict) or (child_entries and not isinstance(child_entries[-1][1], dict)):
+                    # a value that is not a dict hides all values of lower layers and is hidden by a dict of a higher
+                    # layer, only the dicts above the highest other value are merged
+                    child_entries = []
+                child_entries.append((name, value))
+            name, value = child_entries[-1]
+            if not isinstance(value, dict):
+                index[path] = (value, name)
+            elif len(child_entries) == 1:
+                self._index_entries(index, path, child_entries)
+                index[path] = (value, name)
+            else:
+                child_keys = self._index_entries(index, path, child_entries)
+                index[path] = (MergedDict(index, path, child_keys), name)
+        return list(keys)
@@ -0,0 +1,178 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: lazy
+   :platform: Unix, Windows
+   :synopsis: Lazy loading of the top level values of large yaml files.
+
+"""
+
+import threading
+
+import yaml
+from yaml.events import (AliasEvent, CollectionStartEvent, DocumentStartEvent, MappingEndEvent, MappingStartEvent,
+                         ScalarEvent, SequenceEndEvent, StreamEndEvent)
+
+from yaml_configuration.engine import import_yaml
+
+# the loader used for scanning and constructing the values is selected by yaml_configuration.engine.set_yaml_engine()
+FullLoader = None
+import_yaml(globals())
+
+_STR_TAG = 'tag:yaml.org,2002:str'
+_MERGE_KEY = '<<'
+_resolver = yaml.resolver.Resolver()
+
+
+class _NotLazy(Exception):
+    """Raised by the scan if the document cannot be split into independent top level values"""
+
+
+class LazyYamlDocument(object):
+    """A yaml document whose top level values are only constructed when they are accessed
+
+    A single scan over the parser events records the keys of the top level mapping and the character range of each
+    value. A value is constructed from its range on its first access and cached afterwards. Values containing
+    aliases, and all values of documents that cannot be split (e.g. no top level mapping, merge keys or complex keys),
+    are constructed by loading the whole document once.
+
+    :param str text: the yaml document
+    """
+
+    def __init__(self, text):
+        self._text = text
+        self._values = {}
+        self._document = None
+        self._lock = threading.RLock()
+        self._ranges = None
+        try:
+            self._ranges = self._scan()
+        except _NotLazy:
+            self._load_document()
+
+    @classmethod
+    def from_file(cls, path):
+        """Creates a lazy document from a yaml file
+
+        :param str path: the path of the yaml file
+        :rtype: LazyYamlDocument
+        """
+        with open(path, 'r') as f:
+            return cls(f.read())
+
+    def keys(self):
+        if self._ranges is None:
+            return self._document.keys()
+        return self._ranges.keys()
+
+    def __contains__(self, key):
+        if self._ranges is None:
+            return key in self._document
+        return key in self._ranges
+
+    def __len__(self):
+        return len(self.keys())
+
+    def get(self, key, default=None):
+        """Returns the value of a top level key, constructing it on its first access
+
+        :param key: the top level key
+        :param default: what to return if the key is not found
+        """
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        if self._ranges is None:
+            return self._document.get(key, default)
+        value_range = self._ranges.get(key)
+        if value_range is None:
+            return default
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+            start, end, column, has_alias = value_range
+            if has_alias:
+                value = self._load_document()[key]
+            else:
+                value = yaml.load(' ' * column + self._text[start:end], Loader=FullLoader)
+            self._values[key] = value
+            if len(self._values) == len(self._ranges):
+                # all values are constructed, the text is not needed anymore
+                self._text = None
+        return value
+
+    def items(self):
+        return [(key, self.get(key)) for key in self.keys()]
+
+    def to_dict(self):
+        """Returns the whole document as dict"""
+        return dict(self.items())
+
+    def _load_document(self):
+        with self._lock:
+            if self._document is None:
+                document = yaml.load(self._text, Loader=FullLoader)
+                if document is None:
+                    document = {}
+                elif not isinstance(document, dict):
+                    raise ValueError("The yaml document does not contain a dictionary")
+                self._document = document
+                if self._ranges is None:
+                    self._text = None
+            return self._document
+
+    def _scan(self):
+        ranges = {}
+        events = yaml.parse(self._text, Loader=FullLoader)
+        for event in events:
+            if isinstance(event, DocumentStartEvent):
+                break
+        event = next(events)
+        if isinstance(event, StreamEndEvent):
+            return ranges
+        if not isinstance(event, MappingStartEvent):
+            raise _NotLazy()
+        while True:
+            key_event = next(events)
+            if isinstance(key_event, MappingEndEvent):
+                break
+            if not isinstance(key_event, ScalarEvent):
+                raise _NotLazy()
+            key = self._key(key_event)
+            value_event = next(events)
+            start = value_event.start_mark.index
+            column = value_event.start_mark.column
+            has_alias = isinstance(value_event, AliasEvent)
+            end = value_event.end_mark.index
+            if isinstance(value_event, CollectionStartEvent):
+                depth = 1
+                while depth:
+                    nested_event = next(events)
+                    if isinstance(nested_event, CollectionStartEvent):
+                        depth += 1
+                    elif isinstance(nested_event, (MappingEndEvent, SequenceEndEvent)):
+                        depth -= 1
+                    elif isinstance(nested_event, AliasEvent):
+                        has_alias = True
+                end = nested_event.end_mark.index
+            ranges[key] = (start, end, column, has_alias)
+        for event in events:
+            if isinstance(event, DocumentStartEvent):
+                # several documents, let yaml report the error
+                raise _NotLazy()
+        return ranges
+
+    def _key(self, event):
+        if event.value == _MERGE_KEY and not event.style:
+            raise _NotLazy()
+        tag = event.tag
+        if tag is None or tag == '!':
+            tag = _STR_TAG if event.style else _resolver.resolve(yaml.ScalarNode, event.value, event.implicit)
+        if tag == _STR_TAG:
+            return event.value
+        return yaml.load(self._text[event.start_mark.index:event.end_mark.index], Loader=FullLoader)
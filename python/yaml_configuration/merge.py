@@ -0,0 +1,207 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: merge
+   :platform: Unix, Windows
+   :synopsis: Merges and compares configuration trees.
+
+"""
+
+from collections import namedtuple
+
+from yaml_configuration.utils import copy_tree
+
+
+def fill_up(config, defaults, keys_not_to_fill_up=(), path=(), share=False):
+    """Adds all values of defaults that are missing in config
+
+    Missing keys are added at any nesting depth, lists are extended by the default elements they do not contain.
+    Existing values whose key is in keys_not_to_fill_up are left untouched, regardless of their depth. Added values
+    are copies, so config never shares containers with defaults, unless share is set.
+
+    :param dict config: the configuration to be filled up in place
+    :param dict defaults: the default configuration
+    :param keys_not_to_fill_up: keys whose existing values must not be extended
+    :param tuple path: the path of config within the whole configuration
+    :param bool share: if True, the added values are shared with defaults instead of being copied, which requires
+        that neither of them is modified afterwards. Tuples in defaults are treated like lists.
+    :return: the paths (tuples of keys) of all added values, list elements are reported with their list index
+    :rtype: list
+    """
+    added = []
+    list_types = (list, tuple) if share else list
+    for key, default_value in defaults.items():
+        if key not in config:
+            config[key] = default_value if share else copy_tree(default_value)
+            added.append(path + (key,))
+        elif key in keys_not_to_fill_up:
+            continue
+        else:
+            value = config[key]
+            if isinstance(default_value, dict) and isinstance(value, dict):
+                added.extend(fill_up(value, default_value, keys_not_to_fill_up, path + (key,), share))
+            elif isinstance(default_value, list_types) and isinstance(value, list):
+                added.extend(_fill_up_list(value, default_value, path + (key,), share))
+    return added
+
+
+def _fill_up_list(values, default_values, path, share=False):
+    hashable_values = set()
+    unhashable_values = []
+    for value in values:
+        try:
+            hashable_values.add(value)
+        except TypeError:
+            unhashable_values.append(value)
+    added = []
+    for element in default_values:
+        try:
+            missing = element not in hashable_values
+        except TypeError:
+            missing = element not in unhashable_values
+        if missing:
+            added.append(path + (len(values),))
+            values.append(element if share else copy_tree(element))
+            try:
+                hashable_values.add(element)
+            except TypeError:
+                unhashable_values.append(element)
+    return added
+
+
+class ConfigChange(namedtuple('ConfigChange', ['path', 'old_value', 'new_value'])):
+    """A changed value of a configuration
+
+    path is the tuple of keys leading to the value, old_value or new_value is :data:`MISSING` for added and removed
+    values.
+    """
+    __slots__ = ()
+
+
+class _Missing(object):
+
+    def __repr__(self):
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+
+def diff(old, new, path=()):
+    """Computes the structural difference between two configurations
+
+    Dicts are compared key by key, all other values (including lists) are compared as a whole.
+
+    :param dict old: the previous configuration
+    :param dict new: the new configuration
+    :param tuple path: the path of both dicts within the whole configuration
+    :return: the changed values
+    :rtype: list(ConfigChange)
+    """
+    changes = []
+    for key, old_value in old.items():
+        if key not in new:
+            changes.append(ConfigChange(path + (key,), old_value, MISSING))
+            continue
+        new_value = new[key]
+        if new_value is old_value:
+            continue
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            changes.extend(diff(old_value, new_value, path + (key,)))
+        elif type(old_value) is not type(new_value) or old_value != new_value:
+            changes.append(ConfigChange(path + (key,), old_value, new_value))
+    for key, new_value in new.items():
+        if key not in old:
+            changes.append(ConfigChange(path + (key,), MISSING, new_value))
+    return changes
+
+
+class ConfigConflict(namedtuple('ConfigConflict', ['path', 'base_value', 'our_value', 'their_value'])):
+    """A value changed differently by two writers of the same config file
+
+    path is the tuple of keys leading to the value, base_value the value both writers started from. Missing values
+    are :data:`MISSING`.
+    """
+    __slots__ = ()
+
+
+def get_path(tree, path):
+    """Returns the value at a path
+
+    :param dict tree: the configuration
+    :param tuple path: the keys leading to the value
+    :return: the value, :data:`MISSING` if it does not exist
+    """
+    for key in path:
+        if not isinstance(tree, dict) or key not in tree:
+            return MISSING
+        tree = tree[key]
+    return tree
+
+
+def _replace_path(tree, path, value):
+    """Returns a copy of tree with the value at path replaced, only the dicts along path are copied"""
+    tree = dict(tree)
+    key = path[0]
+    if len(path) > 1:
+        child = tree.get(key)
+        tree[key] = _replace_path(child if isinstance(child, dict) else {}, path[1:], value)
+    elif value is MISSING:
+        tree.pop(key, None)
+    else:
+        tree[key] = value
+    return tree
+
+
+def _equal(value, other):
+    return value is other or (type(value) is type(other) and value == other)
+
+
+def three_way_merge(base, ours, theirs, changed_paths):
+    """Merges the changes of two writers that started from the same configuration
+
+    Only the values at changed_paths are taken from ours, all other values from theirs. A value is in conflict if
+    theirs changed it too, to a different value.
+
+    :param dict base: the configuration both writers started from
+    :param dict ours: the configuration of this writer
+    :param dict theirs: the configuration of the other writer, which is not modified
+    :param changed_paths: the paths (tuples of keys) of the values changed by this writer
+    :return: the merged configuration and the list of :class:`ConfigConflict`. If there are conflicts, the merged
+        configuration is None.
+    :rtype: tuple
+    """
+    # parents first, so a later change below a replaced dict is applied to the new dict
+    changed_paths = sorted(changed_paths, key=len)
+    conflicts = []
+    for path in changed_paths:
+        their_value = get_path(theirs, path)
+        base_value = get_path(base, path)
+        our_value = get_path(ours, path)
+        if not _equal(their_value, base_value) and not _equal(their_value, our_value):
+            conflicts.append(ConfigConflict(path, base_value, our_value, their_value))
+    if conflicts:
+        return None, conflicts
+    merged = theirs
+    for path in changed_paths:
+        merged = _replace_path(merged, path, get_path(ours, path))
+    return merged, conflicts
+
+
+def dict_path(tree, path):
+    """Returns the longest prefix of a path that only leads through dicts
+
+    :param dict tree: the configuration
+    :param tuple path: the keys or list indices leading to a value
+    :return: path without the keys following the first value that is not a dict, e.g. a list
+    :rtype: tuple
+    """
+    for depth, key in enumerate(path):
+        if not isinstance(tree, dict):
+            return path[:depth]
+        tree = tree.get(key)
+    return path
@@ -0,0 +1,205 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: paths
+   :platform: Unix, Windows
+   :synopsis: Dotted paths to nested configuration values.
+
+A path like ``"DB.pool.size"`` addresses ``config["DB"]["pool"]["size"]``. Dots and backslashes that are part of a
+key are escaped by a backslash, e.g. ``"hosts.example\\.com.port"`` addresses
+``config["hosts"]["example.com"]["port"]``.
+"""
+
+from functools import lru_cache
+
+
+def escape_key(key):
+    """Escapes a single key for the use in a dotted path
+
+    :param key: the key, non-string keys are converted by str()
+    :return: the escaped key
+    :rtype: str
+    """
+    key = str(key)
+    if '\\' in key or '.' in key:
+        key = key.replace('\\', '\\\\').replace('.', '\\.')
+    return key
+
+
+def join_path(keys):
+    """Builds the dotted path of a sequence of keys
+
+    :param keys: the keys from the top level down to the value
+    :return: the dotted path
+    :rtype: str
+    """
+    return '.'.join(escape_key(key) for key in keys)
+
+
+def resolve_key(mapping, key):
+    """Returns the key of a dict addressed by a key of a dotted path
+
+    Non-string keys, e.g. the int key ``1``, are addressed by their str form in dotted paths.
+
+    :param dict mapping: the dict containing the value
+    :param key: the unescaped key of the path
+    :return: key if it is part of mapping or no other key of mapping has it as str form, otherwise the matching key
+    """
+    if key in mapping or not isinstance(key, str):
+        return key
+    for existing_key in mapping:
+        if not isinstance(existing_key, str) and str(existing_key) == key:
+            return existing_key
+    return key
+
+
+@lru_cache(maxsize=1024)
+def split_path(path):
+    """Splits a dotted path into its keys
+
+    :param str path: the dotted path
+    :return: the unescaped keys
+    :rtype: tuple
+    """
+    if '\\' not in path:
+        return tuple(path.split('.'))
+    keys = []
+    current = []
+    escaped = False
+    for char in path:
+        if escaped:
+            current.append(char)
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == '.':
+            keys.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    if escaped:
+        current.append('\\')
+    keys.append(''.join(current))
+    return tuple(keys)
+
+
+def iter_paths(value, prefix):
+    """Yields the dotted paths and values of all entries of nested dicts
+
+    :param value: the value stored at prefix
+    :param str prefix: the dotted path of value
+    :return: generator of (path, value) tuples, including the one of value itself
+    """
+    yield prefix, value
+    if isinstance(value, dict):
+        for key, child in value.items():
+            yield from iter_paths(child, prefix + '.' + escape_key(key))
+
+
+class PathIndex(object):
+    """A flat index of the dotted paths of all values within the top level dicts of a configuration
+
+    The entries are grouped by their top level key and the groups are distributed over a fixed number of buckets. An
+    updated index shares all buckets but the one of the changed top level key with the original, so an update only
+    copies that bucket and the entries below the changed key, not the whole index. An index is never modified after
+    it has been created.
+
+    :param tuple buckets: the buckets, dicts mapping escaped top level keys to dicts mapping dotted paths to values
+    """
+
+    __slots__ = ('_buckets',)
+
+    #: the number of buckets, a power of two
+    BUCKETS = 64
+
+    def __init__(self, buckets=None):
+        self._buckets = buckets if buckets is not None else tuple({} for _ in range(self.BUCKETS))
+
+    @classmethod
+    def build(cls, tree):
+        """Builds the index of all values of a configuration tree
+
+        :param dict tree: the configuration
+        :rtype: PathIndex
+        """
+        index = cls()
+        mask = cls.BUCKETS - 1
+        for key, value in tree.items():
+            if isinstance(value, dict):
+                prefix = escape_key(key)
+                index._buckets[hash(prefix) & mask][prefix] = dict(iter_paths(value, prefix))
+        return index
+
+    def get(self, path, default=None):
+        """Returns the value at a dotted path
+
+        :param str path: the dotted path, which must contain at least one unescaped dot
+        :param default: what to return if the path is not part of the index
+        """
+        if '\\' in path:
+            keys = split_path(path)
+            top_key = escape_key(keys[0])
+            path = join_path(keys)
+        else:
+            top_key = path[:path.index('.')]
+        entries = self._buckets[hash(top_key) & (self.BUCKETS - 1)].get(top_key)
+        if entries is None:
+            return default
+        return entries.get(path, default)
+
+    def replace(self, key, value):
+        """Returns a copy of the index in which the entries below a top level key are those of a new value
+
+        :param key: the top level key
+        :param value: its new value, None if it has been removed
+        :rtype: PathIndex
+        """
+        prefix = escape_key(key)
+        bucket = self._copy_bucket(prefix)
+        if isinstance(value, dict):
+            bucket[prefix] = dict(iter_paths(value, prefix))
+        else:
+            bucket.pop(prefix, None)
+        return PathIndex(self._buckets_with(prefix, bucket))
+
+    def update(self, path, top_value, old_value):
+        """Returns a copy of the index in which a single nested value has been replaced
+
+        :param tuple path: the keys leading to the replaced value, starting with a top level key
+        :param top_value: the new value of the top level key, containing the new value at path
+        :param old_value: the replaced value
+        :rtype: PathIndex
+        """
+        prefix = escape_key(path[0])
+        old_entries = self._buckets[hash(prefix) & (self.BUCKETS - 1)].get(prefix)
+        if not isinstance(top_value, dict) or old_entries is None or len(path) == 1:
+            return self.replace(path[0], top_value)
+        bucket = self._copy_bucket(prefix)
+        entries = dict(old_entries)
+        # the dicts along the path have been copied
+        value = entries[prefix] = top_value
+        for depth in range(1, len(path) - 1):
+            value = value[path[depth]]
+            entries[join_path(path[:depth + 1])] = value
+        value = value[path[-1]]
+        full_path = join_path(path)
+        new_entries = dict(iter_paths(value, full_path))
+        entries.update(new_entries)
+        if isinstance(old_value, dict):
+            for old_path, _ in iter_paths(old_value, full_path):
+                if old_path not in new_entries:
+                    entries.pop(old_path, None)
+        bucket[prefix] = entries
+        return PathIndex(self._buckets_with(prefix, bucket))
+
+    def _copy_bucket(self, prefix):
+        return dict(self._buckets[hash(prefix) & (self.BUCKETS - 1)])
+
+    def _buckets_with(self, prefix, bucket):
+        buckets = list(self._buckets)
+        buckets[hash(prefix) & (self.BUCKETS - 1)] = bucket
+        return tuple(buckets)
@@ -0,0 +1,152 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: registry
+   :platform: Unix, Windows
+   :synopsis: Parallel loading of many configurations.
+
+"""
+
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from yaml_configuration.config import ConfigError
+
+logger = logging.getLogger(__name__)
+
+
+def _load_config(config, path, config_file, file_exists):
+    """Loads a configuration whose directory has already been checked, executed by the pool"""
+    config._load_file(os.path.join(path, config_file), file_exists)
+    config.path = path
+    return config
+
+
+class ConfigRegistry(object):
+    """Loads many configurations in a thread or process pool
+
+    The directories of all configurations are checked and created once per directory before the configurations are
+    loaded in parallel, so the time of :meth:`load_all` depends on the slowest configuration rather than on the sum of
+    all of them. With processes, the loaded configurations are pickled back to the calling process, without their
+    change callbacks, watchers and write-behind writers.
+
+    :param int max_workers: the maximum number of threads or processes, see :mod:`concurrent.futures`
+    :param bool use_processes: if True, a process pool is used, which requires picklable configuration classes
+    """
+
+    def __init__(self, max_workers=None, use_processes=False):
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self._entries = OrderedDict()
+        #: the loaded configurations by name
+        self.configs = OrderedDict()
+        #: the errors of the last load_all() by name
+        self.errors = OrderedDict()
+
+    def register(self, config, config_file, path=None, name=None):
+        """Adds a configuration to be loaded by :meth:`load_all`
+
+        :param config: a :class:`~yaml_configuration.config.DefaultConfig` or a subclass of it that can be
+            instantiated without arguments
+        :param str config_file: the name of the config file
+        :param str path: the directory of the config file, see :meth:`~yaml_configuration.config.DefaultConfig.load`
+        :param str name: the name of the configuration, defaults to the name of its class
+        :return: the name of the configuration
+        :rtype: str
+        :raises ConfigError: if the name is already registered
+        """
+        if name is None:
+            name = config.__name__ if isinstance(config, type) else type(config).__name__
+        if name in self._entries:
+            raise ConfigError("A configuration named {0} is already registered".format(name))
+        self._entries[name] = (config, config_file, path)
+        return name
+
+    def __getitem__(self, name):
+        return self.configs[name]
+
+    def load_all(self, executor=None):
+        """Loads all registered configurations in parallel
+
+        A configuration that cannot be created or loaded is reported in :attr:`errors`. A configuration whose config
+        file could neither be read nor written uses its default configuration; it is returned and also reported in
+        :attr:`errors`.
+
+        :param executor: an existing :class:`concurrent.futures.Executor`, by default a pool is created for this call
+        :return: the loaded configurations by name
+        :rtype: collections.OrderedDict
+        """
+        configs = OrderedDict()
+        errors = OrderedDict()
+        jobs = []
+        for name, (config, config_file, path) in self._entries.items():
+            try:
+                if isinstance(config, type):
+                    config = config()
+                jobs.append((name, config, config.resolve_path(path), config_file))
+            except Exception as e:
+                errors[name] = e
+        files = self._check_directories(path for _, _, path, _ in jobs)
+
+        own_executor = executor is None
+        if own_executor:
+            pool_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            executor = pool_class(max_workers=self.max_workers)
+        try:
+            futures = []
+            for name, config, path, config_file in jobs:
+                if isinstance(files[path], Exception):
+                    errors[name] = files[path]
+                    continue
+                if os.path.basename(config_file) == config_file:
+                    file_exists = config_file in files[path]
+                else:
+                    # only the files directly within path have been listed
+                    file_exists = os.path.isfile(os.path.join(path, config_file))
+                futures.append((name, executor.submit(_load_config, config, path, config_file, file_exists)))
+            for name, future in futures:
+                try:
+                    config = future.result()
+                except Exception as e:
+                    errors[name] = e
+                    continue
+                configs[name] = config
+                if config.config_file_path is None:
+                    errors[name] = ConfigError("Could not read or write the config file of {0}, using the default "
+                                               "configuration".format(name))
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+        for name, error in errors.items():
+            logger.error("Could not load configuration {0}: {1}".format(name, error))
+        self.configs = OrderedDict((name, configs[name]) for name in self._entries if name in configs)
+        self.errors = errors
+        return self.configs
+
+    @staticmethod
+    def _check_directories(paths):
+        """Creates missing directories and lists the files of each directory once
+
+        :param paths: the directories of the configurations
+        :return: the set of file names by directory, or the exception raised for the directory
+        :rtype: dict
+        """
+        files = {}
+        for path in paths:
+            if path in files:
+                continue
+            try:
+                if not os.path.isdir(path):
+                    logger.warning("No configuration found at {0}, creating the path on the file system".format(path))
+                    os.makedirs(path)
+                files[path] = {entry.name for entry in os.scandir(path) if entry.is_file()}
+            except Exception as e:
+                files[path] = e
+        return files
@@ -0,0 +1,236 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: shared
+   :platform: Unix, Windows
+   :synopsis: Shares loaded configurations between processes through shared memory.
+
+A publisher stores every version of a configuration in its own shared memory block named ``<name>_<generation>``.
+A small control block ``<name>`` holds the current generation. Readers attach to the current block and unpickle the
+values of the top level keys only when they are accessed, directly from the shared memory.
+"""
+
+import hashlib
+import os
+import pickle
+import struct
+import time
+import weakref
+from multiprocessing import shared_memory
+
+_MAGIC = b'YCSHM001'
+# magic, generation, generation written again after the first one
+_CONTROL = struct.Struct('<8sQQ')
+# magic, length of the pickled key index, digest of the pickled key index
+_DATA_HEADER = struct.Struct('<8sQ20s')
+# time in seconds to wait before reading the control block again while the publisher is writing it
+_RETRY_INTERVAL = 0.0005
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    if os.name == 'nt':
+        # shared memory is not tracked on Windows
+        return shared_memory.SharedMemory(name=name)
+    # before Python 3.13 attaching registers the block with the resource tracker, which would unlink it as soon as
+    # this process exits. Unregistering it afterwards is no option: a forked process shares the tracker of the
+    # publisher and would remove the registration of the publisher. So the block is mapped without SharedMemory.
+    return _ReadOnlyBlock(name)
+
+
+class _ReadOnlyBlock(object):
+    """A shared memory block mapped read-only, providing the ``buf`` and ``close()`` of SharedMemory"""
+
+    def __init__(self, name):
+        import _posixshmem
+        import mmap
+        fd = _posixshmem.shm_open('/' + name, os.O_RDONLY, mode=0o600)
+        try:
+            self._mmap = mmap.mmap(fd, os.fstat(fd).st_size, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+        self.buf = memoryview(self._mmap)
+
+    def close(self):
+        if self.buf is not None:
+            self.buf.release()
+            self.buf = None
+            self._mmap.close()
+
+
+def _data_block_name(name, generation):
+    return '{0}_{1}'.format(name, generation)
+
+
+class SharedConfigPublisher(object):
+    """Publishes configurations to shared memory
+
+    :param str name: the name of the control block, which the readers attach to
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.generation = 0
+        self._control = shared_memory.SharedMemory(name=name, create=True, size=_CONTROL.size)
+        self._control.buf[:_CONTROL.size] = _CONTROL.pack(_MAGIC, 0, 0)
+        self._data = None
+
+    def publish(self, config_dict):
+        """Publishes a new version of a configuration
+
+        :param dict config_dict: the configuration to be published
+        :return: the generation of the published configuration
+        :rtype: int
+        """
+        values = []
+        offsets = {}
+        offset = 0
+        for key, value in config_dict.items():
+            pickled_value = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            offsets[key] = (offset, len(pickled_value))
+            values.append(pickled_value)
+            offset += len(pickled_value)
+        index = pickle.dumps(offsets, protocol=pickle.HIGHEST_PROTOCOL)
+        size = _DATA_HEADER.size + len(index) + offset
+        generation = self.generation + 1
+        data = shared_memory.SharedMemory(name=_data_block_name(self.name, generation), create=True, size=size)
+        _DATA_HEADER.pack_into(data.buf, 0, _MAGIC, len(index), hashlib.sha1(index).digest())
+        position = _DATA_HEADER.size
+        for chunk in [index] + values:
+            data.buf[position:position + len(chunk)] = chunk
+            position += len(chunk)
+        struct.pack_into('<Q', self._control.buf, 8, generation)
+        struct.pack_into('<Q', self._control.buf, 16, generation)
+        # readers that are still attached to the previous block keep their mapping
+        self._release_data()
+        self._data = data
+        self.generation = generation
+        return generation
+
+    def close(self):
+        """Removes the shared configuration, attached readers can still access their current version"""
+        self._release_data()
+        if self._control is not None:
+            self._control.close()
+            self._control.unlink()
+            self._control = None
+
+    def _release_data(self):
+        if self._data is not None:
+            self._data.close()
+            self._data.unlink()
+            self._data = None
+
+
+class SharedConfigReader(object):
+    """Read-only access to a configuration published by a :class:`SharedConfigPublisher`
+
+    The values of the top level keys are unpickled on their first access and cached afterwards.
+
+    :param str name: the name of the control block passed to the publisher
+    :param float timeout: maximum time in seconds to wait for a consistent version while the publisher is writing
+    """
+
+    def __init__(self, name, timeout=1.):
+        self.name = name
+        self._control = _attach(name)
+        deadline = time.monotonic() + timeout
+        while True:
+            generation = self.current_generation()
+            try:
+                data = _attach(_data_block_name(name, generation))
+                break
+            except FileNotFoundError:
+                # the block has been replaced by a newer one in the meantime
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(_RETRY_INTERVAL)
+        self.generation = generation
+        self._data = data
+        # detaches from the shared memory once the reader is unreachable, values may be read until then
+        self._finalizer = weakref.finalize(self, _close_blocks, self._control, data)
+        index_length, index_digest = _DATA_HEADER.unpack_from(data.buf, 0)[1:]
+        index = bytes(data.buf[_DATA_HEADER.size:_DATA_HEADER.size + index_length])
+        if hashlib.sha1(index).digest() != index_digest:
+            raise ValueError("The shared configuration {0} is corrupt".format(name))
+        self._offsets = pickle.loads(index)
+        self._values_start = _DATA_HEADER.size + index_length
+        self._values = {}
+
+    def current_generation(self):
+        """Returns the generation of the latest published configuration
+
+        :rtype: int
+        """
+        while True:
+            magic, generation, generation_check = _CONTROL.unpack_from(self._control.buf, 0)
+            if magic != _MAGIC:
+                raise ValueError("{0} is not a shared configuration".format(self.name))
+            if generation == generation_check:
+                return generation
+            # the publisher is writing the generation
+            time.sleep(_RETRY_INTERVAL)
+
+    def is_stale(self):
+        """Checks whether a newer configuration has been published since this reader attached
+
+        :rtype: bool
+        """
+        return self.current_generation() != self.generation
+
+    def keys(self):
+        return self._offsets.keys()
+
+    def __contains__(self, key):
+        return key in self._offsets
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def get(self, key, default=None):
+        """Returns the value of a top level key
+
+        :param key: the top level key
+        :param default: what to return if the key is not found
+        """
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        if key not in self._offsets:
+            return default
+        data = self._data
+        if data is None:
+            raise ValueError("The shared configuration {0} has been closed".format(self.name))
+        offset, length = self._offsets[key]
+        start = self._values_start + offset
+        with data.buf[start:start + length] as pickled_value:
+            value = pickle.loads(pickled_value)
+        return self._values.setdefault(key, value)
+
+    def items(self):
+        return [(key, self.get(key)) for key in self._offsets]
+
+    def to_dict(self):
+        """Returns the whole configuration as dict"""
+        return dict(self.items())
+
+    def close(self):
+        """Detaches from the shared memory, values that have not been accessed yet are not available anymore
+
+        A reader that is not closed detaches when it is garbage collected.
+        """
+        self._finalizer()
+        self._data = None
+        self._control = None
+
+
+def _close_blocks(*blocks):
+    for block in blocks:
+        block.close()
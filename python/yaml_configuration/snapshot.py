@@ -0,0 +1,130 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: snapshot
+   :platform: Unix, Windows
+   :synopsis: A binary snapshot cache that avoids parsing unchanged config files.
+
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import struct
+
+from yaml_configuration.utils import atomic_write
+
+_MAGIC = b'YCSNAP01'
+# source mtime in ns, source size, source content digest, payload digest, payload length
+_HEADER = struct.Struct('<qq20s20sQ')
+_NO_DIGEST = b'\0' * 20
+
+logger = logging.getLogger(__name__)
+
+
+def _digest(data):
+    return hashlib.sha1(data).digest()
+
+
+class SnapshotCache(object):
+    """Stores parsed config files as pickled snapshots next to the file or in a cache directory
+
+    A snapshot is only used if the modification time and size of the config file match the ones recorded when the
+    snapshot was written. As two writes within the timestamp resolution of the file system can leave both unchanged,
+    the content of the file can additionally be compared by its hash, which is still much cheaper than parsing it.
+
+    Snapshots carry a digest of their payload and are rejected if it does not match, so a truncated or corrupt
+    snapshot leads to a normal parse of the config file. Snapshots are unpickled, hence the snapshot location must
+    only be writable by users that may also modify the config files.
+
+    :param str cache_dir: directory for the snapshots, if None they are stored next to the config file
+    :param bool verify_content: if True, the content hash of the config file is checked as well
+    """
+
+    def __init__(self, cache_dir=None, verify_content=False):
+        self.cache_dir = cache_dir
+        self.verify_content = verify_content
+
+    def snapshot_path(self, path):
+        """Returns the path of the snapshot belonging to a config file
+
+        :param str path: the path of the config file
+        :return: the path of the snapshot file
+        """
+        path = os.path.abspath(path)
+        if self.cache_dir is None:
+            return os.path.join(os.path.dirname(path), '.{0}.snapshot'.format(os.path.basename(path)))
+        name = hashlib.sha1(path.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, '{0}.snapshot'.format(name))
+
+    def load(self, path, loader):
+        """Returns the content of a config file, preferably from its snapshot
+
+        :param str path: the path of the config file
+        :param loader: function parsing the config file given its path, used if no valid snapshot exists
+        :return: the content of the config file
+        """
+        stat = os.stat(path)
+        content_digest = self._content_digest(path)
+        dictionary = self._read(path, stat, content_digest)
+        if dictionary is not None:
+            return dictionary
+        dictionary = loader(path)
+        try:
+            self._write(path, dictionary, stat, content_digest)
+        except Exception as e:
+            logger.debug("Could not write snapshot for {0}: {1}".format(path, e))
+        return dictionary
+
+    def invalidate(self, path):
+        """Removes the snapshot of a config file
+
+        :param str path: the path of the config file
+        """
+        try:
+            os.remove(self.snapshot_path(path))
+        except OSError:
+            pass
+
+    def _content_digest(self, path):
+        if not self.verify_content:
+            return _NO_DIGEST
+        with open(path, 'rb') as f:
+            return _digest(f.read())
+
+    def _read(self, path, stat, content_digest):
+        try:
+            with open(self.snapshot_path(path), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        header_end = len(_MAGIC) + _HEADER.size
+        if len(data) < header_end or not data.startswith(_MAGIC):
+            return None
+        mtime_ns, size, snapshot_content_digest, payload_digest, payload_length = \
+            _HEADER.unpack_from(data, len(_MAGIC))
+        if mtime_ns != stat.st_mtime_ns or size != stat.st_size or snapshot_content_digest != content_digest:
+            return None
+        payload = data[header_end:]
+        if len(payload) != payload_length or _digest(payload) != payload_digest:
+            logger.warning("Ignoring corrupt snapshot of {0}".format(path))
+            return None
+        try:
+            return pickle.loads(payload)
+        except Exception as e:
+            logger.warning("Ignoring unreadable snapshot of {0}: {1}".format(path, e))
+            return None
+
+    def _write(self, path, dictionary, stat, content_digest):
+        payload = pickle.dumps(dictionary, protocol=pickle.HIGHEST_PROTOCOL)
+        header = _HEADER.pack(stat.st_mtime_ns, stat.st_size, content_digest, _digest(payload), len(payload))
+        snapshot_path = self.snapshot_path(path)
+        directory = os.path.dirname(snapshot_path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        atomic_write(snapshot_path, _MAGIC + header + payload)
@@ -0,0 +1,321 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: splice
+   :platform: Unix, Windows
+   :synopsis: Rewriting single values of yaml config files, keeping comments and formatting.
+
+"""
+
+from bisect import bisect_right
+
+from yaml_configuration.merge import MISSING, get_path
+from yaml_configuration.utils import atomic_write
+
+_STR_TAG = 'tag:yaml.org,2002:str'
+_MERGE_TAG = 'tag:yaml.org,2002:merge'
+
+# the kinds of nodes: values that are replaced as a whole, block collections whose items are replaced one by one and
+# values that cannot be replaced, e.g. block scalars or empty values
+_VALUE = 0
+_MAPPING = 1
+_SEQUENCE = 2
+_FIXED = 3
+
+
+class _NotSpliceable(Exception):
+    """Raised if the values of a document cannot be replaced independently"""
+
+
+class YamlLayout(object):
+    """The text of a yaml config file and the position of each value within it
+
+    The positions are recorded from the composed nodes of the document, either when the file is loaded by
+    :meth:`load` or on the first call of :meth:`splice`. Documents containing aliases or merge keys, or without a top
+    level block mapping, are never spliced.
+
+    :param str text: the content of the config file
+    :param loader_class: the yaml loader class used to compose the document
+    :param dict positions: the recorded positions, None to record them on the first splice
+    :ivar version: the stat of the config file containing text, compared before splicing
+    """
+
+    def __init__(self, text, loader_class, positions=None):
+        self.text = text
+        self.version = None
+        self._loader_class = loader_class
+        # the positions of the nodes in the text the layout was created with, by path:
+        # (start, end, kind, number of items)
+        self._positions = positions
+        # the total change of the length of the text by the end of each replaced node in the original text
+        self._deltas = {}
+        self._delta_ends = []
+        self._delta_sums = []
+
+    @classmethod
+    def load(cls, text, loader_class):
+        """Parses a yaml document and records the positions of its values
+
+        :param str text: the yaml document
+        :param loader_class: the yaml loader class
+        :return: the layout and the constructed document
+        :rtype: tuple
+        """
+        loader = loader_class(text)
+        try:
+            node = loader.get_single_node()
+            positions = _record_positions(loader, node)
+            value = loader.construct_document(node) if node is not None else None
+        finally:
+            loader.dispose()
+        return cls(text, loader_class, positions), value
+
+    @property
+    def positions(self):
+        if self._positions is None:
+            loader = self._loader_class(self.text)
+            try:
+                self._positions = _record_positions(loader, loader.get_single_node())
+            finally:
+                loader.dispose()
+        return self._positions
+
+    def _range(self, path):
+        """Returns the current position of a node in text"""
+        start, end = self._positions[path][:2]
+        ends = self._delta_ends
+        if ends:
+            sums = self._delta_sums
+            index = bisect_right(ends, start)
+            start += sums[index - 1] if index else 0
+            index = bisect_right(ends, end)
+            end += sums[index - 1] if index else 0
+        return start, end
+
+    def splice(self, config_dict, changed_paths, dumper):
+        """Computes the text of the config file with the changed values replaced
+
+        Each changed value is replaced by its flow style representation, unchanged values are kept as they are,
+        including comments and empty lines. Changed dicts and lists with block style are not replaced as a whole, but
+        value by value.
+
+        :param dict config_dict: the configuration to be saved
+        :param changed_paths: the paths (tuples of keys) of the values changed since text has been written
+        :param dumper: the yaml dumper class
+        :return: the splice, None if the structure of the configuration changed, e.g. because a value has been added
+            or removed, and the whole configuration has to be dumped
+        :rtype: YamlSplice
+        """
+        positions = self.positions
+        replacements = {}
+        for path in changed_paths:
+            path = tuple(path)
+            # values within flow collections are replaced together with the collection
+            for depth in range(1, len(path)):
+                entry = positions.get(path[:depth])
+                if entry is not None and entry[2] == _VALUE:
+                    path = path[:depth]
+                    break
+            if not self._replace(path, get_path(config_dict, path), replacements, dumper):
+                return None
+        text = self.text
+        edits = []
+        for path, (start, end, replacement) in replacements.items():
+            if text[start:end] != replacement and not self._represents(text[start:end], get_path(config_dict, path)):
+                edits.append((start, end, replacement, path))
+        edits.sort()
+        return YamlSplice(self, edits)
+
+    def _replace(self, path, value, replacements, dumper):
+        if value is MISSING:
+            return False
+        entry = self.positions.get(path)
+        if entry is None:
+            return False
+        kind = entry[2]
+        if kind == _VALUE:
+            replacement = _represent(value, dumper)
+            if replacement is None:
+                return False
+            start, end = self._range(path)
+            replacements[path] = (start, end, replacement)
+            return True
+        if kind == _MAPPING and type(value) is dict and len(value) == entry[3]:
+            return all(self._replace(path + (key,), child, replacements, dumper) for key, child in value.items())
+        if kind == _SEQUENCE and type(value) in (list, tuple) and len(value) == entry[3]:
+            return all(self._replace(path + (index,), child, replacements, dumper)
+                       for index, child in enumerate(value))
+        return False
+
+    def _represents(self, text, value):
+        """Whether the text of a node is another representation of value, e.g. a quoted string"""
+        import yaml
+        try:
+            text_value = yaml.load(text, Loader=self._loader_class)
+        except yaml.YAMLError:
+            return False
+        return type(text_value) is type(value) and text_value == value
+
+    def _apply(self, edits, text):
+        """Updates the layout after edits have been written"""
+        deltas = self._deltas
+        for start, end, replacement, path in edits:
+            original_end = self._positions[path][1]
+            deltas[original_end] = deltas.get(original_end, 0) + len(replacement) - (end - start)
+        self._delta_ends = sorted(deltas)
+        self._delta_sums = []
+        total = 0
+        for original_end in self._delta_ends:
+            total += deltas[original_end]
+            self._delta_sums.append(total)
+        self.text = text
+
+
+class YamlSplice(object):
+    """The replacements of changed values computed by :meth:`YamlLayout.splice`
+
+    :ivar list edits: the replaced ranges of the text as (start, end, replacement, path), sorted by start
+    :ivar str text: the new content of the config file
+    """
+
+    def __init__(self, layout, edits):
+        self.layout = layout
+        self.edits = edits
+        parts = []
+        position = 0
+        text = layout.text
+        for start, end, replacement, _ in edits:
+            parts.append(text[position:start])
+            parts.append(replacement)
+            position = end
+        parts.append(text[position:])
+        self.text = ''.join(parts)
+
+    def write(self, path, atomic=True):
+        """Writes the changes to the config file, which must still contain the text of the layout
+
+        Unless atomic is set, only the changed part of the file is written: the replaced values if their lengths in
+        bytes did not change, the file from the first replaced value on otherwise. The file is modified in place in
+        this case, so a crash or an error while writing leaves a partially written file behind.
+
+        :param str path: the path of the config file
+        :param bool atomic: if True, the whole file is replaced by renaming a temporary file, if False, the changes
+            are written in place
+        :return: the number of bytes written
+        :rtype: int
+        """
+        layout = self.layout
+        edits = self.edits
+        written = 0
+        if atomic:
+            data = self.text.encode('utf-8')
+            atomic_write(path, data)
+            written = len(data)
+        elif edits:
+            old_text = layout.text
+            # the positions are character offsets, which are the byte offsets as long as the text is ascii
+            ascii_text = len(old_text.encode('utf-8')) == len(old_text)
+            replacements = [replacement.encode('utf-8') for _, _, replacement, _ in edits]
+            with open(path, 'r+b') as f:
+                if all(len(data) == len(old_text[start:end].encode('utf-8'))
+                       for (start, end, _, _), data in zip(edits, replacements)):
+                    for (start, _, _, _), data in zip(edits, replacements):
+                        f.seek(_byte_offset(old_text, start, ascii_text))
+                        written += f.write(data)
+                else:
+                    first = edits[0][0]
+                    f.seek(_byte_offset(old_text, first, ascii_text))
+                    written = f.write(self.text[first:].encode('utf-8'))
+                    f.truncate()
+        layout._apply(edits, self.text)
+        return written
+
+
+def _byte_offset(text, index, ascii_text):
+    if ascii_text:
+        return index
+    return len(text[:index].encode('utf-8'))
+
+
+def _represent(value, dumper):
+    """Returns the single line flow style yaml of a value, None if it needs several lines"""
+    import yaml
+    # no line breaks, libyaml does not accept an infinite width
+    text = yaml.dump(value, Dumper=dumper, default_flow_style=True, width=1 << 30)
+    if text.endswith('\n...\n'):
+        text = text[:-5]
+    text = text.rstrip('\n')
+    if not text or '\n' in text:
+        return None
+    return text
+
+
+def _record_positions(loader, node):
+    """Returns the positions of all nodes by path, empty if the values cannot be replaced independently"""
+    from yaml.nodes import MappingNode
+    positions = {}
+    if not isinstance(node, MappingNode) or node.flow_style:
+        return positions
+    try:
+        _record(loader, node, (), positions, set())
+    except _NotSpliceable:
+        return {}
+    return positions
+
+
+def _record(loader, node, path, positions, seen):
+    from yaml.nodes import MappingNode, ScalarNode
+    if id(node) in seen:
+        # an alias, replacing one of its occurrences would not change the others
+        raise _NotSpliceable()
+    seen.add(id(node))
+    start = node.start_mark.index
+    end = node.end_mark.index
+    if isinstance(node, ScalarNode):
+        # block scalars include the following line break and empty plain scalars are positioned at the next token
+        spliceable = node.style not in ('|', '>') and (node.value or node.style)
+        positions[path] = (start, end, _VALUE if spliceable else _FIXED, 0)
+        return
+    if node.flow_style:
+        positions[path] = (start, end, _VALUE, 0)
+        for child in _children(node):
+            _check_aliases(child, seen)
+        return
+    if isinstance(node, MappingNode):
+        positions[path] = (start, end, _MAPPING, len(node.value))
+        for key_node, value_node in node.value:
+            _record(loader, value_node, path + (_key(loader, key_node),), positions, seen)
+        return
+    positions[path] = (start, end, _SEQUENCE, len(node.value))
+    for index, child in enumerate(node.value):
+        _record(loader, child, path + (index,), positions, seen)
+
+
+def _children(node):
+    from yaml.nodes import MappingNode, ScalarNode
+    if isinstance(node, ScalarNode):
+        return []
+    if isinstance(node, MappingNode):
+        return [child for item in node.value for child in item]
+    return node.value
+
+
+def _check_aliases(node, seen):
+    if id(node) in seen:
+        raise _NotSpliceable()
+    seen.add(id(node))
+    for child in _children(node):
+        _check_aliases(child, seen)
+
+
+def _key(loader, node):
+    from yaml.nodes import ScalarNode
+    if not isinstance(node, ScalarNode) or node.tag == _MERGE_TAG:
+        raise _NotSpliceable()
+    if node.tag == _STR_TAG:
+        return node.value
+    return loader.construct_object(node)
@@ -0,0 +1,138 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: transaction
+   :platform: Unix, Windows
+   :synopsis: Batches of configuration changes that are published and saved at once.
+
+"""
+
+import threading
+
+from yaml_configuration.paths import join_path, resolve_key, split_path
+
+
+class ConfigTransaction(object):
+    """Stages changes of a configuration and applies them all at once
+
+    Use it by ``with config.transaction() as transaction:``. Within the block, :meth:`set_config_value` of the
+    transaction or of the configuration (called from the same thread) only modifies a private copy. When the block
+    exits, all changes are published as a single new version and the configuration is saved by a single atomic
+    write. If the block raises an exception, the changes are discarded.
+
+    Other threads keep reading the previous version until the transaction is committed. Their writes wait for the
+    end of the transaction.
+
+    :param config: the :class:`~yaml_configuration.config.DefaultConfig` to be modified
+    :param bool save: if True, the configuration is saved when the transaction is committed
+    """
+
+    def __init__(self, config, save=True):
+        self._config = config
+        self.save = save
+        self._owner = None
+        self._depth = 0
+        self._working = None
+        # the dicts that have already been copied for this transaction, kept alive so their ids are not reused
+        self._copies = {}
+        self._changed_paths = {}
+
+    @property
+    def active(self):
+        """Whether the transaction has been entered by the current thread"""
+        return self._owner == threading.get_ident()
+
+    def __enter__(self):
+        config = self._config
+        config._write_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._working = dict(config._materialize())
+                self._copies = {id(self._working): self._working}
+                self._changed_paths = {}
+                self._owner = threading.get_ident()
+                config._transaction = self
+            except BaseException:
+                config._write_lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        config = self._config
+        self._depth -= 1
+        try:
+            if self._depth == 0:
+                config._transaction = None
+                self._owner = None
+                if exc_type is None and self._changed_paths:
+                    config._commit_transaction(self._working, self._changed_paths, self.save)
+        finally:
+            if self._depth == 0:
+                self._working = None
+                self._copies = {}
+            config._write_lock.release()
+
+    def get_config_value(self, key, default=None):
+        """Returns a value including the staged changes
+
+        :param key: the key or dotted path to the configuration value
+        :param default: what to return if the key is not found
+        """
+        working = self._working
+        if key in working:
+            return working[key]
+        if not isinstance(key, str) or '.' not in key:
+            return default
+        value = working
+        for path_key in split_path(key):
+            if not isinstance(value, dict):
+                return default
+            path_key = resolve_key(value, path_key)
+            if path_key not in value:
+                return default
+            value = value[path_key]
+        return value
+
+    def set_config_value(self, key, value):
+        """Stages a change, see :meth:`~yaml_configuration.config.DefaultConfig.set_config_value`
+
+        :param key: the key or dotted path to the configuration value
+        :param value: the new value
+        """
+        from yaml_configuration.config import ConfigError
+        if not self.active:
+            raise ConfigError("The transaction has not been entered by this thread")
+        working = self._working
+        if key in working or not isinstance(key, str) or '.' not in key:
+            path = (key,)
+        else:
+            path = split_path(key)
+        copies = self._copies
+        parent = working
+        resolved_path = []
+        for depth, path_key in enumerate(path[:-1]):
+            path_key = resolve_key(parent, path_key)
+            resolved_path.append(path_key)
+            child = parent.get(path_key)
+            if child is None and path_key not in parent:
+                child = {}
+            elif not isinstance(child, dict):
+                raise ConfigError("Cannot set {0}, {1} is not a dictionary".format(
+                    key, join_path(path[:depth + 1])))
+            elif id(child) in copies:
+                parent = child
+                continue
+            else:
+                child = dict(child)
+            copies[id(child)] = child
+            parent[path_key] = child
+            parent = child
+        resolved_path.append(resolve_key(parent, path[-1]))
+        path = tuple(resolved_path)
+        parent[path[-1]] = value
+        self._changed_paths[path] = None
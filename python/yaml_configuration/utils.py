@@ -0,0 +1,135 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: utils
+   :platform: Unix, Windows
+   :synopsis: Small helpers shared by the configuration modules.
+
+"""
+
+import os
+
+_IMMUTABLE_TYPES = (str, bytes, int, float, bool, complex, type(None))
+
+def copy_tree(value):
+    """Copies the containers of a configuration tree
+
+    Only dicts, lists, sets and tuples are rebuilt, immutable leaves (strings, numbers, ...) are shared with the
+    source. Unknown objects are copied with :func:`copy.deepcopy`.
+
+    :param value: the (nested) value to be copied
+    :return: a copy of value that can be modified without affecting the source
+    """
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return value
+    value_type = type(value)
+    if value_type is dict:
+        return {k: copy_tree(v) for k, v in value.items()}
+    if value_type is list:
+        return [copy_tree(v) for v in value]
+    if value_type is tuple:
+        return tuple(copy_tree(v) for v in value)
+    if value_type is set:
+        return set(value)
+    import copy
+    return copy.deepcopy(value)
+
+
+def _umask():
+    """Returns the current umask of the process
+
+    It is read from ``/proc/self/status`` if possible. Elsewhere it can only be read by setting it, which briefly
+    affects files created by other threads.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+def atomic_write(path, data, fsync=False):
+    """Writes data to a file by writing a temporary file and renaming it
+
+    Readers either see the old or the new content of the file, never a partially written one.
+
+    :param str path: the target file path
+    :param data: the content to be written, either str or bytes
+    :param bool fsync: if True, the data is flushed to disk before the file is renamed
+    """
+    directory = os.path.dirname(path) or os.curdir
+    import shutil
+    import tempfile
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, mode) as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        else:
+            os.chmod(temp_path, 0o666 & ~_umask())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    if fsync and hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class FileLock(object):
+    """An exclusive advisory lock of a file shared by several processes
+
+    The lock is held on a separate ``<path>.lock`` file, because config files are replaced by renaming a new file,
+    which would silently drop a lock held on the old file. The lock file is kept after the lock is released, removing
+    it could let two processes lock different files of the same name. On platforms without :mod:`fcntl`, the lock does
+    nothing. Use it by ``with FileLock(path):``, it is not reentrant.
+
+    :param str path: the path of the file to be locked
+    """
+
+    def __init__(self, path):
+        self.path = path + '.lock'
+        self._fd = None
+
+    def __enter__(self):
+        try:
+            import fcntl
+        except ImportError:
+            return self
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            # closing the file releases the lock
+            os.close(fd)
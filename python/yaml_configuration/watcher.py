@@ -0,0 +1,175 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: watcher
+   :platform: Unix, Windows
+   :synopsis: Watches config files for modifications.
+
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_inotify():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FileWatcher(object):
+    """Calls a callback in a background thread whenever a file has been modified
+
+    On Linux, inotify is used to watch the directory of the file, so replacing the file by renaming another one onto
+    it is detected as well. Otherwise, or if inotify is not available, the modification time, size and inode of the
+    file are polled. The callback is only called once the file has not been modified for ``debounce`` seconds.
+
+    :param str path: the file to be watched
+    :param callback: function called without arguments after the file has been modified
+    :param float debounce: time in seconds without further modifications before the callback is called
+    :param float poll_interval: time in seconds between two checks if the file is polled
+    :param bool use_inotify: if False, the file is always polled
+    """
+
+    def __init__(self, path, callback, debounce=0.2, poll_interval=1.0, use_inotify=True):
+        self.path = os.path.abspath(path)
+        self.callback = callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._libc = _load_inotify() if use_inotify else None
+        self._stop_event = threading.Event()
+        self._wakeup_pipe = None
+        self._thread = None
+
+    @property
+    def uses_inotify(self):
+        return self._libc is not None
+
+    def start(self):
+        """Starts watching the file"""
+        if self._thread is not None:
+            return
+        inotify_fd = self._init_inotify() if self._libc is not None else None
+        if inotify_fd is not None:
+            self._wakeup_pipe = os.pipe()
+            target = self._run_inotify
+            args = (inotify_fd,)
+        else:
+            self._libc = None
+            target = self._run_polling
+            args = (self._stat(),)
+        self._thread = threading.Thread(target=target, args=args, name="FileWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stops watching the file and waits for the background thread to finish
+
+        :param float timeout: maximum time to wait in seconds, None waits forever
+        """
+        if self._stop_event.is_set():
+            return
+        self._stop_event.set()
+        if self._wakeup_pipe is not None:
+            os.write(self._wakeup_pipe[1], b'\0')
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _init_inotify(self):
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            logger.debug("inotify_init1 failed ({0}), falling back to polling".format(ctypes.get_errno()))
+            return None
+        directory = os.path.dirname(self.path).encode(sys.getfilesystemencoding())
+        if self._libc.inotify_add_watch(fd, directory, _IN_MASK) < 0:
+            logger.debug("inotify_add_watch failed ({0}), falling back to polling".format(ctypes.get_errno()))
+            os.close(fd)
+            return None
+        return fd
+
+    def _run_inotify(self, inotify_fd):
+        name = os.path.basename(self.path).encode(sys.getfilesystemencoding())
+        read_fd, write_fd = self._wakeup_pipe
+        try:
+            deadline = None
+            while not self._stop_event.is_set():
+                # after a modification, wait until no further one happened for debounce seconds
+                timeout = None if deadline is None else max(0., deadline - time.monotonic())
+                readable, _, _ = select.select([inotify_fd, read_fd], [], [], timeout)
+                if self._stop_event.is_set():
+                    break
+                if inotify_fd in readable and name in self._read_inotify_names(inotify_fd):
+                    deadline = time.monotonic() + self.debounce
+                elif deadline is not None and time.monotonic() >= deadline:
+                    deadline = None
+                    self._notify()
+        finally:
+            os.close(inotify_fd)
+            os.close(read_fd)
+            os.close(write_fd)
+
+    @staticmethod
+    def _read_inotify_names(inotify_fd):
+        names = set()
+        try:
+            data = os.read(inotify_fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            names.add(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+        return names
+
+    def _run_polling(self, last_stat):
+        modified_at = None
+        while not self._stop_event.wait(self.debounce if modified_at is not None else self.poll_interval):
+            stat = self._stat()
+            if stat != last_stat:
+                last_stat = stat
+                modified_at = time.monotonic()
+            elif modified_at is not None and time.monotonic() - modified_at >= self.debounce:
+                modified_at = None
+                self._notify()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _notify(self):
+        try:
+            self.callback()
+        except Exception as e:
+            logger.exception("Error in file watcher callback for {0}: {1}".format(self.path, e))
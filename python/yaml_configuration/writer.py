@@ -0,0 +1,137 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+"""
+.. module:: writer
+   :platform: Unix, Windows
+   :synopsis: A background writer that coalesces config saves.
+
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+
+from yaml_configuration.utils import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindWriter(object):
+    """Writes configurations to disk in a background thread
+
+    Saves submitted within ``window`` seconds of the first pending save are merged, so only the latest content of
+    each file is serialized and written. Files are written through a temporary file and an atomic rename.
+
+    :param serializer: function converting the submitted data to the str or bytes written to disk
+    :param float window: time in seconds to wait for further saves before writing
+    :param bool fsync: if True, the data is flushed to disk before the file is renamed
+    """
+
+    def __init__(self, serializer, window=0.05, fsync=False):
+        self.serializer = serializer
+        self.window = window
+        self.fsync = fsync
+        self._pending = {}
+        self._writing = False
+        self._errors = []
+        self._closed = False
+        self._urgent = False
+        self._thread = None
+        self._condition = threading.Condition()
+
+    def submit(self, path, data, serializer=None):
+        """Schedules data to be written to path
+
+        The data must not be modified by the caller afterwards. An earlier pending submission for the same path is
+        replaced.
+
+        :param str path: the target file path
+        :param data: the data passed to the serializer
+        :param serializer: function used instead of the serializer of the writer for this submission
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The writer has already been closed")
+            self._pending[path] = (data, serializer)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="WriteBehindWriter", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Blocks until all submitted data is written to disk
+
+        :param float timeout: maximum time to wait in seconds, None waits forever
+        :return: True if all data has been written, False on timeout
+        :raises Exception: the first error that occurred while writing since the last flush
+        """
+        with self._condition:
+            # do not wait for the end of the merge window
+            self._urgent = True
+            self._condition.notify_all()
+            done = self._condition.wait_for(lambda: not self._pending and not self._writing, timeout)
+            self._urgent = False
+            errors, self._errors = self._errors, []
+        if errors:
+            raise errors[0]
+        return done
+
+    def close(self, timeout=None):
+        """Writes all pending data and stops the background thread
+
+        :param float timeout: maximum time to wait in seconds, None waits forever
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            atexit.unregister(self.close)
+        with self._condition:
+            errors, self._errors = self._errors, []
+        if errors:
+            raise errors[0]
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                if not self._closed:
+                    # give further saves the chance to be merged into this write
+                    deadline = time.monotonic() + self.window
+                    while not self._closed and not self._urgent:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                pending, self._pending = self._pending, {}
+                self._urgent = False
+                self._writing = True
+            for path, (data, serializer) in pending.items():
+                try:
+                    self._write(path, data, serializer)
+                except Exception as e:
+                    logger.error("Could not write configuration to {0}: {1}".format(path, e))
+                    with self._condition:
+                        self._errors.append(e)
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+    def _write(self, path, data, serializer=None):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        atomic_write(path, (serializer or self.serializer)(data), fsync=self.fsync)
@@ -0,0 +1,87 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import asyncio
+
+from yaml_configuration.config import DefaultConfig, load_dict_from_yaml
+
+DEFAULT_CONFIG = """
+A: 1
+B: text
+"""
+
+
+def test_aload_and_areload(tmp_path):
+    config = DefaultConfig(DEFAULT_CONFIG)
+
+    async def main():
+        await config.aload("config.yaml", path=str(tmp_path))
+        (tmp_path / "config.yaml").write_text("A: 2\nB: text\n")
+        return await config.areload()
+
+    changes = asyncio.run(main())
+    assert [change.path for change in changes] == [("A",)]
+    assert config.get_config_value("A") == 2
+
+
+def test_concurrent_saves_are_merged(tmp_path):
+    config = DefaultConfig(DEFAULT_CONFIG)
+    config.load("config.yaml", path=str(tmp_path))
+    writes = []
+    save_configuration = config.save_configuration
+
+    def counting_save():
+        writes.append(config.get_config_value("A"))
+        save_configuration()
+
+    config.save_configuration = counting_save
+
+    async def main():
+        saves = []
+        for i in range(10):
+            config.set_config_value("A", i)
+            saves.append(asyncio.ensure_future(config.asave()))
+        await asyncio.gather(*saves)
+        config.set_config_value("A", 42)
+        await config.asave()
+
+    asyncio.run(main())
+    assert writes == [9, 42]
+    assert load_dict_from_yaml(str(tmp_path / "config.yaml"))["A"] == 42
+
+
+def test_failed_save_is_reported_to_all_merged_calls(tmp_path):
+    config = DefaultConfig(DEFAULT_CONFIG)
+    config.load("config.yaml", path=str(tmp_path))
+
+    def failing_save():
+        raise IOError("disk full")
+
+    config.save_configuration = failing_save
+
+    async def main():
+        return await asyncio.gather(config.asave(), config.asave(), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [str(result) for result in results] == ["disk full", "disk full"]
+
+
+def test_cancelled_save_does_not_cancel_merged_saves(tmp_path):
+    config = DefaultConfig(DEFAULT_CONFIG)
+    config.load("config.yaml", path=str(tmp_path))
+    config.set_config_value("A", 3)
+
+    async def main():
+        first = asyncio.ensure_future(config.asave())
+        second = asyncio.ensure_future(config.asave())
+        await asyncio.sleep(0)
+        first.cancel()
+        await second
+        assert first.cancelled()
+
+    asyncio.run(main())
+    assert load_dict_from_yaml(str(tmp_path / "config.yaml"))["A"] == 3
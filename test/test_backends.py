@@ -0,0 +1,87 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import json
+
+import pytest
+
+from yaml_configuration import backends
+from yaml_configuration.backends import JsonBackend, PickleBackend, YamlBackend, convert, get_backend
+from yaml_configuration.config import ConfigError, DefaultConfig
+
+DEFAULT_CONFIG = """
+A: 1
+NESTED:
+    b: [1, 2]
+    c: text
+"""
+
+FORMATS = ["yaml", "json", "pickle", pytest.param("msgpack", marks=pytest.mark.skipif(
+    backends.msgpack is None, reason="msgpack is not installed"))]
+
+
+def test_backend_is_selected_by_name_or_extension():
+    assert isinstance(get_backend("auto", path="config.json"), JsonBackend)
+    assert isinstance(get_backend("auto", path="config.PKL"), PickleBackend)
+    assert isinstance(get_backend("auto", path="config.yaml"), YamlBackend)
+    assert isinstance(get_backend("auto", path="config.conf"), YamlBackend)
+    assert isinstance(get_backend(path="config.json"), YamlBackend)
+    assert isinstance(get_backend("json", path="config.yaml"), JsonBackend)
+    with pytest.raises(ValueError):
+        get_backend("ini")
+
+
+@pytest.mark.parametrize("backend", FORMATS)
+def test_defaults_are_filled_up_with_every_backend(tmp_path, backend):
+    config = DefaultConfig(DEFAULT_CONFIG, backend=backend)
+    config.load("config.data", path=str(tmp_path))
+    assert get_backend(backend).load(str(tmp_path / "config.data")) == {"A": 1, "NESTED": {"b": [1, 2], "c": "text"}}
+
+    get_backend(backend).dump({"A": 2, "NESTED": {"c": "other"}}, str(tmp_path / "config.data"))
+    config = DefaultConfig(DEFAULT_CONFIG, backend=backend)
+    config.load("config.data", path=str(tmp_path))
+    assert config.get_config_value("A") == 2
+    assert config.get_config_value("NESTED") == {"b": [1, 2], "c": "other"}
+
+    config.set_config_value("A", 3)
+    config.save_configuration()
+    assert get_backend(backend).load(str(tmp_path / "config.data"))["A"] == 3
+
+
+def test_yaml_is_the_default_for_every_extension(tmp_path):
+    (tmp_path / "config.json").write_text("A: 5\n")
+    config = DefaultConfig(DEFAULT_CONFIG)
+    config.load("config.json", path=str(tmp_path))
+    assert config.get_config_value("A") == 5
+    config.set_config_value("A", 6)
+    config.save_configuration()
+    assert "A: 6" in (tmp_path / "config.json").read_text()
+
+    config = DefaultConfig(DEFAULT_CONFIG, backend="auto")
+    with pytest.raises(ConfigError):
+        config.load("config.json", path=str(tmp_path))
+
+
+def test_json_file_is_selected_by_extension(tmp_path):
+    config = DefaultConfig(DEFAULT_CONFIG, backend="auto")
+    config.load("config.json", path=str(tmp_path))
+    config.enable_write_behind(window=0)
+    config.set_config_value("A", 5)
+    config.save_configuration()
+    config.flush()
+    assert json.loads((tmp_path / "config.json").read_text())["A"] == 5
+
+
+def test_convert_checks_the_round_trip(tmp_path):
+    (tmp_path / "config.yaml").write_text(DEFAULT_CONFIG)
+    assert convert(str(tmp_path / "config.yaml"), str(tmp_path / "config.json")) == \
+        json.loads((tmp_path / "config.json").read_text())
+
+    (tmp_path / "int_keys.yaml").write_text("1: a\n")
+    with pytest.raises(ValueError):
+        convert(str(tmp_path / "int_keys.yaml"), str(tmp_path / "int_keys.json"))
+    assert not (tmp_path / "int_keys.json").exists()
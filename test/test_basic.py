@@ -21,8 +21,10 @@ from __future__ import print_function
 
 import os
 import logging
+import pytest
 from pytest import raises
 from yaml_configuration.config import DefaultConfig, ConfigError
+from yaml_configuration.utils import atomic_write
 
 
 def read_file(file_path, filename):
@@ -64,6 +66,18 @@ def test_write_to_not_existing_location():
     print("test_write_to_not_existing_location test successful!")
 
 
+
+@pytest.mark.skipif(os.name == "nt", reason="no umask on Windows")
+def test_atomic_write_applies_the_current_umask(tmp_path):
+    target = str(tmp_path / "config.yaml")
+    umask = os.umask(0o027)
+    try:
+        atomic_write(target, "A: 1\n")
+    finally:
+        os.umask(umask)
+    assert os.stat(target).st_mode & 0o777 == 0o640
+
+
 if __name__ == '__main__':
     config_file = "basic_config.yaml"
     config_string = read_file(os.path.dirname(__file__), config_file)
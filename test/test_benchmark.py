@@ -0,0 +1,178 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+"""
+.. module:: test_benchmark
+   :platform: Unix, Windows
+   :synopsis: Performance benchmarks of loading, merging, saving and accessing configurations.
+
+The benchmarks require pytest-benchmark and only run if pytest is called with ``--benchmark-only``, so they do not
+slow down the normal test run. Configurations with 100k keys are only benchmarked if the environment variable
+``YAML_CONFIGURATION_LARGE_BENCHMARKS`` is set.
+
+``benchmark.sh`` in the root of the repository compares the results against the baseline committed in
+``test/benchmark_baseline.json``, failing if a mean is more than 50% (or ``BENCHMARK_TOLERANCE``) above the
+baseline. The baseline has to be recorded on the machine running the comparison::
+
+    sh benchmark.sh --save-baseline
+    sh benchmark.sh -k 1000keys
+
+"""
+
+import os
+
+import pytest
+import yaml
+
+from yaml_configuration.config import DefaultConfig, dump_dict_to_yaml
+from yaml_configuration.defaults import default_config_cache
+from yaml_configuration.engine import get_yaml_engine, set_yaml_engine
+from yaml_configuration.merge import fill_up
+
+pytest.importorskip("pytest_benchmark")
+
+LARGE = pytest.mark.skipif(not os.environ.get("YAML_CONFIGURATION_LARGE_BENCHMARKS"),
+                           reason="set YAML_CONFIGURATION_LARGE_BENCHMARKS to run benchmarks with 100k keys")
+
+# (number of top level keys, nesting depth of each value, length of the list at the bottom of each value)
+CASES = [
+    pytest.param((10, 0, 0), id="10keys"),
+    pytest.param((1000, 0, 0), id="1000keys"),
+    pytest.param((1000, 3, 0), id="1000keys-depth3"),
+    pytest.param((1000, 1, 100), id="1000keys-lists100"),
+    pytest.param((100000, 1, 0), id="100000keys", marks=LARGE),
+]
+
+ENGINES = ["c", "python"]
+
+
+@pytest.fixture(autouse=True)
+def benchmarks_only(request):
+    if not request.config.getoption("benchmark_only"):
+        pytest.skip("benchmarks only run with --benchmark-only")
+
+
+def make_config(keys, depth, list_size):
+    """Creates a synthetic configuration
+
+    :param int keys: the number of top level keys
+    :param int depth: the number of nested dicts below each top level key
+    :param int list_size: the length of a list stored next to the value at the bottom of each top level key
+    :rtype: dict
+    """
+    config = {}
+    for i in range(keys):
+        value = {"value": i, "name": "entry_{0}".format(i)}
+        if list_size:
+            value["items"] = list(range(list_size))
+        for level in range(depth):
+            value = {"level_{0}".format(level): value}
+        config["KEY_{0}".format(i)] = value if depth or list_size else i
+    return config
+
+
+def deepest_path(keys, depth, list_size):
+    """Returns the dotted path of the deepest value of the last top level key"""
+    if not depth and not list_size:
+        return "KEY_{0}".format(keys - 1)
+    return ".".join(["KEY_{0}".format(keys - 1)] + ["level_{0}".format(level) for level in reversed(range(depth))] +
+                    ["value"])
+
+
+@pytest.fixture(params=ENGINES)
+def engine(request):
+    """Selects the libyaml based or the pure python yaml loader and dumper"""
+    if request.param == "c" and not yaml.__with_libyaml__:
+        pytest.skip("libyaml is not available")
+    previous = get_yaml_engine()
+    set_yaml_engine(request.param)
+    default_config_cache.invalidate()
+    yield request.param
+    set_yaml_engine(previous)
+    default_config_cache.invalidate()
+
+
+@pytest.fixture(params=CASES)
+def case(request):
+    keys, depth, list_size = request.param
+    tree = make_config(keys, depth, list_size)
+    return {"tree": tree, "yaml": dump_dict_to_yaml(tree, width=80, default_flow_style=False),
+            "path": deepest_path(keys, depth, list_size)}
+
+
+@pytest.fixture
+def config_dir(tmp_path, case):
+    (tmp_path / "config.yaml").write_text(case["yaml"])
+    return tmp_path
+
+
+def test_init_uncached(benchmark, engine, case):
+    benchmark.pedantic(DefaultConfig, args=(case["yaml"],), setup=default_config_cache.invalidate, rounds=5)
+
+
+def test_init_cached(benchmark, engine, case):
+    default_config_cache.get(case["yaml"])
+    benchmark(DefaultConfig, case["yaml"])
+
+
+def test_load_existing_file(benchmark, engine, case, config_dir):
+    def load():
+        DefaultConfig(case["yaml"]).load("config.yaml", path=str(config_dir))
+
+    benchmark.pedantic(load, rounds=5)
+
+
+def test_load_missing_file(benchmark, engine, case, tmp_path):
+    def remove_file():
+        config_file = tmp_path / "config.yaml"
+        if config_file.exists():
+            config_file.unlink()
+
+    def load():
+        DefaultConfig(case["yaml"]).load("config.yaml", path=str(tmp_path))
+
+    benchmark.pedantic(load, setup=remove_file, rounds=5)
+
+
+def test_fill_up(benchmark, case):
+    tree = case["tree"]
+
+    def setup():
+        # every second top level key is missing
+        return (dict(list(tree.items())[::2]), tree), {}
+
+    benchmark.pedantic(fill_up, setup=setup, rounds=5)
+
+
+def test_save_configuration(benchmark, engine, case, config_dir):
+    config = DefaultConfig(case["yaml"])
+    config.load("config.yaml", path=str(config_dir))
+    benchmark.pedantic(config.save_configuration, rounds=5)
+
+
+def test_get_config_value(benchmark, case):
+    config = DefaultConfig(case["yaml"])
+    path = case["path"]
+    config.get_config_value(path)
+
+    def get():
+        for _ in range(1000):
+            config.get_config_value(path)
+
+    benchmark(get)
+
+
+def test_set_config_value(benchmark, case):
+    config = DefaultConfig(case["yaml"])
+    path = case["path"]
+    config.get_config_value(path)
+
+    def set_value():
+        for i in range(100):
+            config.set_config_value(path, i)
+
+    benchmark(set_value)
@@ -0,0 +1,76 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+from yaml_configuration.compact import compact_tree, memory_report
+from yaml_configuration.config import DefaultConfig, load_dict_from_yaml
+
+DEFAULT_CONFIG = """
+NAME: server
+HOSTS: [a, b]
+FLAG: 1
+TABLE:
+    {0}
+""".format("\n    ".join("key_{0}: {{value: {0}, tags: [x, y]}}".format(i) for i in range(100)))
+
+
+class CompactConfig(DefaultConfig):
+    compact_storage = True
+
+    def __init__(self):
+        super(CompactConfig, self).__init__(DEFAULT_CONFIG)
+
+
+def test_compact_tree_shares_equal_defaults():
+    default = compact_tree({"a": {"b": [1, 2]}, "c": {"d": 1}, "e": True, "g": [3]}, lists_as_tuples=True)
+    tree = compact_tree({"a": {"b": [1, 2]}, "c": {"d": 2}, "e": 1, "f": "new", "g": [3, 4]}, default)
+    assert tree["a"] is default["a"]
+    assert tree["c"] == {"d": 2}
+    assert type(tree["e"]) is int
+    assert tree["a"]["b"] == (1, 2)
+    # only the shared lists of the defaults are tuples
+    assert tree["g"] == [3, 4]
+    assert compact_tree({"g": [3]}, default)["g"] is default["g"]
+
+
+def test_instances_share_default_values(tmp_path):
+    (tmp_path / "config.yaml").write_text("NAME: other\nHOSTS: [a, b, c]\n")
+    first = CompactConfig()
+    first.load("config.yaml", path=str(tmp_path))
+    second = CompactConfig()
+    second.load("config.yaml", path=str(tmp_path))
+
+    assert first.get_config_value("TABLE") is second.get_config_value("TABLE")
+    assert first.get_config_value("HOSTS") == ["a", "b", "c"]
+    assert first.get_config_value("TABLE.key_5.tags") == ("x", "y")
+    assert first.get_config_value("NAME") == "other"
+
+    first.set_config_value("TABLE.key_5.value", -1)
+    assert second.get_config_value("TABLE.key_5.value") == 5
+    first.save_configuration()
+    saved = load_dict_from_yaml(str(tmp_path / "config.yaml"))
+    assert saved["HOSTS"] == ["a", "b", "c"]
+    assert saved["TABLE"]["key_5"] == {"value": -1, "tags": ["x", "y"]}
+
+
+def test_memory_report_shows_savings(tmp_path):
+    config = DefaultConfig(DEFAULT_CONFIG)
+    config.load("config.yaml", path=str(tmp_path))
+    report = config.memory_report()
+    assert report["saved_bytes"] < report["tree_bytes"] / 2
+    assert report["shared_bytes"] == 0
+
+    config.compact()
+    compact_report = config.memory_report()
+    assert compact_report["own_bytes"] < report["own_bytes"] / 4
+    assert compact_report["shared_bytes"] > 0
+    assert config.get_config_value("TABLE.key_1.tags") == ("x", "y")
+
+
+def test_memory_report_sizes_tuples_as_tuples():
+    report = memory_report({"L": tuple(range(1000, 1003))})
+    assert report["saved_bytes"] == 0
+    assert report["tree_bytes"] == report["own_bytes"]
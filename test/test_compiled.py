@@ -0,0 +1,103 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import pytest
+
+from yaml_configuration.compiled import compile_config
+from yaml_configuration.config import ConfigError, DefaultConfig
+from yaml_configuration.frozen import FrozenList
+
+DEFAULT_CONFIG = """
+PORT: 80
+RATIO: 0.5
+NAME: server
+OPTIONAL: null
+HOSTS: [a, b]
+DB:
+    pool:
+        size: 10
+"invalid key": 1
+"""
+
+
+def test_values_are_attributes():
+    compiled_class = compile_config({"A": 1, "B": {"c": "x"}, "not valid": 2, "_private": 3})
+    values = compiled_class({"A": 2, "B": {"c": "y"}, "not valid": 2, "_private": 3})
+    assert values.A == 2
+    assert values.B.c == "y"
+    assert compiled_class.__slots__ == ("A", "B")
+    with pytest.raises(AttributeError):
+        values.other = 1
+
+
+def test_types_are_checked():
+    compiled_class = compile_config({"PORT": 80, "RATIO": 0.5, "ANY": None, "FLAG": True},
+                                    schema={"FLAG": (bool, str)})
+    assert compiled_class({"PORT": 1, "RATIO": 1, "ANY": [], "FLAG": "auto"}).RATIO == 1
+    with pytest.raises(ConfigError, match="PORT must be of type int, not bool"):
+        compiled_class({"PORT": True, "RATIO": 0.5, "ANY": None, "FLAG": True})
+    with pytest.raises(ConfigError, match="FLAG"):
+        compiled_class({"PORT": 1, "RATIO": 0.5, "ANY": None, "FLAG": 1})
+
+
+def test_changes_publish_new_compiled_values(tmp_path):
+    config = DefaultConfig(DEFAULT_CONFIG)
+    config.load("config.yaml", path=str(tmp_path))
+    values = config.compile()
+    pool = values.DB.pool
+    assert (values.PORT, values.NAME, pool.size) == (80, "server", 10)
+    assert isinstance(values.HOSTS, FrozenList)
+
+    assert config.compiled is values
+
+    config.set_config_value("DB.pool.size", 20)
+    config.set_config_value("OPTIONAL", {"any": "value"})
+    assert config.compiled.DB.pool.size == 20
+    assert config.compiled.OPTIONAL == {"any": "value"}
+    assert config.compiled.HOSTS is values.HOSTS
+    # the kept objects are not changed
+    assert (pool.size, values.OPTIONAL) == (10, None)
+
+    (tmp_path / "config.yaml").write_text(DEFAULT_CONFIG.replace("PORT: 80", "PORT: 8080"))
+    config.reload()
+    assert config.compiled.PORT == 8080
+    assert config.compiled.DB.pool.size == 10
+    assert values.PORT == 80
+
+
+def test_invalid_changes_are_rejected():
+    config = DefaultConfig(DEFAULT_CONFIG)
+    values = config.compile()
+    version = config.config_version
+    with pytest.raises(ConfigError, match="DB.pool.size"):
+        config.set_config_value("DB.pool.size", "large")
+    with pytest.raises(ConfigError):
+        config.set_config_value("DB", 1)
+    assert config.config_version == version
+    assert config.get_config_value("DB.pool.size") == 10
+    assert config.compiled is values
+    assert values.DB.pool.size == 10
+
+
+def test_reload_with_invalid_types_keeps_configuration(tmp_path):
+    config = DefaultConfig(DEFAULT_CONFIG)
+    config.load("config.yaml", path=str(tmp_path))
+    values = config.compile()
+    (tmp_path / "config.yaml").write_text(DEFAULT_CONFIG.replace("PORT: 80", "PORT: eighty"))
+    assert config.reload() is None
+    assert values.PORT == 80
+    assert config.get_config_value("PORT") == 80
+
+
+def test_load_with_invalid_types_keeps_configuration(tmp_path):
+    config = DefaultConfig(DEFAULT_CONFIG)
+    values = config.compile()
+    (tmp_path / "config.yaml").write_text(DEFAULT_CONFIG.replace("PORT: 80", "PORT: eighty"))
+    config.load("config.yaml", path=str(tmp_path))
+    assert config.config_file_path is None
+    assert values.PORT == 80
+    assert config.get_config_value("PORT") == 80
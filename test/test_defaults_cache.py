@@ -0,0 +1,35 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+from yaml_configuration.config import DefaultConfig
+from yaml_configuration.defaults import DefaultConfigCache, default_config_cache
+
+DEFAULT_CONFIG = """
+NESTED:
+    a: 1
+LIST_VALUE: [1, 2]
+"""
+
+
+def test_cache_hits_and_invalidation():
+    cache = DefaultConfigCache()
+    first = cache.get(DEFAULT_CONFIG)
+    assert cache.get(DEFAULT_CONFIG) is first
+    assert cache.statistics() == {'hits': 1, 'misses': 1, 'entries': 1}
+    cache.invalidate(DEFAULT_CONFIG)
+    assert cache.get(DEFAULT_CONFIG) is not first
+    assert cache.statistics()['misses'] == 2
+
+
+def test_instances_do_not_share_state():
+    first = DefaultConfig(DEFAULT_CONFIG)
+    second = DefaultConfig(DEFAULT_CONFIG)
+    first.get_config_value("NESTED")["a"] = 2
+    first.get_config_value("LIST_VALUE").append(3)
+    assert second.get_config_value("NESTED") == {"a": 1}
+    assert second.get_config_value("LIST_VALUE") == [1, 2]
+    assert default_config_cache.get(DEFAULT_CONFIG)["NESTED"] == {"a": 1}
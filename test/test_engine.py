@@ -0,0 +1,66 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import pytest
+import yaml
+
+from yaml_configuration import config as config_module
+from yaml_configuration import lazy
+from yaml_configuration.config import ConfigError, DefaultConfig, load_dict_from_yaml
+from yaml_configuration.engine import get_yaml_engine, set_yaml_engine
+
+
+@pytest.fixture
+def restore_engine():
+    previous = get_yaml_engine()
+    yield
+    set_yaml_engine(previous)
+
+
+def test_auto_engine_prefers_libyaml():
+    engine = get_yaml_engine()
+    assert engine.setting == "auto"
+    assert engine.implementation == ("c" if yaml.__with_libyaml__ else "python")
+
+
+def test_engine_is_applied_to_configurations(restore_engine, tmp_path):
+    DefaultConfig("A: 1").load("config.yaml", path=str(tmp_path))
+    engine = set_yaml_engine("python", safe=True)
+    assert (engine.loader, engine.dumper) == (yaml.SafeLoader, yaml.SafeDumper)
+    assert config_module.FullLoader is yaml.SafeLoader
+    assert "pure python (SafeLoader/SafeDumper)" == str(engine)
+
+    (tmp_path / "config.yaml").write_text("A: !!python/tuple [1, 2]\n")
+    with pytest.raises(yaml.constructor.ConstructorError):
+        load_dict_from_yaml(str(tmp_path / "config.yaml"))
+
+
+def test_engine_is_applied_to_lazy_documents(restore_engine, monkeypatch):
+    set_yaml_engine("python", safe=True)
+    loaders = []
+    parse = yaml.parse
+    monkeypatch.setattr(yaml, "parse", lambda stream, Loader: loaders.append(Loader) or parse(stream, Loader))
+    document = lazy.LazyYamlDocument("A: 1\nB: [1, 2]\n")
+    assert loaders == [yaml.SafeLoader]
+    assert document.get("B") == [1, 2]
+
+
+def test_buffered_dump_writes_the_same_content(restore_engine, tmp_path):
+    config = DefaultConfig("A: 1\nB: [1, 2]\n")
+    config.load("streamed.yaml", path=str(tmp_path))
+    set_yaml_engine(buffered=True)
+    config.load("buffered.yaml", path=str(tmp_path))
+    assert (tmp_path / "buffered.yaml").read_text() == (tmp_path / "streamed.yaml").read_text()
+
+
+def test_unavailable_c_engine_is_an_error(restore_engine, monkeypatch):
+    monkeypatch.setattr(yaml, "__with_libyaml__", False)
+    with pytest.raises(ConfigError):
+        set_yaml_engine("c")
+    assert set_yaml_engine("auto").implementation == "python"
+    with pytest.raises(ValueError):
+        set_yaml_engine("fast")
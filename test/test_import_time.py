@@ -0,0 +1,55 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+"""
+.. module:: test_import_time
+   :platform: Unix, Windows
+   :synopsis: Regression tests of the modules and the time needed to import yaml_configuration.
+
+The time budget in milliseconds can be changed with the environment variable ``YAML_CONFIGURATION_IMPORT_BUDGET_MS``.
+
+"""
+
+import os
+import subprocess
+import sys
+
+import yaml_configuration
+
+BUDGET_MS = float(os.environ.get("YAML_CONFIGURATION_IMPORT_BUDGET_MS", 50))
+LAZY_MODULES = ["yaml", "argparse", "logging", "importlib.metadata", "tempfile", "shutil"]
+
+
+def run_python(code, *options):
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(yaml_configuration.__file__)))
+    return subprocess.run([sys.executable] + list(options) + ["-c", code], env=environment, check=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+
+
+def test_dependencies_are_imported_lazily():
+    result = run_python("import sys, yaml_configuration.config, yaml_configuration.layers\n"
+                        "print(' '.join(name for name in {0!r} if name in sys.modules))".format(LAZY_MODULES))
+    assert result.stdout.split() == []
+
+
+def test_version_is_available():
+    result = run_python("import yaml_configuration; print(yaml_configuration.__version__)")
+    assert result.stdout.strip()
+
+
+def test_import_time_is_within_budget():
+    def import_time_ms():
+        result = run_python("import yaml_configuration.config", "-X", "importtime")
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            if fields[-1].strip() == "yaml_configuration.config":
+                return int(fields[1]) / 1000.
+        raise AssertionError("yaml_configuration.config has not been imported")
+
+    # the fastest of several runs is least affected by other load on the machine
+    assert min(import_time_ms() for _ in range(3)) < BUDGET_MS
@@ -0,0 +1,71 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+from yaml_configuration.config import DefaultConfig
+
+DEFAULT_CONFIG = """
+A: 1
+B:
+    c: 2
+D: text
+"""
+
+
+def test_load_and_save_phases_are_measured(tmp_path):
+    calls = []
+    config = DefaultConfig(DEFAULT_CONFIG)
+    instrumentation = config.enable_instrumentation(hook=lambda *args: calls.append(args))
+    config.load("config.yaml", path=str(tmp_path))
+    config.load("config.yaml", path=str(tmp_path))
+    config.save_configuration()
+
+    phases = instrumentation.phases
+    for phase in ("read", "parse", "merge", "serialize", "write"):
+        assert phases[phase].count >= 1
+    file_size = (tmp_path / "config.yaml").stat().st_size
+    assert instrumentation.bytes_read == file_size
+    assert instrumentation.bytes_written == 2 * file_size
+    assert [call[0] for call in calls if call[0] == "read"] == ["read"]
+    assert all(call[3] == str(tmp_path / "config.yaml") for call in calls)
+
+
+def test_failing_hooks_do_not_change_loading(tmp_path):
+    (tmp_path / "config.yaml").write_text("A: 5\n")
+    config = DefaultConfig(DEFAULT_CONFIG)
+
+    def hook(phase, duration, nbytes, path):
+        raise RuntimeError("broken hook")
+
+    instrumentation = config.enable_instrumentation(hook=hook)
+    config.load("config.yaml", path=str(tmp_path))
+    assert config.get_config_value("A") == 5
+    assert config.config_file_path == str(tmp_path / "config.yaml")
+    assert instrumentation.phases["read"].count == 1
+
+
+def test_key_accesses_are_counted(tmp_path):
+    config = DefaultConfig(DEFAULT_CONFIG)
+    config.enable_instrumentation(track_keys=True)
+    config.get_config_value("A")
+    config.get_config_value("A")
+    config.get_config_value("B.c")
+    config.set_config_value("D", "other")
+
+    report = config.instrumentation_report()
+    assert report["reads"] == {"A": 2, "B.c": 1}
+    assert report["writes"] == {"D": 1}
+    assert report["unread_keys"] == ["D"]
+    assert config.get_config_value("D") == "other"
+
+
+def test_disabled_instrumentation_restores_methods():
+    config = DefaultConfig(DEFAULT_CONFIG)
+    config.enable_instrumentation(track_keys=True)
+    config.disable_instrumentation()
+    assert "get_config_value" not in vars(config)
+    assert config.instrumentation_report() is None
+    assert config.get_config_value("A") == 1
@@ -0,0 +1,64 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import argparse
+
+from yaml_configuration.config import DefaultConfig
+from yaml_configuration.layers import LayeredConfig, layer_from_arguments, layer_from_environment, parse_override
+
+DEFAULT_CONFIG = "A: 1\nDB:\n    host: localhost\n    pool:\n        size: 5\n        max: 10\nL: [1]\n"
+
+
+def test_layers_are_merged_with_sources():
+    file_layer = {"DB": {"pool": {"size": 6}}, "L": [2]}
+    layered = LayeredConfig([("defaults", {"DB": {"host": "localhost", "pool": {"size": 5, "max": 10}}, "L": [1]}),
+                             ("file", file_layer),
+                             ("env", {"DB": {"host": "remote"}})])
+    assert layered.get("DB.pool.size") == 6
+    assert layered.source("DB.pool.size") == "file"
+    assert layered.get("DB.pool.max") == 10
+    assert layered.source("DB.pool.max") == "defaults"
+    assert layered.get("DB.host") == "remote"
+    assert layered.get("L") == [2]
+    assert layered.get("DB.pool") == {"size": 6, "max": 10}
+    assert layered.to_dict() == {"DB": {"host": "remote", "pool": {"size": 6, "max": 10}}, "L": [2]}
+    assert layered.get("L") is file_layer["L"]
+    layered.set_layer("cli", {"DB": {"pool": 3}})
+    assert layered.get("DB.pool") == 3
+    assert layered.get("DB.pool.size") is None
+
+
+def test_dict_overrides_value_of_lower_layer():
+    layered = LayeredConfig([("defaults", {"DB": {"host": "localhost"}, "A": {"x": 1}}),
+                             ("file", {"DB": None, "A": 5}),
+                             ("env", {"DB": {"port": 1}, "A": {"y": 2}}),
+                             ("cli", {"A": {"z": 3}})])
+    assert layered.get("DB") == {"port": 1}
+    assert layered.get("DB.host") is None
+    assert layered.source("DB.port") == "env"
+    assert layered.get("A") == {"y": 2, "z": 3}
+    assert layered.get("A.x") is None
+
+
+def test_environment_and_argument_layers():
+    assert layer_from_environment("APP_", environ={"APP_DB__pool__size": "7", "OTHER": "1"}) == \
+        {"DB": {"pool": {"size": 7}}}
+    assert layer_from_arguments(["DB.pool.size=8", "A=text", "L=[1, 2]"]) == \
+        {"DB": {"pool": {"size": 8}}, "A": "text", "L": [1, 2]}
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--set", type=parse_override, action="append", default=[])
+    arguments = parser.parse_args(["--set", "DB.host=remote"])
+    assert layer_from_arguments(arguments.set) == {"DB": {"host": "remote"}}
+
+
+def test_layered_view_follows_config():
+    config = DefaultConfig(DEFAULT_CONFIG)
+    layered = config.layered(("cli", {"A": 3}))
+    assert layered.get("A") == 3
+    assert layered.source("DB.pool.size") == "file"
+    config.set_config_value("DB.pool.size", 9)
+    assert layered.get("DB.pool.size") == 9
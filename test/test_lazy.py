@@ -0,0 +1,56 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import yaml
+
+from yaml_configuration.config import DefaultConfig, load_dict_from_yaml
+from yaml_configuration.lazy import LazyYamlDocument
+
+DOCUMENT = """# comment
+A: 1
+"quoted key": text
+3: int key
+TABLE:
+    x: [1, 2]
+    y: |
+        block
+        text
+    z: {a: 1}
+LIST: &shared
+    - a
+    - b: 1
+ALIAS: *shared
+FLOW: {k: v}
+"""
+
+
+def test_lazy_document_matches_full_load():
+    document = LazyYamlDocument(DOCUMENT)
+    assert list(document.keys()) == ["A", "quoted key", 3, "TABLE", "LIST", "ALIAS", "FLOW"]
+    assert document.get("TABLE") == {"x": [1, 2], "y": "block\ntext\n", "z": {"a": 1}}
+    assert document.to_dict() == yaml.safe_load(DOCUMENT)
+
+
+def test_document_without_top_level_mapping_is_loaded_completely():
+    document = LazyYamlDocument("A: 1\n<<: {B: 2}\n")
+    assert document.to_dict() == {"A": 1, "B": 2}
+
+
+def test_lazy_load_constructs_values_on_demand(tmp_path):
+    class LazyConfig(DefaultConfig):
+        lazy_load = True
+
+    (tmp_path / "config.yaml").write_text(DOCUMENT)
+    config = LazyConfig("A: 0\nTABLE:\n    new: 1\nMISSING: 2\n")
+    config.load("config.yaml", path=str(tmp_path))
+    assert config.get_config_value("TABLE.new") == 1
+    assert config.get_config_value("FLOW.k") == "v"
+    assert config.get_config_value("A") == 1
+    assert sorted(config.get_all_keys(), key=str) == sorted(list(yaml.safe_load(DOCUMENT)) + ["MISSING"], key=str)
+    saved = load_dict_from_yaml(config.config_file_path)
+    assert saved["MISSING"] == 2
+    assert saved["ALIAS"] == ["a", {"b": 1}]
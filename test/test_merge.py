@@ -0,0 +1,33 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import os
+
+from yaml_configuration.config import DefaultConfig
+from yaml_configuration.merge import fill_up
+
+
+def test_fill_up_reports_added_values():
+    config = {"A": {"x": 1, "sub": {}}, "L": [1, {"u": 1}], "KEEP": {"x": 1}}
+    defaults = {"A": {"x": 2, "y": 3, "sub": {"z": 4}}, "L": [1, 2, {"u": 1}, {"u": 2}],
+                "KEEP": {"x": 1, "y": 2}, "NEW": [5]}
+    added = fill_up(config, defaults, keys_not_to_fill_up={"KEEP"})
+    assert sorted(added, key=str) == sorted([("A", "y"), ("A", "sub", "z"), ("L", 2), ("L", 3), ("NEW",)], key=str)
+    assert config == {"A": {"x": 1, "y": 3, "sub": {"z": 4}}, "L": [1, {"u": 1}, 2, {"u": 2}],
+                      "KEEP": {"x": 1}, "NEW": [5]}
+    assert config["NEW"] is not defaults["NEW"]
+    assert fill_up(config, defaults, keys_not_to_fill_up={"KEEP"}) == []
+
+
+def test_load_does_not_rewrite_complete_config(tmp_path):
+    default_config = "A:\n    x: 1\nL: [1, 2]\n"
+    config = DefaultConfig(default_config)
+    config.load("config.yaml", path=str(tmp_path))
+    config.load("config.yaml", path=str(tmp_path))
+    os.utime(config.config_file_path, ns=(0, 0))
+    config.load("config.yaml", path=str(tmp_path))
+    assert os.stat(config.config_file_path).st_mtime_ns == 0
@@ -0,0 +1,80 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+from pytest import raises
+
+from yaml_configuration.config import ConfigError, DefaultConfig
+from yaml_configuration.paths import join_path, split_path
+
+DEFAULT_CONFIG = """
+DB:
+    pool:
+        size: 5
+hosts:
+    example.com:
+        port: 80
+a.b: 1
+"""
+
+
+def test_split_and_join_path():
+    assert split_path("DB.pool.size") == ("DB", "pool", "size")
+    assert split_path("hosts.example\\.com.port") == ("hosts", "example.com", "port")
+    assert join_path(("hosts", "example.com", "back\\slash")) == "hosts.example\\.com.back\\\\slash"
+    assert split_path(join_path(("a.b", "c\\d"))) == ("a.b", "c\\d")
+
+
+def test_get_nested_values():
+    config = DefaultConfig(DEFAULT_CONFIG)
+    assert config.get_config_value("DB.pool.size") == 5
+    assert config.get_config_value("hosts.example\\.com.port") == 80
+    assert config.get_config_value("a.b") == 1
+    assert config.get_config_value("DB.pool.missing", default=3) == 3
+
+
+def test_set_nested_values_updates_index():
+    config = DefaultConfig(DEFAULT_CONFIG)
+    assert config.get_config_value("DB.pool.size") == 5
+    config.set_config_value("DB.pool.size", 10)
+    assert config.get_config_value("DB") == {"pool": {"size": 10}}
+    assert config.get_config_value("DB.pool.size") == 10
+    config.set_config_value("DB.pool", {"max": 3})
+    assert config.get_config_value("DB.pool.size") is None
+    assert config.get_config_value("DB.pool.max") == 3
+    config.set_config_value("NEW.nested.value", True)
+    assert config.get_config_value("NEW.nested") == {"value": True}
+    with raises(ConfigError):
+        config.set_config_value("DB.pool.max.x", 1)
+
+
+def test_non_string_keys_are_addressed_by_their_str_form():
+    config = DefaultConfig("PORTS:\n    1: 80\n    2: 443\n")
+    assert config.get_config_value("PORTS.1") == 80
+    config.set_config_value("PORTS.1", 8080)
+    assert config.get_config_value("PORTS") == {1: 8080, 2: 443}
+    assert config.get_config_value("PORTS.1") == 8080
+    with config.transaction() as transaction:
+        config.set_config_value("PORTS.2", 8443)
+        assert transaction.get_config_value("PORTS.2") == 8443
+    assert config.get_config_value("PORTS") == {1: 8080, 2: 8443}
+
+
+def test_updated_path_index_shares_unchanged_entries():
+    config = DefaultConfig(DEFAULT_CONFIG)
+    assert config.get_config_value("hosts.example\\.com.port") == 80
+    path_index = config._path_index
+    config.set_config_value("DB.pool.size", 10)
+    updated_index = config._path_index
+    assert path_index.get("DB.pool.size") == 5
+    assert updated_index.get("DB.pool.size") == 10
+    assert updated_index.get("hosts.example\\.com.port") == 80
+    # only the bucket of DB is copied, the entries of the other top level keys are shared
+    changed = [(bucket, updated_bucket) for bucket, updated_bucket in zip(path_index._buckets, updated_index._buckets)
+               if bucket is not updated_bucket]
+    assert len(changed) == 1
+    bucket, updated_bucket = changed[0]
+    assert all(updated_bucket[key] is entries for key, entries in bucket.items() if key != "DB")
@@ -0,0 +1,93 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import pickle
+
+import pytest
+
+from yaml_configuration.config import ConfigError, DefaultConfig
+from yaml_configuration.registry import ConfigRegistry
+
+
+class NetworkConfig(DefaultConfig):
+    def __init__(self):
+        super(NetworkConfig, self).__init__("HOST: localhost\nPORT: 80\n")
+
+
+class StorageConfig(DefaultConfig):
+    def __init__(self):
+        super(StorageConfig, self).__init__("ROOT: /tmp\nSIZE: 10\n")
+
+
+class BrokenConfig(DefaultConfig):
+    def __init__(self):
+        raise RuntimeError("broken")
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_configs_are_loaded(tmp_path, use_processes):
+    (tmp_path / "network.yaml").write_text("PORT: 8080\n")
+    registry = ConfigRegistry(max_workers=2, use_processes=use_processes)
+    registry.register(NetworkConfig, "network.yaml", str(tmp_path))
+    registry.register(StorageConfig, "storage.yaml", str(tmp_path / "new"))
+    configs = registry.load_all()
+
+    assert list(configs) == ["NetworkConfig", "StorageConfig"]
+    assert configs["NetworkConfig"].get_config_value("PORT") == 8080
+    assert configs["NetworkConfig"].get_config_value("HOST") == "localhost"
+    assert registry["StorageConfig"].get_config_value("SIZE") == 10
+    assert (tmp_path / "new" / "storage.yaml").is_file()
+    assert registry.errors == {}
+
+
+def test_nested_config_file_is_not_overwritten(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "network.yaml").write_text("PORT: 8080\n")
+    registry = ConfigRegistry()
+    registry.register(NetworkConfig, "sub/network.yaml", str(tmp_path))
+    registry.register(StorageConfig, "new/storage.yaml", str(tmp_path))
+    configs = registry.load_all()
+
+    assert configs["NetworkConfig"].get_config_value("PORT") == 8080
+    assert "8080" in (tmp_path / "sub" / "network.yaml").read_text()
+    assert configs["StorageConfig"].get_config_value("SIZE") == 10
+    assert (tmp_path / "new" / "storage.yaml").is_file()
+    assert registry.errors == {}
+
+
+def test_errors_are_collected_per_config(tmp_path):
+    (tmp_path / "broken.yaml").mkdir()
+    registry = ConfigRegistry()
+    registry.register(BrokenConfig, "broken.yaml", str(tmp_path))
+    registry.register(StorageConfig(), "broken.yaml", str(tmp_path), name="unwritable")
+    registry.register(NetworkConfig, "network.yaml", str(tmp_path))
+    configs = registry.load_all()
+
+    assert list(configs) == ["unwritable", "NetworkConfig"]
+    assert str(registry.errors["BrokenConfig"]) == "broken"
+    assert isinstance(registry.errors["unwritable"], ConfigError)
+    assert configs["unwritable"].get_config_value("SIZE") == 10
+
+
+def test_duplicate_names_are_rejected():
+    registry = ConfigRegistry()
+    registry.register(NetworkConfig, "network.yaml")
+    with pytest.raises(ConfigError):
+        registry.register(NetworkConfig, "other.yaml")
+
+
+def test_loaded_config_can_be_pickled(tmp_path):
+    config = NetworkConfig()
+    config.load("network.yaml", path=str(tmp_path))
+    config.set_config_value("PORT", 1)
+    config.add_change_callback(lambda changes: None)
+    copy = pickle.loads(pickle.dumps(config))
+    assert copy.get_config_value("PORT") == 1
+    assert copy.config_version == config.config_version
+    assert copy.config_file_path == config.config_file_path
+    copy.set_config_value("PORT", 2)
+    assert config.get_config_value("PORT") == 1
@@ -0,0 +1,59 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import gc
+import multiprocessing
+import os
+import uuid
+
+from yaml_configuration.config import DefaultConfig
+
+DEFAULT_CONFIG = "A: 1\nDB:\n    pool:\n        size: 5\n"
+
+
+def _read_in_worker(name, key):
+    config = DefaultConfig("")
+    config.attach_shared(name)
+    return config.get_config_value(key)
+
+
+def test_workers_attach_to_shared_config():
+    name = "yc_test_{0}_{1}".format(os.getpid(), uuid.uuid4().hex[:8])
+    config = DefaultConfig(DEFAULT_CONFIG)
+    try:
+        assert config.publish_shared(name) == 1
+        with multiprocessing.get_context("spawn").Pool(2) as pool:
+            assert pool.starmap(_read_in_worker, [(name, "A"), (name, "DB.pool.size")]) == [1, 5]
+    finally:
+        config.close()
+
+
+def test_reader_detects_new_generation():
+    name = "yc_test_{0}_{1}".format(os.getpid(), uuid.uuid4().hex[:8])
+    config = DefaultConfig(DEFAULT_CONFIG)
+    worker_config = DefaultConfig("")
+    try:
+        config.publish_shared(name)
+        worker_config.attach_shared(name)
+        assert worker_config.get_all_keys() == ["A", "DB"]
+        assert not worker_config.refresh_shared()
+        config.set_config_value("A", 2)
+        config.publish_shared(name)
+        assert worker_config.get_config_value("A") == 1
+        reader = worker_config._lazy_source
+        assert worker_config.refresh_shared()
+        # the replaced reader stays usable for readers still holding it and detaches once it is unreachable
+        assert reader.get("DB") == {"pool": {"size": 5}}
+        finalizer = reader._finalizer
+        del reader
+        gc.collect()
+        assert not finalizer.alive
+        assert worker_config.get_config_value("A") == 2
+        worker_config.set_config_value("DB.pool.size", 6)
+        assert worker_config.snapshot() == {"A": 2, "DB": {"pool": {"size": 6}}}
+    finally:
+        config.close()
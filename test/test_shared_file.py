@@ -0,0 +1,156 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import multiprocessing
+import threading
+
+import pytest
+
+from yaml_configuration.config import ConfigConflictError, DefaultConfig, load_dict_from_yaml
+from yaml_configuration.merge import MISSING, three_way_merge
+from yaml_configuration.utils import FileLock
+
+DEFAULT_CONFIG = """
+A: 1
+B: 2
+DB:
+    pool:
+        size: 10
+        timeout: 5
+    name: db
+"""
+
+
+class SharedConfig(DefaultConfig):
+    shared_file = True
+
+
+def load(path):
+    config = SharedConfig(DEFAULT_CONFIG)
+    config.load("config.yaml", path=str(path))
+    return config
+
+
+def test_three_way_merge():
+    base = {"A": 1, "B": 2, "DB": {"pool": {"size": 10}, "name": "db"}}
+    ours = {"A": 3, "B": 2, "DB": {"pool": {"size": 10}, "name": "ours"}}
+    theirs = {"A": 1, "B": 4, "DB": {"pool": {"size": 20}, "name": "db"}, "C": 5}
+    merged, conflicts = three_way_merge(base, ours, theirs, {("A",), ("DB", "name")})
+    assert conflicts == []
+    assert merged == {"A": 3, "B": 4, "DB": {"pool": {"size": 20}, "name": "ours"}, "C": 5}
+    assert merged["DB"]["pool"] is theirs["DB"]["pool"]
+    assert theirs["A"] == 1
+
+    merged, conflicts = three_way_merge(base, ours, {"B": 2}, {("A",)})
+    assert merged is None
+    assert conflicts[0].path == ("A",)
+    assert conflicts[0].their_value is MISSING
+
+
+def test_changes_of_different_processes_are_merged(tmp_path):
+    first = load(tmp_path)
+    second = load(tmp_path)
+    changes = []
+    first.add_change_callback(changes.extend)
+
+    first.set_config_value("A", 3)
+    second.set_config_value("DB.pool.size", 20)
+    second.save_configuration()
+    first.save_configuration()
+
+    assert load_dict_from_yaml(first.config_file_path) == {
+        "A": 3, "B": 2, "DB": {"pool": {"size": 20, "timeout": 5}, "name": "db"}}
+    assert first.get_config_value("DB.pool.size") == 20
+    assert [change.path for change in changes] == [("DB", "pool", "size")]
+
+    # the merged file is the base of the next save
+    second.set_config_value("B", 5)
+    second.save_configuration()
+    assert load_dict_from_yaml(first.config_file_path)["A"] == 3
+
+
+def test_conflicting_changes_are_not_written(tmp_path):
+    first = load(tmp_path)
+    second = load(tmp_path)
+    first.set_config_value("DB.pool", {"size": 30})
+    second.set_config_value("DB.pool.size", 20)
+    first.save_configuration()
+
+    with pytest.raises(ConfigConflictError) as error:
+        second.save_configuration()
+    assert [(conflict.path, conflict.their_value) for conflict in error.value.conflicts] == [
+        (("DB", "pool", "size"), 30)]
+    assert load_dict_from_yaml(first.config_file_path)["DB"]["pool"] == {"size": 30}
+
+    second.reload()
+    assert second.get_config_value("DB.pool") == {"size": 30, "timeout": 5}
+    second.set_config_value("B", 5)
+    second.save_configuration()
+    assert load_dict_from_yaml(first.config_file_path)["B"] == 5
+
+
+def test_transactions_are_merged(tmp_path):
+    first = load(tmp_path)
+    second = load(tmp_path)
+    second.set_config_value("B", 5)
+    second.save_configuration()
+
+    with first.transaction():
+        first.set_config_value("A", 3)
+        first.set_config_value("DB.name", "other")
+    assert load_dict_from_yaml(first.config_file_path) == {
+        "A": 3, "B": 5, "DB": {"pool": {"size": 10, "timeout": 5}, "name": "other"}}
+    assert first.get_config_value("B") == 5
+
+    second.set_config_value("A", 4)
+    with pytest.raises(ConfigConflictError):
+        with second.transaction():
+            second.set_config_value("B", 6)
+    assert second.get_config_value("B") == 5
+
+
+def test_values_can_be_set_while_waiting_for_the_file_lock(tmp_path):
+    config = load(tmp_path)
+    other = load(tmp_path)
+    config.set_config_value("A", 3)
+    other.set_config_value("B", 5)
+    other.save_configuration()
+    with FileLock(config.config_file_path):
+        saving = threading.Thread(target=config.save_configuration)
+        saving.start()
+        saving.join(0.2)
+        assert saving.is_alive()
+        config.set_config_value("DB.name", "other")
+        assert config.get_config_value("DB.name") == "other"
+    saving.join()
+
+    assert load_dict_from_yaml(config.config_file_path) == {
+        "A": 3, "B": 5, "DB": {"pool": {"size": 10, "timeout": 5}, "name": "db"}}
+    assert config.get_config_value("B") == 5
+    assert config.get_config_value("DB.name") == "other"
+    config.save_configuration()
+    assert load_dict_from_yaml(config.config_file_path)["DB"]["name"] == "other"
+
+
+def _increment(path, key, count):
+    config = load(path)
+    for _ in range(count):
+        config.set_config_value(key, config.get_config_value(key) + 1)
+        config.save_configuration()
+
+
+def test_processes_do_not_lose_changes(tmp_path):
+    load(tmp_path)
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_increment, args=(tmp_path, key, 20)) for key in ("A", "B")]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+    assert load(tmp_path).get_config_value("A") == 21
+    assert load(tmp_path).get_config_value("B") == 22
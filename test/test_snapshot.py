@@ -0,0 +1,60 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import os
+
+from yaml_configuration.config import DefaultConfig, load_dict_from_yaml
+from yaml_configuration.snapshot import SnapshotCache
+
+
+class CountingLoader(object):
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        return load_dict_from_yaml(path)
+
+
+def test_snapshot_is_used_until_file_changes(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("A: 1\n")
+    cache = SnapshotCache(verify_content=True)
+    loader = CountingLoader()
+    assert cache.load(str(config_file), loader) == {"A": 1}
+    assert cache.load(str(config_file), loader) == {"A": 1}
+    assert loader.calls == 1
+    config_file.write_text("A: 2\n")
+    assert cache.load(str(config_file), loader) == {"A": 2}
+    assert loader.calls == 2
+
+
+def test_corrupt_snapshot_is_ignored(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("A: 1\n")
+    cache = SnapshotCache(cache_dir=str(tmp_path / "cache"))
+    loader = CountingLoader()
+    cache.load(str(config_file), loader)
+    snapshot_path = cache.snapshot_path(str(config_file))
+    with open(snapshot_path, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b'\xff')
+    assert cache.load(str(config_file), loader) == {"A": 1}
+    assert loader.calls == 2
+
+
+def test_default_config_uses_snapshot_cache(tmp_path):
+    class SnapshotConfig(DefaultConfig):
+        snapshot_cache = SnapshotCache()
+
+    (tmp_path / "config.yaml").write_text("A: 1\nB: 2\n")
+    for _ in range(2):
+        config = SnapshotConfig("A: 0\n")
+        config.load("config.yaml", path=str(tmp_path))
+        assert config.get_config_value("B") == 2
+    assert os.path.isfile(SnapshotConfig.snapshot_cache.snapshot_path(str(tmp_path / "config.yaml")))
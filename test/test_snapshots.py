@@ -0,0 +1,66 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import threading
+
+from pytest import raises
+
+from yaml_configuration.config import DefaultConfig
+
+DEFAULT_CONFIG = "A: 1\nDB:\n    pool:\n        size: 5\n        max: 5\nL: [1, 2]\n"
+
+
+def test_snapshot_is_immutable_and_versioned():
+    config = DefaultConfig(DEFAULT_CONFIG)
+    snapshot = config.snapshot()
+    assert config.config_version == snapshot.version
+    config.set_config_value("DB.pool.size", 10)
+    assert config.config_version == snapshot.version + 1
+    assert snapshot.get("DB.pool.size") == 5
+    assert config.snapshot().get("DB.pool.size") == 10
+    assert config.snapshot()["DB"]["pool"] == {"size": 10, "max": 5}
+    with raises(TypeError):
+        snapshot["DB"]["pool"]["size"] = 3
+    with raises(AttributeError):
+        snapshot["L"].append(3)
+    assert snapshot["L"].to_list() == [1, 2]
+
+
+def test_readers_never_see_torn_updates():
+    config = DefaultConfig(DEFAULT_CONFIG)
+    stop = threading.Event()
+    torn_reads = []
+
+    def writer():
+        for i in range(2000):
+            config.set_config_value("DB.pool", {"size": i, "max": i})
+        stop.set()
+
+    def reader():
+        while not stop.is_set():
+            pool = config.snapshot()["DB"]["pool"]
+            if pool["size"] != pool["max"]:
+                torn_reads.append(pool)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not torn_reads
+    assert config.get_config_value("DB.pool.size") == 1999
+
+
+def test_published_path_index_is_not_modified():
+    config = DefaultConfig(DEFAULT_CONFIG)
+    assert config.get_config_value("DB.pool.size") == 5
+    path_index = config._path_index
+    config.set_config_value("DB.pool", {"size": 10})
+    assert path_index.get("DB.pool.size") == 5
+    assert path_index.get("DB.pool.max") == 5
+    assert config.get_config_value("DB.pool.size") == 10
+    assert config.get_config_value("DB.pool.max") is None
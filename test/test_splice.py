@@ -0,0 +1,196 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import threading
+
+import yaml
+
+from yaml_configuration.config import DefaultConfig, load_dict_from_yaml
+from yaml_configuration.splice import YamlLayout, YamlSplice
+
+DEFAULT_CONFIG = """
+A: 1
+DB:
+    pool:
+        size: 10
+        timeout: 5
+    name: db
+L: [1, 2]
+"""
+
+CONFIG_FILE = """\
+# edited by hand
+A: 1   # the answer
+DB:
+  pool:
+    size: 10
+    timeout: 5
+
+  name: "db"
+L: [1, 2]
+TEXT: |
+  some text
+"""
+
+
+class SpliceConfig(DefaultConfig):
+    splice_save = True
+
+
+class InPlaceSpliceConfig(SpliceConfig):
+    splice_in_place = True
+
+
+def load(tmp_path, text=CONFIG_FILE, config_class=SpliceConfig):
+    (tmp_path / "config.yaml").write_text(text)
+    config = config_class(DEFAULT_CONFIG)
+    config.load("config.yaml", path=str(tmp_path))
+    return config
+
+
+def read(config):
+    with open(config.config_file_path) as f:
+        return f.read()
+
+
+def test_layout_splice():
+    layout, value = YamlLayout.load(CONFIG_FILE, yaml.FullLoader)
+    assert value["DB"]["name"] == "db"
+    value["DB"] = {"pool": {"size": 200, "timeout": 5}, "name": "db"}
+    value["L"] = [3]
+    splice = layout.splice(value, [("DB",), ("L",)], yaml.Dumper)
+    assert [edit[3] for edit in splice.edits] == [("DB", "pool", "size"), ("L",)]
+    assert splice.text == CONFIG_FILE.replace("size: 10", "size: 200").replace("[1, 2]", "[3]")
+
+    value["DB"] = {"pool": {"size": 20}, "name": "db"}
+    assert layout.splice(value, [("DB",)], yaml.Dumper) is None
+    value["TEXT"] = "other"
+    assert layout.splice(value, [("TEXT",)], yaml.Dumper) is None
+
+
+def test_changed_values_are_spliced(tmp_path):
+    config = load(tmp_path)
+    config.set_config_value("DB.pool.size", 12)
+    config.save_configuration()
+    assert read(config) == CONFIG_FILE.replace("size: 10", "size: 12")
+
+    config.set_config_value("A", 1000)
+    config.set_config_value("DB.name", "other db")
+    config.set_config_value("L", [1, 2, 3])
+    config.save_configuration()
+    assert read(config) == CONFIG_FILE.replace("size: 10", "size: 12").replace("A: 1 ", "A: 1000 ").replace(
+        '"db"', "other db").replace("[1, 2]", "[1, 2, 3]")
+    assert load(tmp_path, read(config)).get_config_value("DB") == config.get_config_value("DB")
+
+
+def test_structural_changes_are_dumped(tmp_path):
+    config = load(tmp_path)
+    config.set_config_value("DB.pool.max", 3)
+    config.save_configuration()
+    assert "# edited by hand" not in read(config)
+    assert load_dict_from_yaml(config.config_file_path)["DB"]["pool"] == {"size": 10, "timeout": 5, "max": 3}
+
+    # the dumped file is spliced by the following saves
+    text = read(config)
+    config.set_config_value("A", 2)
+    config.save_configuration()
+    assert read(config) == text.replace("A: 1\n", "A: 2\n")
+
+
+def test_modified_file_is_dumped(tmp_path):
+    config = load(tmp_path)
+    with open(config.config_file_path, "a") as f:
+        f.write("B: 3\n")
+    config.set_config_value("A", 2)
+    config.save_configuration()
+    assert load_dict_from_yaml(config.config_file_path)["A"] == 2
+    assert "B" not in load_dict_from_yaml(config.config_file_path)
+
+
+def test_defaults_are_added_by_dump(tmp_path):
+    config = load(tmp_path, "A: 5\n")
+    assert load_dict_from_yaml(config.config_file_path) == {
+        "A": 5, "DB": {"pool": {"size": 10, "timeout": 5}, "name": "db"}, "L": [1, 2]}
+
+
+def test_spliced_files_are_replaced_atomically(tmp_path):
+    config = load(tmp_path)
+    inode = (tmp_path / "config.yaml").stat().st_ino
+    config.set_config_value("A", 2)
+    config.save_configuration()
+    assert (tmp_path / "config.yaml").stat().st_ino != inode
+    assert read(config) == CONFIG_FILE.replace("A: 1 ", "A: 2 ")
+
+
+def test_instrumentation_reports_spliced_bytes(tmp_path):
+    config = load(tmp_path, config_class=InPlaceSpliceConfig)
+    instrumentation = config.enable_instrumentation()
+    config.set_config_value("DB.pool.size", 20)
+    config.save_configuration()
+    assert instrumentation.bytes_written == 2
+    config.set_config_value("DB.name", "d")
+    config.save_configuration()
+    assert instrumentation.bytes_written < 40
+    with config.transaction():
+        config.set_config_value("A", 2)
+    assert load_dict_from_yaml(config.config_file_path)["A"] == 2
+    assert "# the answer" in read(config)
+
+
+def test_files_with_non_ascii_text_are_spliced(tmp_path):
+    text = CONFIG_FILE.replace("# the answer", "# die Antwort für alles")
+    config = load(tmp_path, text)
+    config.set_config_value("DB.pool.size", 12)
+    config.save_configuration()
+    assert read(config) == text.replace("size: 10", "size: 12")
+    config.set_config_value("DB.pool.size", 1200)
+    config.set_config_value("DB.name", "dä")
+    config.save_configuration()
+    assert load(tmp_path, read(config)).get_config_value("DB.name") == "dä"
+    assert read(config).startswith(text[:text.index("size")])
+
+
+def test_values_can_be_set_while_saving(tmp_path, monkeypatch):
+    config = load(tmp_path)
+    write = YamlSplice.write
+
+    def set_value_and_write(splice, path, atomic=True):
+        thread = threading.Thread(target=config.set_config_value, args=("A", 3))
+        thread.start()
+        thread.join(5)
+        assert not thread.is_alive()
+        return write(splice, path, atomic)
+
+    monkeypatch.setattr(YamlSplice, "write", set_value_and_write)
+    config.set_config_value("A", 2)
+    config.save_configuration()
+    assert load_dict_from_yaml(config.config_file_path)["A"] == 2
+    assert config.get_config_value("A") == 3
+
+
+def test_layout_of_reload_during_save_is_kept(tmp_path, monkeypatch):
+    config = load(tmp_path)
+    edited = CONFIG_FILE.replace("A: 1 ", "A: 5 ")
+    write = YamlSplice.write
+    threads = []
+
+    def write_and_reload(splice, path, atomic=True):
+        written = write(splice, path, atomic)
+        (tmp_path / "config.yaml").write_text(edited)
+        thread = threading.Thread(target=config.reload)
+        thread.start()
+        # the reload has to wait for the end of the save before replacing the layout
+        thread.join(0.5)
+        threads.append(thread)
+        return written
+
+    monkeypatch.setattr(YamlSplice, "write", write_and_reload)
+    config.set_config_value("DB.pool.size", 12)
+    config.save_configuration()
+    threads[0].join(5)
+    assert config._layout.text == edited
+    assert config.get_config_value("A") == 5
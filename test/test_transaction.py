@@ -0,0 +1,108 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import threading
+
+import pytest
+
+from yaml_configuration import backends
+from yaml_configuration.config import ConfigError, DefaultConfig, load_dict_from_yaml
+
+DEFAULT_CONFIG = """
+A: 1
+DB:
+    pool:
+        size: 10
+        timeout: 5
+    name: db
+"""
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = DefaultConfig(DEFAULT_CONFIG)
+    config.load("config.yaml", path=str(tmp_path))
+    return config
+
+
+def test_changes_are_published_and_saved_once(config, monkeypatch):
+    dumps = []
+    original_dumps = backends.YamlBackend.dumps
+    monkeypatch.setattr(backends.YamlBackend, "dumps", lambda self, d: dumps.append(d) or original_dumps(self, d))
+    version = config.config_version
+    assert config.get_config_value("DB.pool.size") == 10
+
+    with config.transaction() as transaction:
+        config.set_config_value("A", 2)
+        transaction.set_config_value("DB.pool.size", 20)
+        config.set_config_value("DB.pool.timeout", 6)
+        config.set_config_value("NEW.key", "value")
+        assert config.get_config_value("DB.pool.size") == 10
+        assert transaction.get_config_value("DB.pool.size") == 20
+
+    assert config.config_version == version + 1
+    assert len(dumps) == 1
+    assert config.get_config_value("DB.pool") == {"size": 20, "timeout": 6}
+    assert config.get_config_value("NEW.key") == "value"
+    assert config.get_config_value("DB.name") == "db"
+    saved = load_dict_from_yaml(config.config_file_path)
+    assert saved["DB"]["pool"]["size"] == 20 and saved["A"] == 2
+
+
+def test_exception_rolls_back(config):
+    snapshot = config.snapshot()
+    with pytest.raises(RuntimeError):
+        with config.transaction():
+            config.set_config_value("A", 2)
+            config.set_config_value("DB.pool.size", 20)
+            raise RuntimeError()
+    assert config.snapshot() is snapshot
+    assert config.get_config_value("DB.pool.size") == 10
+    assert load_dict_from_yaml(config.config_file_path)["A"] == 1
+
+
+def test_invalid_change_rolls_back(config):
+    config.compile()
+    with pytest.raises(ConfigError):
+        with config.transaction():
+            config.set_config_value("A", 2)
+            config.set_config_value("DB.pool.size", "large")
+    assert config.get_config_value("A") == 1
+    assert load_dict_from_yaml(config.config_file_path)["A"] == 1
+
+
+def test_other_threads_see_all_changes_or_none(config):
+    seen = []
+    started = threading.Event()
+
+    def read_and_write():
+        started.set()
+        seen.append((config.get_config_value("A"), config.get_config_value("DB.pool.size")))
+        config.set_config_value("A", 3)
+
+    with config.transaction():
+        config.set_config_value("A", 2)
+        thread = threading.Thread(target=read_and_write)
+        thread.start()
+        started.wait()
+        config.set_config_value("DB.pool.size", 20)
+    thread.join()
+    assert seen == [(1, 10)]
+    assert config.get_config_value("A") == 3
+    assert config.get_config_value("DB.pool.size") == 20
+
+
+def test_dotted_reads_do_not_wait_for_transaction(config):
+    config.invalidate_path_index()
+    with config.transaction():
+        config.set_config_value("DB.pool.size", 20)
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(config.get_config_value("DB.pool.size")))
+        thread.start()
+        thread.join(5)
+        assert seen == [10]
+    assert config.get_config_value("DB.pool.size") == 20
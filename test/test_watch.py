@@ -0,0 +1,54 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+import threading
+
+import pytest
+
+from yaml_configuration.config import DefaultConfig
+from yaml_configuration.merge import MISSING, ConfigChange
+
+DEFAULT_CONFIG = "A: 1\nDB:\n    host: localhost\n    port: 1\n"
+
+
+def test_reload_reports_changes_to_callbacks(tmp_path):
+    config = DefaultConfig(DEFAULT_CONFIG)
+    config.load("config.yaml", path=str(tmp_path))
+    db_changes = []
+    config.add_change_callback(db_changes.extend, key="DB")
+    (tmp_path / "config.yaml").write_text("A: 1\nDB:\n    host: remote\nB: 2\n")
+    changes = config.reload()
+    assert sorted(changes) == sorted([ConfigChange(("DB", "host"), "localhost", "remote"),
+                                      ConfigChange(("B",), MISSING, 2)])
+    assert db_changes == [ConfigChange(("DB", "host"), "localhost", "remote")]
+    assert config.get_config_value("DB") == {"host": "remote", "port": 1}
+
+
+def test_reload_keeps_config_on_parse_error(tmp_path):
+    config = DefaultConfig(DEFAULT_CONFIG)
+    config.load("config.yaml", path=str(tmp_path))
+    (tmp_path / "config.yaml").write_text("A: [1\n")
+    assert config.reload() is None
+    assert config.get_config_value("A") == 1
+
+
+@pytest.mark.parametrize("use_inotify", [True, False], ids=["inotify", "polling"])
+def test_watch_reloads_modified_file(tmp_path, use_inotify):
+    config = DefaultConfig(DEFAULT_CONFIG)
+    config.load("config.yaml", path=str(tmp_path))
+    reloaded = threading.Event()
+    config.add_change_callback(lambda changes: reloaded.set(), key="A")
+    config.watch(debounce=0.05, poll_interval=0.05, use_inotify=use_inotify)
+    try:
+        if use_inotify and not config._watcher.uses_inotify:
+            pytest.skip("inotify is not available, the file is polled")
+        assert config._watcher.uses_inotify == use_inotify
+        (tmp_path / "config.yaml").write_text("A: 2\nDB:\n    host: localhost\n    port: 1\n")
+        assert reloaded.wait(5)
+        assert config.get_config_value("A") == 2
+    finally:
+        config.close()
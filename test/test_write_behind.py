@@ -0,0 +1,62 @@
+# Copyright (C) 2016-2017 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the 2-Clause BSD License ("Simplified BSD
+# License") which accompanies this distribution, and is available at
+# https://opensource.org/licenses/BSD-2-Clause
+
+from yaml_configuration.config import DefaultConfig, load_dict_from_yaml
+from yaml_configuration.writer import WriteBehindWriter
+
+
+def test_saves_are_coalesced(tmp_path):
+    serialized = []
+
+    def serializer(data):
+        serialized.append(data)
+        return str(data)
+
+    writer = WriteBehindWriter(serializer, window=0.2)
+    target = str(tmp_path / "out.txt")
+    for i in range(10):
+        writer.submit(target, i)
+    assert writer.flush(timeout=5)
+    writer.close()
+    assert serialized == [9]
+    assert (tmp_path / "out.txt").read_text() == "9"
+
+
+def test_default_config_write_behind(tmp_path):
+    config = DefaultConfig("A: 1\n")
+    config.load("config.yaml", path=str(tmp_path / "sub"))
+    config.enable_write_behind(window=10)
+    config.set_config_value("A", 2)
+    config.save_configuration()
+    config.set_config_value("A", 3)
+    config.save_configuration()
+    assert config.flush(timeout=5)
+    assert load_dict_from_yaml(config.config_file_path) == {"A": 3}
+    config.close()
+    assert list(tmp_path.joinpath("sub").iterdir()) == [tmp_path / "sub" / "config.yaml"]
+
+
+def test_shared_writer_is_not_closed(tmp_path):
+    writer = WriteBehindWriter(lambda data: "A: {0}\n".format(data["A"]), window=10)
+    configs = []
+    for name in ("first", "second"):
+        config = DefaultConfig("A: 1\n")
+        config.load("config.yaml", path=str(tmp_path / name))
+        config.enable_write_behind(writer=writer)
+        configs.append(config)
+    first, second = configs
+
+    first.set_config_value("A", 2)
+    first.save_configuration()
+    first.close()
+    assert load_dict_from_yaml(first.config_file_path) == {"A": 2}
+
+    second.set_config_value("A", 3)
+    second.save_configuration()
+    second.close()
+    assert load_dict_from_yaml(second.config_file_path) == {"A": 3}
+    writer.close()